@@ -5,6 +5,8 @@ from auth import (
     student_login, placement_login,
     logout
 )
+from metrics import start_exporters
+from model_registry import WARMUP_ON_START
 
 # Page configuration
 st.set_page_config(
@@ -14,6 +16,14 @@ st.set_page_config(
     initial_sidebar_state="expanded"
 )
 
+# Metrics endpoint / file writer (once per server process, only if SKILLSYNC_METRICS is on)
+start_exporters()
+
+# Warm up the embedding model in the background (once per server process)
+if WARMUP_ON_START:
+    from matcher import warm_up_in_background
+    warm_up_in_background()
+
 # Initialize session state
 if 'logged_in' not in st.session_state:
     st.session_state['logged_in'] = False
@@ -0,0 +1,191 @@
+# ann_index.py
+"""
+Approximate nearest-neighbour search over unit-length embeddings.
+
+An IVF (inverted file) index: spherical k-means splits the embeddings
+into cells around centroids, and a query scans only the nprobe cells whose
+centroids are closest to it. Candidates are then scored exactly, so raising
+nprobe trades latency for recall (nprobe >= nlist is a brute-force scan).
+
+The index stores only cell membership. Vectors are read through a
+get_vectors(rows) callable, so they can stay in a memory-mapped vector store.
+"""
+import os
+import numpy as np
+
+# Cells scanned per query; the recall/latency knob
+ANN_NPROBE = int(os.getenv("SKILLSYNC_ANN_NPROBE", "8"))
+
+# Number of cells (0 = square root of the number of vectors)
+ANN_NLIST = int(os.getenv("SKILLSYNC_ANN_NLIST", "0"))
+
+KMEANS_ITERATIONS = 10
+
+# k-means trains on at most this many vectors per cell
+KMEANS_SAMPLES_PER_CELL = 64
+
+# Rows scored against the centroids at a time when assigning cells
+ASSIGN_BLOCK_ROWS = 16384
+
+# Rebuild (retrain centroids) once the index holds this many times what it was trained on
+REBUILD_GROWTH = 4
+
+
+def default_nlist(n_vectors):
+    """Number of cells for an index of n_vectors"""
+    return ANN_NLIST or max(1, int(np.sqrt(n_vectors)))
+
+
+def _normalize(matrix):
+    return matrix / np.maximum(np.linalg.norm(matrix, axis=1, keepdims=True), 1e-12)
+
+
+def train_centroids(n_vectors, get_vectors, nlist, iterations=KMEANS_ITERATIONS, seed=0):
+    """
+    Spherical k-means on a sample of the vectors.
+
+    Args:
+        n_vectors (int): Number of vectors available as rows 0..n_vectors-1.
+        get_vectors (callable): Maps an array of rows to a float32 matrix.
+        nlist (int): Number of centroids.
+
+    Returns:
+        np.ndarray: Unit-length float32 centroids, shape (<= nlist, dim).
+    """
+    rng = np.random.default_rng(seed)
+    sample_size = min(n_vectors, nlist * KMEANS_SAMPLES_PER_CELL)
+    sample = np.asarray(get_vectors(np.sort(rng.choice(n_vectors, sample_size, replace=False))), dtype=np.float32)
+    nlist = min(nlist, len(sample))
+    centroids = sample[rng.choice(len(sample), nlist, replace=False)].copy()
+
+    for _ in range(iterations):
+        assignment = np.argmax(sample @ centroids.T, axis=1)
+        counts = np.bincount(assignment, minlength=nlist)
+        filled = counts > 0
+
+        # Sum the members of each cell in one pass over the sample sorted by cell
+        order = np.argsort(assignment, kind='stable')
+        starts = np.concatenate(([0], np.cumsum(counts)[:-1]))
+        sums = np.empty_like(centroids)
+        sums[filled] = np.add.reduceat(sample[order], starts[filled])
+        # Empty cells restart on random sample vectors
+        sums[~filled] = sample[rng.choice(len(sample), int((~filled).sum()))]
+        centroids = _normalize(sums)
+
+    return centroids.astype(np.float32)
+
+
+class IVFIndex:
+    """Inverted-file index mapping keys to k-means cells"""
+
+    def __init__(self, centroids):
+        self.centroids = centroids
+        self.trained_size = 0
+        self._cells = [np.empty(0, dtype=np.int64) for _ in range(len(centroids))]
+        self._item_ids = {}                               # key -> item id
+        self._item_cells = np.empty(0, dtype=np.int64)    # item id -> cell
+        self._item_rows = np.empty(0, dtype=np.int64)     # item id -> caller row, -1 once removed
+
+    @classmethod
+    def build(cls, keys, get_vectors, nlist=None, seed=0):
+        """
+        Train centroids and index every key.
+
+        Args:
+            keys (list): Unique keys; keys[i]'s vector is get_vectors([i])[0].
+            get_vectors (callable): Maps an array of rows to a float32 matrix.
+            nlist (int): Number of cells (default: default_nlist(len(keys))).
+        """
+        index = cls(train_centroids(len(keys), get_vectors, nlist or default_nlist(len(keys)), seed=seed))
+        index.trained_size = len(keys)
+        index.sync(keys, get_vectors)
+        return index
+
+    def __len__(self):
+        return len(self._item_ids)
+
+    @property
+    def nlist(self):
+        return len(self.centroids)
+
+    def needs_rebuild(self, n_keys):
+        """Whether the cells are too coarse for n_keys or mostly hold removed items"""
+        return n_keys > REBUILD_GROWTH * self.trained_size or len(self._item_rows) > 2 * max(n_keys, 1)
+
+    def assign(self, rows, get_vectors):
+        """Get the nearest centroid of each row's vector, reading vectors in blocks"""
+        cells = np.empty(len(rows), dtype=np.int64)
+        for start in range(0, len(rows), ASSIGN_BLOCK_ROWS):
+            block = np.asarray(get_vectors(rows[start:start + ASSIGN_BLOCK_ROWS]), dtype=np.float32)
+            cells[start:start + ASSIGN_BLOCK_ROWS] = np.argmax(block @ self.centroids.T, axis=1)
+        return cells
+
+    def sync(self, keys, get_vectors):
+        """
+        Make the index hold exactly keys, in their new order.
+
+        Keys not yet indexed are assigned to cells (incremental insert), keys
+        that are gone are dropped, and candidates() afterwards returns
+        positions in keys.
+        """
+        rows = {key: row for row, key in enumerate(keys)}
+
+        gone = [key for key in self._item_ids if key not in rows]
+        if gone:
+            gone_ids = np.array([self._item_ids.pop(key) for key in gone], dtype=np.int64)
+            self._item_rows[gone_ids] = -1
+            for cell in np.unique(self._item_cells[gone_ids]):
+                members = self._cells[cell]
+                self._cells[cell] = members[self._item_rows[members] >= 0]
+
+        new_rows = np.array([row for key, row in rows.items() if key not in self._item_ids], dtype=np.int64)
+        first_id = len(self._item_rows)
+        new_cells = self.assign(new_rows, get_vectors)
+        self._item_cells = np.concatenate((self._item_cells, new_cells))
+        self._item_rows = np.concatenate((self._item_rows, new_rows))
+        for offset, row in enumerate(new_rows):
+            self._item_ids[keys[row]] = first_id + offset
+
+        new_ids = np.arange(first_id, first_id + len(new_rows))
+        order = np.argsort(new_cells, kind='stable')
+        for cell, members in zip(*_group(new_cells[order], new_ids[order])):
+            self._cells[cell] = np.concatenate((self._cells[cell], members))
+
+        # Existing items keep their cell but may have moved in keys
+        for key, item_id in self._item_ids.items():
+            self._item_rows[item_id] = rows[key]
+
+    def candidates(self, query, nprobe=ANN_NPROBE, min_count=0):
+        """
+        Get the rows in the cells nearest to query.
+
+        At least nprobe cells are scanned, more if needed to reach min_count rows.
+
+        Returns:
+            np.ndarray: Sorted rows (positions in the keys last synced).
+        """
+        order = np.argsort(-(self.centroids @ query))
+        sizes = np.cumsum([len(self._cells[cell]) for cell in order])
+        probes = max(nprobe, int(np.searchsorted(sizes, min_count)) + 1)
+        ids = np.concatenate([self._cells[cell] for cell in order[:probes]])
+        return np.sort(self._item_rows[ids])
+
+    def search(self, query, k, get_vectors, nprobe=ANN_NPROBE):
+        """
+        Find the k rows most similar to query among the probed cells.
+
+        Returns:
+            tuple: (rows, exact cosine similarities), most similar first.
+        """
+        rows = self.candidates(query, nprobe, min_count=k)
+        scores = np.asarray(get_vectors(rows), dtype=np.float32) @ query
+        top = np.argsort(-scores, kind='stable')[:k]
+        return rows[top], scores[top]
+
+
+def _group(sorted_cells, ids):
+    """Split ids (sorted by cell) into (cells, list of id arrays per cell)"""
+    if not len(sorted_cells):
+        return [], []
+    cells, starts = np.unique(sorted_cells, return_index=True)
+    return cells, np.split(ids, starts[1:])
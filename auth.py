@@ -1,26 +1,144 @@
 # auth.py
+import os
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor, TimeoutError as FuturesTimeoutError
+import numpy as np
 import streamlit as st
 import bcrypt
 from database import (
     insert_student, fetch_student,
-    insert_placement_officer, fetch_placement_officer
+    insert_placement_officer, fetch_placement_officer,
+    update_student_password, update_placement_officer_password
 )
 
+# bcrypt work factor for new hashes; older hashes are moved to it on login
+BCRYPT_ROUNDS = int(os.getenv("SKILLSYNC_BCRYPT_ROUNDS", "12"))
 
-def hash_password(password):
+# Concurrent bcrypt computations per process (bcrypt releases the GIL)
+BCRYPT_WORKERS = int(os.getenv("SKILLSYNC_BCRYPT_WORKERS", "0")) or max(1, (os.cpu_count() or 2) // 2)
+
+# Seconds a sign-up/login waits for a bcrypt slot before giving up
+BCRYPT_TIMEOUT = float(os.getenv("SKILLSYNC_BCRYPT_TIMEOUT", "15"))
+
+# Password hashes allowed to wait for a worker; more are rejected as busy
+BCRYPT_MAX_QUEUE = int(os.getenv("SKILLSYNC_BCRYPT_MAX_QUEUE", "64"))
+
+_bcrypt_pool = ThreadPoolExecutor(max_workers=BCRYPT_WORKERS, thread_name_prefix="skillsync-bcrypt")
+_bcrypt_slots = threading.BoundedSemaphore(BCRYPT_WORKERS + BCRYPT_MAX_QUEUE)
+
+# Recent latencies per operation: (seconds queued, seconds hashing)
+_latencies = {'hash': deque(maxlen=1000), 'verify': deque(maxlen=1000)}
+_latency_lock = threading.Lock()
+
+
+def _run_bcrypt(operation, function, *args, after=None):
+    """
+    Run a bcrypt call on the bounded pool, recording queue and compute time.
+
+    Args:
+        after (callable): Called with the result on the same worker once the
+                          caller has it, for follow-up work it need not wait for.
+
+    Raises:
+        TimeoutError: The queue is full, or no worker picked the call up in
+                      time (it is then cancelled, not left queued).
+    """
+    if not _bcrypt_slots.acquire(blocking=False):
+        raise TimeoutError(f"{BCRYPT_MAX_QUEUE} password hashes already queued")
+
+    submitted = time.perf_counter()
+    outcome = Future()
+
+    def job():
+        if not outcome.set_running_or_notify_cancel():
+            return
+        started = time.perf_counter()
+        try:
+            result = function(*args)
+        except Exception as e:
+            outcome.set_exception(e)
+            return
+        with _latency_lock:
+            _latencies[operation].append((started - submitted, time.perf_counter() - started))
+        outcome.set_result(result)
+        if after:
+            after(result)
+
+    queued = _bcrypt_pool.submit(job)
+    queued.add_done_callback(lambda _: _bcrypt_slots.release())
+    try:
+        return outcome.result(timeout=BCRYPT_TIMEOUT)
+    except FuturesTimeoutError:
+        # Still queued: drop it so it neither runs late nor holds the password
+        outcome.cancel()
+        queued.cancel()
+        raise TimeoutError(f"No bcrypt worker free within {BCRYPT_TIMEOUT}s") from None
+
+
+def hash_cost(hashed):
+    """Work factor of a stored bcrypt hash ($2b$<cost>$...), or None if unreadable"""
+    try:
+        return int(hashed.split('$')[2])
+    except (AttributeError, IndexError, ValueError):
+        return None
+
+
+def hash_password(password, rounds=None):
     """Hash password using bcrypt for security"""
-    return bcrypt.hashpw(password.encode(), bcrypt.gensalt()).decode()
+    salt = bcrypt.gensalt(rounds or BCRYPT_ROUNDS)
+    return _run_bcrypt('hash', bcrypt.hashpw, password.encode(), salt).decode()
+
+
+def verify_password(password, hashed, update_password=None, email=None):
+    """
+    Verify password against stored hash.
 
+    If update_password is given and the hash is not at BCRYPT_ROUNDS, a correct
+    password is then rehashed by the same bcrypt job and saved with
+    update_password(email, new_hash), after this returns, so the login is not
+    delayed and the password is not queued a second time.
 
-def verify_password(password, hashed):
-    """Verify password against stored hash"""
+    Raises:
+        TimeoutError: No bcrypt worker was free; the caller should report it as busy.
+    """
+    def _rehash(verified):
+        if not verified:
+            return
+        try:
+            update_password(email, bcrypt.hashpw(password.encode(), bcrypt.gensalt(BCRYPT_ROUNDS)).decode())
+        except Exception as e:
+            print(f"Error rehashing password: {e}")
+
+    needs_rehash = update_password is not None and hash_cost(hashed) != BCRYPT_ROUNDS
     try:
-        return bcrypt.checkpw(password.encode(), hashed.encode())
-    except Exception as e:
-        print(f"Error verifying password: {e}")
+        return _run_bcrypt('verify', bcrypt.checkpw, password.encode(), hashed.encode(), after=_rehash if needs_rehash else None)
+    except (AttributeError, ValueError) as e:
+        # Missing or malformed stored hash
+        print(f"Error verifying password: {e!r}")
         return False
 
 
+def get_password_hash_stats():
+    """Get p50/p95/p99 queue and hashing latency (ms) of recent bcrypt calls"""
+    with _latency_lock:
+        samples = {operation: list(values) for operation, values in _latencies.items()}
+
+    stats = {'rounds': BCRYPT_ROUNDS, 'workers': BCRYPT_WORKERS}
+    for operation, values in samples.items():
+        if not values:
+            stats[operation] = {'count': 0}
+            continue
+        waits, computes = np.array(values).T * 1000
+        stats[operation] = {
+            'count': len(values),
+            **{f'wait_p{p}_ms': float(np.percentile(waits, p)) for p in (50, 95, 99)},
+            **{f'hash_p{p}_ms': float(np.percentile(computes, p)) for p in (50, 95, 99)},
+        }
+    return stats
+
+
 # ============ STUDENT SIGNUP ============
 
 def student_signup():
@@ -77,7 +195,12 @@ def student_signup():
                 return
             
             # Create new student account
-            hashed = hash_password(password)
+            try:
+                hashed = hash_password(password)
+            except TimeoutError as e:
+                print(f"Error hashing password: {e!r}")
+                st.error("❌ The server is busy. Please try again in a moment.")
+                return
             result = insert_student(email, name, hashed, year, branch)
             
             if result:
@@ -122,7 +245,12 @@ def placement_signup():
                 return
             
             # Create new placement officer account
-            hashed = hash_password(password)
+            try:
+                hashed = hash_password(password)
+            except TimeoutError as e:
+                print(f"Error hashing password: {e!r}")
+                st.error("❌ The server is busy. Please try again in a moment.")
+                return
             result = insert_placement_officer(email, name, hashed)
             
             if result:
@@ -151,7 +279,16 @@ def student_login():
             # Fetch student data
             student = fetch_student(email)
             
-            if student and verify_password(password, student['password']):
+            try:
+                verified = bool(student) and verify_password(
+                    password, student['password'], update_student_password, email
+                )
+            except TimeoutError as e:
+                print(f"Error verifying password: {e!r}")
+                st.error("❌ The server is busy. Please try again in a moment.")
+                return
+            
+            if verified:
                 # Login successful
                 st.session_state['logged_in'] = True
                 st.session_state['user_type'] = 'student'
@@ -184,7 +321,16 @@ def placement_login():
             # Fetch placement officer data
             officer = fetch_placement_officer(email)
             
-            if officer and verify_password(password, officer['password']):
+            try:
+                verified = bool(officer) and verify_password(
+                    password, officer['password'], update_placement_officer_password, email
+                )
+            except TimeoutError as e:
+                print(f"Error verifying password: {e!r}")
+                st.error("❌ The server is busy. Please try again in a moment.")
+                return
+            
+            if verified:
                 # Login successful
                 st.session_state['logged_in'] = True
                 st.session_state['user_type'] = 'placement_cell'
@@ -0,0 +1,378 @@
+# benchmark.py
+"""
+Micro-benchmarks for the resume analysis pipeline.
+
+Generates a reproducible synthetic corpus (resume texts of varied length
+and matching PDFs), times each stage of the pipeline and prints the
+results as JSON:
+
+    python benchmark.py --resumes 60 --seed 7 --output baseline.json
+    python benchmark.py --stages extract preprocess ats
+    python benchmark.py --stages ann --ann-vectors 100000
+
+Every stage reports n, p50/p95/mean latency in milliseconds and throughput
+in resumes per second, so two runs can be diffed to judge an optimization.
+"""
+import argparse
+import json
+import os
+import platform
+import random
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+import numpy as np
+
+STAGES = ["extract", "preprocess", "ats", "encode", "match", "ann"]
+
+# Resume lengths in words (short, typical, long); each resume is jittered around one
+RESUME_LENGTHS = (150, 400, 900)
+
+# Non-skill words mixed into synthetic resumes
+FILLER_WORDS = (
+    "developed designed implemented led managed built improved delivered optimized "
+    "team project system application service platform feature customer product "
+    "analysis performance reliability testing deployment pipeline architecture "
+    "students university internship experience responsible collaborated across "
+    "multiple stakeholders requirements documentation reduced increased latency "
+    "users daily reports dashboard quality process workflow scalable secure"
+).split()
+
+# Lines per PDF page and words per line in generated PDFs
+PDF_LINES_PER_PAGE = 55
+PDF_WORDS_PER_LINE = 12
+
+
+# ============ SYNTHETIC CORPUS ============
+
+def make_resume_text(rng, n_words, skills):
+    """Build one synthetic resume of about n_words words"""
+    name = f"Candidate {rng.randint(1000, 9999)}"
+    listed = rng.sample(skills, min(len(skills), rng.randint(5, 20)))
+    words = []
+    while len(words) < n_words:
+        # Roughly one word in eight is a catalog skill, as in real resumes
+        words.append(rng.choice(skills) if rng.random() < 0.125 else rng.choice(FILLER_WORDS))
+
+    lines = [name, "Skills: " + ", ".join(listed), "Experience"]
+    for start in range(0, len(words), PDF_WORDS_PER_LINE):
+        lines.append(" ".join(words[start:start + PDF_WORDS_PER_LINE]) + ".")
+    return "\n".join(lines)
+
+
+def _pdf_escape(line):
+    return line.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)")
+
+
+def make_pdf(text):
+    """Render text as a minimal multi-page PDF (Helvetica, one text line per line)"""
+    lines = text.split("\n")
+    pages = [lines[i:i + PDF_LINES_PER_PAGE] for i in range(0, len(lines), PDF_LINES_PER_PAGE)] or [[]]
+
+    # 1: catalog, 2: page tree, 3: font, then a (page, content) pair per page
+    objects = [None, None, b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>"]
+    page_ids = []
+    for page_lines in pages:
+        ops = ["BT", "/F1 10 Tf", "12 TL", "50 790 Td"]
+        ops += [f"({_pdf_escape(line)}) Tj T*" for line in page_lines]
+        ops.append("ET")
+        stream = "\n".join(ops).encode("latin-1", "replace")
+        page_id, content_id = len(objects) + 1, len(objects) + 2
+        objects.append(
+            f"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 842] "
+            f"/Resources << /Font << /F1 3 0 R >> >> /Contents {content_id} 0 R >>".encode()
+        )
+        objects.append(b"<< /Length %d >>\nstream\n" % len(stream) + stream + b"\nendstream")
+        page_ids.append(page_id)
+    objects[0] = b"<< /Type /Catalog /Pages 2 0 R >>"
+    objects[1] = f"<< /Type /Pages /Kids [{' '.join(f'{p} 0 R' for p in page_ids)}] /Count {len(page_ids)} >>".encode()
+
+    out = bytearray(b"%PDF-1.4\n")
+    offsets = []
+    for number, body in enumerate(objects, 1):
+        offsets.append(len(out))
+        out += b"%d 0 obj\n" % number + body + b"\nendobj\n"
+    xref = len(out)
+    out += b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1)
+    out += b"".join(b"%010d 00000 n \n" % offset for offset in offsets)
+    out += b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (len(objects) + 1, xref)
+    return bytes(out)
+
+
+def generate_corpus(n_resumes, seed):
+    """
+    Generate a reproducible corpus of synthetic resumes.
+
+    Args:
+        n_resumes (int): Number of resumes.
+        seed (int): Random seed; the same seed always gives the same corpus.
+
+    Returns:
+        list: Dicts with 'text' and 'pdf' (bytes).
+    """
+    from skill_matcher import skill_automaton
+
+    rng = random.Random(seed)
+    skills = list(skill_automaton.skills)
+    corpus = []
+    for idx in range(n_resumes):
+        n_words = int(RESUME_LENGTHS[idx % len(RESUME_LENGTHS)] * rng.uniform(0.8, 1.2))
+        text = make_resume_text(rng, n_words, skills)
+        corpus.append({'text': text, 'pdf': make_pdf(text)})
+    return corpus
+
+
+# ============ TIMING ============
+
+def summarize(latencies, items=None):
+    """Latency percentiles (ms) and throughput for a list of per-call seconds"""
+    latencies = np.asarray(latencies, dtype=np.float64)
+    total = float(latencies.sum())
+    items = len(latencies) if items is None else items
+    return {
+        'n': int(items),
+        'p50_ms': float(np.percentile(latencies, 50) * 1000),
+        'p95_ms': float(np.percentile(latencies, 95) * 1000),
+        'mean_ms': float(latencies.mean() * 1000),
+        'total_s': total,
+        'throughput_per_s': items / total if total > 0 else None,
+    }
+
+
+def time_each(function, inputs, warmup_input=None, before_each=None):
+    """Call function on each input and return per-call seconds (before_each() runs untimed)"""
+    if warmup_input is not None:
+        function(warmup_input)
+    latencies = []
+    for item in inputs:
+        if before_each is not None:
+            before_each()
+        start = time.perf_counter()
+        function(item)
+        latencies.append(time.perf_counter() - start)
+    return latencies
+
+
+# ============ STAGES ============
+
+def bench_extract(corpus, warmup):
+    from pdf_processor import extract_text_from_pdf
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        paths = []
+        for idx, doc in enumerate(corpus + [warmup]):
+            path = os.path.join(tmpdir, f"resume_{idx}.pdf")
+            with open(path, 'wb') as f:
+                f.write(doc['pdf'])
+            paths.append(path)
+        return summarize(time_each(extract_text_from_pdf, paths[:-1], warmup_input=paths[-1]))
+
+
+def bench_preprocess(texts, warmup_text):
+    from text_preprocessor import preprocess_text, get_token_cache_stats
+
+    result = summarize(time_each(preprocess_text, texts, warmup_input=warmup_text))
+    result['token_cache'] = get_token_cache_stats()
+    return result
+
+
+def bench_ats(processed_texts, warmup_text, company_name, job_role):
+    from company_database import COMPANY_JOB_SKILLS
+    from skill_matcher import find_skills, split_skills
+    from skill_matrix import skill_matrix, find_skill_ids
+
+    required = COMPANY_JOB_SKILLS[company_name][job_role]
+
+    def one_role(text):
+        return split_skills(find_skills(text), required)
+
+    def all_roles(text):
+        return skill_matrix.ats_scores(skill_matrix.resume_vectors([find_skill_ids(text)]))
+
+    return {
+        'target': f"{company_name}::{job_role}",
+        'single_role': summarize(time_each(one_role, processed_texts, warmup_input=warmup_text)),
+        'all_roles': summarize(time_each(all_roles, processed_texts, warmup_input=warmup_text)),
+        'roles': len(skill_matrix.targets),
+    }
+
+
+def bench_encode(processed_texts, warmup_text, batch_size):
+    from model_registry import MODEL_NAME, get_model
+    from matcher import _encode_normalized
+
+    model = get_model()
+    single = time_each(lambda text: model.encode([text], normalize_embeddings=True), processed_texts, warmup_input=warmup_text)
+
+    _encode_normalized([warmup_text], batch_size=batch_size)
+    batches = [processed_texts[i:i + batch_size] for i in range(0, len(processed_texts), batch_size)]
+    batched = time_each(lambda batch: _encode_normalized(batch, batch_size=batch_size), batches)
+
+    single_summary = summarize(single)
+    batched_summary = summarize(batched, items=len(processed_texts))
+    batched_summary['batch_size'] = batch_size
+    batched_summary['batches'] = len(batches)
+    return {
+        'model': MODEL_NAME,
+        'single': single_summary,
+        'batched': batched_summary,
+        'speedup': (batched_summary['throughput_per_s'] / single_summary['throughput_per_s']
+                    if single_summary['throughput_per_s'] else None),
+    }
+
+
+def bench_match(processed_texts, warmup_text, company_name, job_role):
+    import resume_cache
+    import vector_store
+    from matcher import match_resume_to_job
+
+    # Time the cold path: no local store or database tier to hit, and an
+    # empty in-memory cache before every call, so each resume is encoded
+    saved = (vector_store.VECTOR_STORE_DIR, vector_store._stores,
+             resume_cache.LOCAL_RESUME_STORE, resume_cache.PERSIST_RESUME_EMBEDDINGS)
+    with tempfile.TemporaryDirectory() as tmpdir:
+        vector_store.VECTOR_STORE_DIR, vector_store._stores = tmpdir, {}
+        resume_cache.LOCAL_RESUME_STORE = resume_cache.PERSIST_RESUME_EMBEDDINGS = False
+        try:
+            return summarize(time_each(
+                lambda text: match_resume_to_job(text, company_name, job_role),
+                processed_texts, warmup_input=warmup_text, before_each=resume_cache._embeddings.clear
+            ))
+        finally:
+            (vector_store.VECTOR_STORE_DIR, vector_store._stores,
+             resume_cache.LOCAL_RESUME_STORE, resume_cache.PERSIST_RESUME_EMBEDDINGS) = saved
+
+
+def make_embeddings(n_vectors, dim, seed, n_clusters=200):
+    """Unit vectors scattered around random cluster centres, like topic-grouped resumes"""
+    rng = np.random.default_rng(seed)
+    centres = rng.normal(size=(n_clusters, dim)).astype(np.float32)
+    vectors = centres[rng.integers(n_clusters, size=n_vectors)] + rng.normal(scale=0.8, size=(n_vectors, dim)).astype(np.float32)
+    return vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+
+
+def bench_ann(n_vectors, seed, k=10, n_queries=200, dim=384):
+    """IVF build time, then query latency and recall@k against brute force for several nprobe"""
+    from ann_index import IVFIndex
+
+    vectors = make_embeddings(n_vectors + n_queries, dim, seed)
+    vectors, queries = vectors[:n_vectors], vectors[n_vectors:]
+
+    def get_vectors(rows):
+        return vectors[rows]
+
+    started = time.perf_counter()
+    index = IVFIndex.build(list(range(n_vectors)), get_vectors, seed=seed)
+    build_s = time.perf_counter() - started
+
+    exact = time_each(lambda query: np.argsort(-(vectors @ query))[:k], queries)
+    truth = [set(np.argsort(-(vectors @ query))[:k]) for query in queries]
+
+    by_nprobe = {}
+    for nprobe in sorted({1, 4, 8, 16, 32, index.nlist // 4}):
+        found = []
+        latencies = time_each(lambda query: found.append(index.search(query, k, get_vectors, nprobe)[0]), queries)
+        result = summarize(latencies)
+        result['recall'] = float(np.mean([len(truth_set & set(rows)) / k for truth_set, rows in zip(truth, found)]))
+        by_nprobe[str(nprobe)] = result
+
+    return {
+        'vectors': n_vectors,
+        'dim': dim,
+        'nlist': index.nlist,
+        'k': k,
+        'build_s': build_s,
+        'exact': summarize(exact),
+        'nprobe': by_nprobe,
+    }
+
+
+def run(n_resumes, seed, stages, company_name=None, job_role=None, batch_size=None, ann_vectors=50000):
+    """
+    Generate the corpus and run the requested stages.
+
+    Returns:
+        dict: {'meta': {...}, 'results': {stage: summary or {'skipped': reason}}}
+    """
+    from role_index import get_all_targets
+
+    if company_name is None or job_role is None:
+        company_name, job_role = get_all_targets()[0]
+
+    started = time.perf_counter()
+    corpus = generate_corpus(n_resumes + 1, seed)
+    warmup, corpus = corpus[-1], corpus[:-1]
+    texts = [doc['text'] for doc in corpus]
+    meta = {
+        'timestamp': datetime.now(timezone.utc).isoformat(),
+        'seed': seed,
+        'resumes': n_resumes,
+        'corpus_words': int(sum(len(text.split()) for text in texts)),
+        'corpus_pdf_bytes': int(sum(len(doc['pdf']) for doc in corpus)),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'cpu_count': os.cpu_count(),
+        'corpus_seconds': time.perf_counter() - started,
+    }
+
+    results = {}
+    if "preprocess" in stages:
+        results["preprocess"] = bench_preprocess(texts, warmup['text'])
+
+    processed = warmup_processed = None
+    if set(stages) & {"ats", "encode", "match"}:
+        # Later stages work on preprocessed text, as in the app
+        from text_preprocessor import preprocess_text
+        processed = [preprocess_text(text) for text in texts]
+        warmup_processed = preprocess_text(warmup['text'])
+
+    for stage in STAGES:
+        if stage not in stages or stage == "preprocess":
+            continue
+        try:
+            if stage == "extract":
+                results[stage] = bench_extract(corpus, warmup)
+            elif stage == "ats":
+                results[stage] = bench_ats(processed, warmup_processed, company_name, job_role)
+            elif stage == "encode":
+                from matcher import ENCODE_BATCH_SIZE
+                results[stage] = bench_encode(processed, warmup_processed, batch_size or ENCODE_BATCH_SIZE)
+            elif stage == "match":
+                results[stage] = bench_match(processed, warmup_processed, company_name, job_role)
+            elif stage == "ann":
+                results[stage] = bench_ann(ann_vectors, seed)
+        except ImportError as e:
+            # e.g. sentence-transformers not installed; keep the other stages
+            results[stage] = {'skipped': f"{type(e).__name__}: {e}"}
+
+    return {'meta': meta, 'results': results}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the SkillSync resume analysis pipeline")
+    parser.add_argument("--resumes", type=int, default=60, help="number of synthetic resumes (default 60)")
+    parser.add_argument("--seed", type=int, default=7, help="corpus random seed (default 7)")
+    parser.add_argument("--stages", nargs="+", choices=STAGES, default=STAGES, help="stages to run (default all)")
+    parser.add_argument("--company", help="company for ats/match (default: first in catalog)")
+    parser.add_argument("--role", help="job role for ats/match (default: first in catalog)")
+    parser.add_argument("--batch-size", type=int, help="encode batch size (default SKILLSYNC_ENCODE_BATCH_SIZE)")
+    parser.add_argument("--ann-vectors", type=int, default=50000, help="synthetic embeddings for the ann stage (default 50000)")
+    parser.add_argument("--output", help="write JSON here instead of stdout")
+    args = parser.parse_args(argv)
+
+    if (args.company is None) != (args.role is None):
+        parser.error("--company and --role must be given together")
+
+    report = run(args.resumes, args.seed, args.stages, args.company, args.role, args.batch_size, args.ann_vectors)
+    payload = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, 'w') as f:
+            f.write(payload + "\n")
+        print(f"Wrote {args.output}", file=sys.stderr)
+    else:
+        print(payload)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,404 @@
+# cohort_index.py
+import os
+import threading
+import time
+import numpy as np
+from database import (
+    get_current_resume_versions, get_current_resumes_for, RESUME_FEATURE_SUMMARY_COLUMNS,
+    save_resume_features, get_resume_feature_versions, get_resume_features
+)
+from matcher import MODEL_NAME, ENCODE_BATCH_SIZE, embed_resumes, get_role_index
+from metrics import timed
+from read_cache import TTLCache
+from skill_matcher import skill_automaton, find_skills
+from skill_matrix import skill_matrix
+from vector_store import get_store, block_dot
+from ann_index import ANN_NPROBE, IVFIndex
+
+# Seconds the loaded cohort matrices are reused before re-reading resume_features
+COHORT_CACHE_TTL = float(os.getenv("SKILLSYNC_COHORT_CACHE_TTL", "300"))
+
+# Top-N queries rank cohorts up to this size exactly; larger ones go through the IVF index
+COHORT_ANN_MIN_SIZE = int(os.getenv("SKILLSYNC_COHORT_ANN_MIN_SIZE", "50000"))
+
+
+class CohortMatrix:
+    """
+    Stored features of every current resume as matrices.
+
+    Rows are students. Embeddings are rows `positions` of `vectors` (the
+    memory-mapped cohort vector store, or an in-memory array) and
+    skill_vectors is the binary (n_students, n_skills) matrix used by skill_matrix.
+    """
+
+    def __init__(self, features, vectors, positions):
+        self.students = [f['student_email'] for f in features]
+        self.versions = [f['version_number'] for f in features]
+        self.keys = [_feature_key(f['student_email'], f['version_number']) for f in features]
+        self._rows = {student_email: row for row, student_email in enumerate(self.students)}
+        self.vectors = vectors
+        self.positions = positions
+        # Skills that have left the catalog since the resume was stored are ignored
+        self.skill_vectors = skill_matrix.resume_vectors([
+            [skill_automaton.skill_ids[skill] for skill in f['skills'] if skill in skill_automaton.skill_ids]
+            for f in features
+        ])
+
+    def __len__(self):
+        return len(self.students)
+
+    def row_of(self, student_email):
+        """Get a student's row, or None if they have no stored features"""
+        return self._rows.get(student_email)
+
+    def embeddings(self, rows):
+        """Get the embeddings of the given rows as a float32 matrix"""
+        return np.asarray(self.vectors[self.positions[rows]], dtype=np.float32)
+
+    def top_by_skills(self, company_name, job_role, k):
+        """Get the rows of the k students who have the most of a role's required skills"""
+        matched = self.skill_vectors @ skill_matrix.incidence[skill_matrix.position(company_name, job_role)]
+        k = min(k, len(matched))
+        if not k:
+            return np.empty(0, dtype=np.int64)
+        return np.argpartition(-matched, k - 1)[:k]
+
+    def rank(self, company_name, job_role, role_embedding, rows=None, limit=None):
+        """
+        Score students for one role: one matrix-vector product per score.
+
+        Args:
+            rows (np.ndarray): Rows to score (default: every student).
+            limit (int): Return only the best this many.
+
+        Returns:
+            list: Dicts with rank, student_email, resume_version, ats_score,
+                  semantic_score, combined_score, matched_count and
+                  total_skills, best combined score first.
+        """
+        if not self.students:
+            return []
+
+        row = skill_matrix.position(company_name, job_role)
+        total_skills = int(skill_matrix.required_counts[row])
+        if rows is None:
+            rows = np.arange(len(self))
+            skill_vectors = self.skill_vectors
+            semantic_scores = block_dot(self.vectors, role_embedding)[self.positions] * 100
+        else:
+            skill_vectors = self.skill_vectors[rows]
+            semantic_scores = self.embeddings(rows) @ role_embedding * 100
+        matched = skill_vectors @ skill_matrix.incidence[row]
+        ats_scores = matched * 100 / total_skills if total_skills else np.zeros(len(rows), dtype=np.float32)
+        combined_scores = (ats_scores + semantic_scores) / 2
+
+        order = np.argsort(-combined_scores, kind='stable')[:limit]
+        return [
+            {
+                'rank': rank,
+                'student_email': self.students[rows[idx]],
+                'resume_version': self.versions[rows[idx]],
+                'ats_score': round(float(ats_scores[idx]), 2),
+                'semantic_score': round(float(semantic_scores[idx]), 2),
+                'combined_score': round(float(combined_scores[idx]), 2),
+                'matched_count': int(matched[idx]),
+                'total_skills': total_skills
+            }
+            for rank, idx in enumerate(order, 1)
+        ]
+
+
+def _feature_key(student_email, version_number):
+    return f"{student_email}#{version_number}"
+
+
+def get_cohort_store():
+    """Current-resume embeddings on local disk, keyed by '<student_email>#<version_number>'"""
+    return get_store(f"cohort-{MODEL_NAME}", get_role_index().embeddings.shape[1])
+
+
+def _load_cohort_from_store(features):
+    """
+    Map every student's embedding from the cohort store, copying only
+    embeddings missing from it out of resume_features first.
+    """
+    store = get_cohort_store()
+    keys = [_feature_key(f['student_email'], f['version_number']) for f in features]
+    _, positions = store.snapshot(keys)
+
+    missing = [f['student_email'] for f, position in zip(features, positions) if position < 0]
+    if missing:
+        fetched = get_resume_features(MODEL_NAME, columns='student_email, version_number, embedding', emails=missing)
+        if fetched:
+            store.add(
+                [_feature_key(f['student_email'], f['version_number']) for f in fetched],
+                np.asarray([f['embedding'] for f in fetched], dtype=np.float32)
+            )
+
+    # Rows of replaced resume versions become dead and are dropped at compaction
+    wanted = set(keys)
+    store.remove([key for key in store.keys() if key not in wanted])
+
+    vectors, positions = store.snapshot(keys)
+    found = positions >= 0
+    return CohortMatrix([f for f, ok in zip(features, found) if ok], vectors, positions[found])
+
+
+def load_cohort():
+    """Build the cohort matrices from stored features"""
+    features = get_resume_features(MODEL_NAME, columns=RESUME_FEATURE_SUMMARY_COLUMNS)
+    try:
+        return _load_cohort_from_store(features)
+    except (OSError, ValueError, RuntimeError) as e:
+        print(f"Error using the cohort vector store, loading embeddings into memory: {e}")
+        features = get_resume_features(MODEL_NAME)
+        dim = get_role_index().embeddings.shape[1]
+        vectors = np.asarray([f['embedding'] for f in features], dtype=np.float32).reshape(len(features), dim)
+        return CohortMatrix(features, vectors, np.arange(len(features)))
+
+
+_cohort = None
+_cohort_loaded_at = 0.0
+_cohort_lock = threading.Lock()
+
+
+# Current resumes without stored features, re-read at most every COHORT_CACHE_TTL seconds
+_stale_cache = TTLCache(COHORT_CACHE_TTL)
+
+
+def invalidate_cohort():
+    """Drop the loaded cohort so the next ranking re-reads stored features"""
+    global _cohort
+    with _cohort_lock:
+        _cohort = None
+    _stale_cache.invalidate('stale_students')
+
+
+def get_cohort():
+    """Get the cohort matrices, loading stored features at most every COHORT_CACHE_TTL seconds"""
+    global _cohort, _cohort_loaded_at
+    with _cohort_lock:
+        if _cohort is None or time.monotonic() - _cohort_loaded_at > COHORT_CACHE_TTL:
+            _cohort = load_cohort()
+            _cohort_loaded_at = time.monotonic()
+        return _cohort
+
+
+@timed("rank_cohort")
+def rank_cohort(company_name, job_role, limit=None):
+    """
+    Rank every student with stored resume features for a company/job role.
+
+    No resume is encoded: stored embeddings are scored against the role
+    embedding and stored skills against the role's skill row.
+
+    Args:
+        limit (int): Return only the best this many (default: everyone).
+    """
+    role_embedding = get_role_index().rows([(company_name, job_role)])[0]
+    return get_cohort().rank(company_name, job_role, role_embedding, limit=limit)
+
+
+@timed("cohort_ats_scores")
+def cohort_ats_scores():
+    """
+    ATS fit of every student with stored features against every catalog role.
+
+    Scores come from the stored skills, so no resume is re-read or preprocessed.
+
+    Returns:
+        tuple: (CohortMatrix, np.ndarray of shape (n_students, n_roles) with
+               columns in skill_matrix.targets order)
+    """
+    cohort = get_cohort()
+    return cohort, skill_matrix.ats_scores(cohort.skill_vectors)
+
+
+# ============ NEAREST NEIGHBOURS ============
+
+_ann_index = None
+_ann_cohort = None
+_ann_lock = threading.Lock()
+
+
+def get_cohort_ann_index():
+    """
+    Get the cohort and an IVF index over its embeddings.
+
+    The index is synced (new resumes inserted, replaced ones dropped)
+    whenever the cohort is reloaded, and rebuilt once it has outgrown its cells.
+
+    Returns:
+        tuple: (CohortMatrix, IVFIndex or None for an empty cohort)
+    """
+    global _ann_index, _ann_cohort
+    cohort = get_cohort()
+    with _ann_lock:
+        if _ann_cohort is not cohort:
+            if not len(cohort):
+                _ann_index = None
+            elif _ann_index is None or _ann_index.needs_rebuild(len(cohort)):
+                _ann_index = IVFIndex.build(cohort.keys, cohort.embeddings)
+            else:
+                _ann_index.sync(cohort.keys, cohort.embeddings)
+            _ann_cohort = cohort
+        return cohort, _ann_index
+
+
+@timed("top_students_for_role")
+def top_students_for_role(company_name, job_role, k=50, nprobe=ANN_NPROBE):
+    """
+    Find the best k students for a role.
+
+    Cohorts of up to COHORT_ANN_MIN_SIZE students are ranked exactly. In
+    larger ones only the students in the nprobe cells nearest to the role
+    embedding, plus the k with the most required skills (so a strong keyword
+    match with a distant embedding is not missed), are re-ranked exactly by
+    combined (ATS + semantic) score.
+
+    Returns:
+        list: Up to k dicts as from rank_cohort.
+    """
+    if len(get_cohort()) <= COHORT_ANN_MIN_SIZE:
+        return rank_cohort(company_name, job_role, limit=k)
+
+    cohort, index = get_cohort_ann_index()
+    if index is None:
+        return []
+    role_embedding = get_role_index().rows([(company_name, job_role)])[0]
+    rows = np.union1d(
+        index.candidates(role_embedding, nprobe, min_count=k),
+        cohort.top_by_skills(company_name, job_role, k)
+    )
+    return cohort.rank(company_name, job_role, role_embedding, rows=rows, limit=k)
+
+
+@timed("similar_students")
+def similar_students(student_email, k=10, nprobe=ANN_NPROBE):
+    """
+    Find the students whose current resumes are most similar to a student's.
+
+    Cohorts of up to COHORT_ANN_MIN_SIZE students are searched exactly;
+    larger ones through the IVF index (nprobe cells).
+
+    Returns:
+        list: Up to k dicts with rank, student_email, resume_version,
+              similarity (cosine x 100) and shared_skills, most similar
+              first; [] if the student has no stored features.
+    """
+    cohort, index = get_cohort(), None
+    if len(cohort) > COHORT_ANN_MIN_SIZE:
+        cohort, index = get_cohort_ann_index()
+    row = cohort.row_of(student_email)
+    if row is None:
+        return []
+
+    query = cohort.embeddings([row])[0]
+    if index is None:
+        all_scores = block_dot(cohort.vectors, query)[cohort.positions]
+        rows = np.argsort(-all_scores, kind='stable')[:k + 1]
+        scores = all_scores[rows]
+    else:
+        rows, scores = index.search(query, k + 1, cohort.embeddings, nprobe)
+    keep = rows != row
+    rows, scores = rows[keep][:k], scores[keep][:k]
+    shared = cohort.skill_vectors[rows] @ cohort.skill_vectors[row]
+    return [
+        {
+            'rank': rank,
+            'student_email': cohort.students[other],
+            'resume_version': cohort.versions[other],
+            'similarity': round(float(score) * 100, 2),
+            'shared_skills': int(shared_count)
+        }
+        for rank, (other, score, shared_count) in enumerate(zip(rows, scores, shared), 1)
+    ]
+
+
+def save_features(resumes, batch_size=ENCODE_BATCH_SIZE):
+    """
+    Compute and store features for current resumes.
+
+    Args:
+        resumes (list): Dicts with student_email, version_number and processed_text.
+        batch_size (int): Texts per encoder forward pass (cached resumes are not re-encoded).
+
+    Returns:
+        int: Number of resumes stored.
+    """
+    # One row per student: their newest version
+    latest = {}
+    for r in resumes:
+        if r['processed_text'] and r['version_number'] >= latest.get(r['student_email'], r)['version_number']:
+            latest[r['student_email']] = r
+    resumes = list(latest.values())
+    if not resumes:
+        return 0
+
+    embeddings = embed_resumes([r['processed_text'] for r in resumes], batch_size=batch_size)
+    saved = save_resume_features([
+        {
+            'student_email': r['student_email'],
+            'version_number': r['version_number'],
+            'model_name': MODEL_NAME,
+            'skills': sorted(find_skills(r['processed_text'])),
+            'embedding': embedding.tolist()
+        }
+        for r, embedding in zip(resumes, embeddings)
+    ])
+    if saved:
+        try:
+            get_cohort_store().add(
+                [_feature_key(r['student_email'], r['version_number']) for r in resumes], embeddings
+            )
+        except (OSError, ValueError, RuntimeError) as e:
+            # The next cohort load copies them from resume_features instead
+            print(f"Error saving cohort embeddings locally: {e}")
+    invalidate_cohort()
+    return len(saved) if saved else 0
+
+
+def _find_stale_students():
+    stored = {
+        f['student_email']: (f['version_number'], f['model_name'])
+        for f in get_resume_feature_versions()
+    }
+    return [
+        r['student_email'] for r in get_current_resume_versions()
+        if stored.get(r['student_email']) != (r['version_number'], MODEL_NAME)
+    ]
+
+
+def stale_students():
+    """
+    Students whose current resume has no stored features for this model and version.
+
+    Reads both tables in full, so the answer is cached for COHORT_CACHE_TTL
+    seconds; save_features clears it.
+    """
+    return _stale_cache.get_or_load('stale_students', _find_stale_students)
+
+
+def sync_features(batch_size=ENCODE_BATCH_SIZE):
+    """
+    Store features for every current resume that is missing or out of date.
+
+    Returns:
+        int: Number of resumes (re)computed.
+    """
+    from text_preprocessor import preprocess_many
+
+    emails = _find_stale_students()
+    if not emails:
+        return 0
+
+    resumes = get_current_resumes_for(emails)
+    processed_texts = preprocess_many([r['resume_text'] or "" for r in resumes])
+    return save_features([
+        {
+            'student_email': r['student_email'],
+            'version_number': r['version_number'],
+            'processed_text': processed_text
+        }
+        for r, processed_text in zip(resumes, processed_texts)
+    ], batch_size=batch_size)
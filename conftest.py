@@ -0,0 +1,57 @@
+# conftest.py
+"""
+Shared pytest setup.
+
+The app imports some modules under names other than their file names
+(company.py as company_database, data.py as data_manager, marcher.py as
+matcher); alias them so tests import the code the same way the app does.
+"""
+import hashlib
+import importlib
+import os
+import sys
+import numpy as np
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+for alias, module in (('company_database', 'company'), ('data_manager', 'data'), ('matcher', 'marcher')):
+    if alias not in sys.modules:
+        sys.modules[alias] = importlib.import_module(module)
+
+
+class StubModel:
+    """Stand-in for the SentenceTransformer: a fixed random unit vector per distinct text"""
+
+    dim = 16
+
+    def __init__(self):
+        self.encoded = []
+
+    def encode(self, texts, batch_size=32, convert_to_numpy=True, normalize_embeddings=True):
+        self.encoded.extend(texts)
+        rows = np.array([
+            np.random.default_rng(int.from_bytes(hashlib.sha256(text.encode()).digest()[:8], 'little')).normal(size=self.dim)
+            for text in texts
+        ], dtype=np.float32).reshape(len(texts), self.dim)
+        return rows / np.linalg.norm(rows, axis=1, keepdims=True)
+
+
+@pytest.fixture
+def stub_model(tmp_path, monkeypatch):
+    """Use StubModel as the shared encoder, with role indexes and vector stores under tmp_path"""
+    import model_registry
+    import resume_cache
+    import role_index
+    import vector_store
+    matcher = sys.modules['matcher']
+
+    model = StubModel()
+    monkeypatch.setattr(model_registry, '_model', model)
+    monkeypatch.setattr(role_index, 'ROLE_INDEX_DIR', str(tmp_path / "role_index"))
+    monkeypatch.setattr(vector_store, 'VECTOR_STORE_DIR', str(tmp_path / "vectors"))
+    monkeypatch.setattr(vector_store, '_stores', {})
+    monkeypatch.setattr(resume_cache, '_embeddings', resume_cache.LRUCache(1024))
+    monkeypatch.setattr(resume_cache, 'PERSIST_RESUME_EMBEDDINGS', False)
+    monkeypatch.setattr(matcher, '_role_index', None)
+    return model
@@ -1,50 +1,136 @@
 # database.py
 import os
-from supabase import create_client, Client
+import time
+from concurrent.futures import ThreadPoolExecutor
+from metrics import timed
+from read_cache import TTLCache
+from storage import get_storage
 
-# Initialize Supabase client
-SUPABASE_URL = os.getenv("SUPABASE_URL")
-SUPABASE_KEY = os.getenv("SUPABASE_KEY")
+# Seconds that active announcements / rankings are served from memory (0 = off)
+READ_CACHE_TTL = float(os.getenv("SKILLSYNC_READ_CACHE_TTL", "60"))
 
-# Create Supabase client
-supabase: Client = create_client(SUPABASE_URL, SUPABASE_KEY)
+# Entries kept before the least recently used one is evicted
+READ_CACHE_MAX_ENTRIES = int(os.getenv("SKILLSYNC_READ_CACHE_MAX_ENTRIES", "1024"))
+
+# Shared by every session in this process; writes below invalidate it
+_read_cache = TTLCache(READ_CACHE_TTL, READ_CACHE_MAX_ENTRIES)
+
+# Threads for fetch_concurrently, shared by every session in this process
+READ_WORKERS = int(os.getenv("SKILLSYNC_READ_WORKERS", "8"))
+
+# Seconds fetch_concurrently waits for each read before giving up on it
+READ_TIMEOUT = float(os.getenv("SKILLSYNC_READ_TIMEOUT", "10"))
+
+_read_pool = ThreadPoolExecutor(max_workers=READ_WORKERS, thread_name_prefix="skillsync-read")
+
+
+def _db():
+    """Get the storage backend (Supabase or local SQLite, chosen by SKILLSYNC_STORAGE)"""
+    return get_storage()
+
+
+# Rows per request when reading a whole table; at most PostgREST's max-rows (1000 by default)
+PAGE_SIZE = 1000
+
+# Emails (or hashes) per IN (...) query, keeps PostgREST request URLs well under limits
+EMAIL_CHUNK_SIZE = 200
+
+
+def _select_all(table, columns, order_by, filters=None):
+    """Read every matching row a page at a time (order_by must be unique among them)"""
+    rows = []
+    while True:
+        page = _db().select(table, columns, filters=filters, order_by=order_by, limit=PAGE_SIZE, offset=len(rows))
+        rows.extend(page)
+        if len(page) < PAGE_SIZE:
+            return rows
+
+
+# fetch_concurrently's result for a read that failed or timed out and has no default
+READ_FAILED = object()
+
+
+def fetch_concurrently(calls, defaults=None, timeout=READ_TIMEOUT):
+    """
+    Run independent reads at the same time and wait for all of them.
+
+    Args:
+        calls (dict): name -> (function, arg, ...), e.g. {'resume': (get_current_resume, email)}.
+        defaults (dict): name -> value used if that read fails or times out.
+        timeout (float): Seconds allowed for each read, counted from the start.
+
+    Returns:
+        dict: name -> result of the read, its default, or READ_FAILED
+              (never None for a read that did not finish).
+    """
+    futures = {name: _read_pool.submit(call[0], *call[1:]) for name, call in calls.items()}
+
+    deadline = time.monotonic() + timeout
+    results = {}
+    for name, future in futures.items():
+        try:
+            results[name] = future.result(timeout=max(0.0, deadline - time.monotonic()))
+        except Exception as e:
+            # Free the pool thread if the read never started; a running one
+            # ends at the backend's request timeout (SKILLSYNC_SUPABASE_TIMEOUT)
+            future.cancel()
+            print(f"Error in concurrent read '{name}': {e!r}")
+            results[name] = (defaults or {}).get(name, READ_FAILED)
+    return results
+
+
+def get_read_cache_stats():
+    """Get hit/miss counters of the announcements/rankings read cache"""
+    return _read_cache.stats()
 
 
 # ============ STUDENT FUNCTIONS ============
 
+@timed("db_insert_student")
 def insert_student(email, name, password_hash, year, branch):
     """Register a new student in the database"""
     try:
-        response = supabase.table('students').insert({
+        result = _db().insert('students', {
             "email": email,
             "name": name,
             "password": password_hash,
             "year": year,
             "branch": branch
-        }).execute()
-        return response.data
+        })
+        return result
     except Exception as e:
         print(f"Error inserting student: {e}")
         return None
 
 
+@timed("db_fetch_student")
 def fetch_student(email):
     """Get student data by email"""
     try:
-        response = supabase.table('students').select("*").eq('email', email).execute()
-        if response.data and len(response.data) > 0:
-            return response.data[0]
+        rows = _db().select('students', "*", filters={'email': email})
+        if rows:
+            return rows[0]
         return None
     except Exception as e:
         print(f"Error fetching student: {e}")
         return None
 
 
+@timed("db_update_student_password")
+def update_student_password(email, password_hash):
+    """Replace a student's stored password hash"""
+    try:
+        return _db().update('students', {'password': password_hash}, {'email': email})
+    except Exception as e:
+        print(f"Error updating student password: {e}")
+        return None
+
+
+@timed("db_get_all_students")
 def get_all_students():
     """Get all students from database"""
     try:
-        response = supabase.table('students').select("*").execute()
-        return response.data
+        return _db().select('students', "*")
     except Exception as e:
         print(f"Error fetching all students: {e}")
         return []
@@ -52,91 +138,257 @@ def get_all_students():
 
 # ============ PLACEMENT CELL FUNCTIONS ============
 
+@timed("db_insert_placement_officer")
 def insert_placement_officer(email, name, password_hash):
     """Register a new placement cell officer in the database"""
     try:
-        response = supabase.table('placement_officers').insert({
+        result = _db().insert('placement_officers', {
             "email": email,
             "name": name,
             "password": password_hash
-        }).execute()
-        return response.data
+        })
+        return result
     except Exception as e:
         print(f"Error inserting placement officer: {e}")
         return None
 
 
+@timed("db_fetch_placement_officer")
 def fetch_placement_officer(email):
     """Get placement officer data by email"""
     try:
-        response = supabase.table('placement_officers').select("*").eq('email', email).execute()
-        if response.data and len(response.data) > 0:
-            return response.data[0]
+        rows = _db().select('placement_officers', "*", filters={'email': email})
+        if rows:
+            return rows[0]
         return None
     except Exception as e:
         print(f"Error fetching placement officer: {e}")
         return None
+
+
+@timed("db_update_placement_officer_password")
+def update_placement_officer_password(email, password_hash):
+    """Replace a placement officer's stored password hash"""
+    try:
+        return _db().update('placement_officers', {'password': password_hash}, {'email': email})
+    except Exception as e:
+        print(f"Error updating placement officer password: {e}")
+        return None
 # Add to database.py
 
 # ============ RESUME MANAGEMENT FUNCTIONS ============
 
+# Everything but resume_text; the text is loaded on demand with get_resume_text
+RESUME_SUMMARY_COLUMNS = 'id, student_email, resume_filename, version_number, is_current, uploaded_at'
+
+@timed("db_save_student_resume")
 def save_student_resume(student_email, resume_text, filename):
     """Save a new resume version for student"""
     try:
-        # Get current max version number
-        response = supabase.table('student_resumes').select('version_number').eq('student_email', student_email).order('version_number', desc=True).limit(1).execute()
-        
-        next_version = 1
-        if response.data and len(response.data) > 0:
-            next_version = response.data[0]['version_number'] + 1
-            
-            # Mark all previous resumes as not current
-            supabase.table('student_resumes').update({'is_current': False}).eq('student_email', student_email).execute()
-        
-        # Insert new resume
-        result = supabase.table('student_resumes').insert({
+        # Versioning happens atomically in the store
+        return _db().save_resume_versions([{
             'student_email': student_email,
             'resume_text': resume_text,
-            'resume_filename': filename,
-            'version_number': next_version,
-            'is_current': True
-        }).execute()
-        
-        return result.data
+            'resume_filename': filename
+        }])
     except Exception as e:
         print(f"Error saving resume: {e}")
         return None
 
 
+@timed("db_save_resumes_bulk")
+def save_resumes_bulk(resumes):
+    """
+    Save many new resume versions, and optionally their analyses, atomically.
+
+    The whole batch is one transaction (one round trip): either every
+    resume and analysis is saved or none is.
+
+    Args:
+        resumes (list): Dicts with student_email, resume_text and resume_filename,
+            plus an optional 'analysis' dict (the fields of save_analysis_result
+            other than student_email, resume_version and resume_filename).
+
+    Returns:
+        list: The saved resume rows (with version_number), in input order, or None on error.
+    """
+    try:
+        return _db().save_resume_versions(list(resumes))
+    except Exception as e:
+        print(f"Error saving resumes: {e}")
+        return None
+
+
+@timed("db_get_current_resume")
 def get_current_resume(student_email):
-    """Get student's current/latest resume"""
+    """Get student's current/latest resume (without resume_text)"""
     try:
-        response = supabase.table('student_resumes').select('*').eq('student_email', student_email).eq('is_current', True).execute()
-        if response.data and len(response.data) > 0:
-            return response.data[0]
+        rows = _db().select('student_resumes', RESUME_SUMMARY_COLUMNS, filters={'student_email': student_email, 'is_current': True})
+        if rows:
+            return rows[0]
         return None
     except Exception as e:
         print(f"Error fetching current resume: {e}")
         return None
 
 
+@timed("db_get_all_resume_versions")
 def get_all_resume_versions(student_email):
-    """Get all resume versions for a student"""
+    """Get all resume versions for a student (without resume_text)"""
     try:
-        response = supabase.table('student_resumes').select('*').eq('student_email', student_email).order('version_number', desc=True).execute()
-        return response.data if response.data else []
+        return _db().select('student_resumes', RESUME_SUMMARY_COLUMNS, filters={'student_email': student_email}, order_by='version_number', desc=True)
     except Exception as e:
         print(f"Error fetching resume versions: {e}")
         return []
 
 
+@timed("db_get_resume_text")
+def get_resume_text(student_email, version_number):
+    """Get the full text of one resume version"""
+    try:
+        rows = _db().select('student_resumes', 'resume_text', filters={'student_email': student_email, 'version_number': version_number})
+        if rows:
+            return rows[0]['resume_text']
+        return None
+    except Exception as e:
+        print(f"Error fetching resume text: {e}")
+        return None
+
+
+@timed("db_get_all_current_resumes")
+def get_all_current_resumes():
+    """Get every student's current resume"""
+    try:
+        return _select_all(
+            'student_resumes', 'student_email, resume_text, resume_filename, version_number',
+            order_by='student_email', filters={'is_current': True}
+        )
+    except Exception as e:
+        print(f"Error fetching current resumes: {e}")
+        return []
+
+
+@timed("db_get_current_resume_versions")
+def get_current_resume_versions():
+    """Get every student's current resume version (without resume_text)"""
+    try:
+        return _select_all('student_resumes', 'student_email, version_number', order_by='student_email', filters={'is_current': True})
+    except Exception as e:
+        print(f"Error fetching current resume versions: {e}")
+        return []
+
+
+@timed("db_get_current_resumes_for")
+def get_current_resumes_for(emails):
+    """Get the current resume (with text) of each given student"""
+    try:
+        emails = list(dict.fromkeys(emails))
+        resumes = []
+        for start in range(0, len(emails), EMAIL_CHUNK_SIZE):
+            resumes.extend(_db().select(
+                'student_resumes', 'student_email, resume_text, version_number',
+                filters={'is_current': True}, in_filters={'student_email': emails[start:start + EMAIL_CHUNK_SIZE]}
+            ))
+        return resumes
+    except Exception as e:
+        print(f"Error fetching current resumes: {e}")
+        return []
+
+
+# ============ RESUME FEATURE FUNCTIONS ============
+
+@timed("db_save_resume_features")
+def save_resume_features(features):
+    """Store current-resume features (student_email, version_number, model_name, skills, embedding)"""
+    try:
+        return _db().upsert('resume_features', features, on_conflict='student_email')
+    except Exception as e:
+        print(f"Error saving resume features: {e}")
+        return None
+
+
+@timed("db_get_resume_feature_versions")
+def get_resume_feature_versions():
+    """Get which resume version and model each student's stored features come from"""
+    try:
+        return _select_all('resume_features', 'student_email, version_number, model_name', order_by='student_email')
+    except Exception as e:
+        print(f"Error fetching resume feature versions: {e}")
+        return []
+
+
+# Everything but the embedding; cohort ranking reads embeddings from the local vector store
+RESUME_FEATURE_SUMMARY_COLUMNS = 'student_email, version_number, skills'
+
+@timed("db_get_resume_features")
+def get_resume_features(model_name, columns='student_email, version_number, skills, embedding', emails=None):
+    """Get stored features for a model, for every student or only the given ones"""
+    try:
+        if emails is None:
+            return _select_all('resume_features', columns, order_by='student_email', filters={'model_name': model_name})
+        emails = list(dict.fromkeys(emails))
+        features = []
+        for start in range(0, len(emails), EMAIL_CHUNK_SIZE):
+            features.extend(_db().select(
+                'resume_features', columns,
+                filters={'model_name': model_name}, in_filters={'student_email': emails[start:start + EMAIL_CHUNK_SIZE]}
+            ))
+        return features
+    except Exception as e:
+        print(f"Error fetching resume features: {e}")
+        return []
+
+
+# ============ RESUME EMBEDDING FUNCTIONS ============
+
+@timed("db_get_resume_embeddings")
+def get_resume_embeddings(content_hashes, model_name):
+    """Get stored resume embeddings by content hash, as {content_hash: embedding}"""
+    try:
+        content_hashes = list(dict.fromkeys(content_hashes))
+        embeddings = {}
+        for start in range(0, len(content_hashes), EMAIL_CHUNK_SIZE):
+            rows = _db().select(
+                'resume_embeddings', 'content_hash, embedding',
+                filters={'model_name': model_name}, in_filters={'content_hash': content_hashes[start:start + EMAIL_CHUNK_SIZE]}
+            )
+            embeddings.update((row['content_hash'], row['embedding']) for row in rows)
+        return embeddings
+    except Exception as e:
+        print(f"Error fetching resume embeddings: {e}")
+        return {}
+
+
+@timed("db_save_resume_embeddings")
+def save_resume_embeddings(embeddings, model_name):
+    """Store resume embeddings given as {content_hash: embedding}"""
+    try:
+        result = _db().upsert('resume_embeddings', [
+            {
+                'content_hash': content_hash,
+                'model_name': model_name,
+                'embedding': embedding
+            }
+            for content_hash, embedding in embeddings.items()
+        ], on_conflict='content_hash,model_name')
+        return result
+    except Exception as e:
+        print(f"Error saving resume embeddings: {e}")
+        return None
+
+
 # ============ ANALYSIS HISTORY FUNCTIONS ============
 
+# Everything but the feedback blob, which list views never show
+ANALYSIS_SUMMARY_COLUMNS = ('id, student_email, company_name, job_role, resume_version, resume_filename, '
+                            'ats_score, semantic_score, combined_score, matched_skills, missing_skills, analyzed_at')
+
+@timed("db_save_analysis_result")
 def save_analysis_result(student_email, company_name, job_role, resume_version, resume_filename, 
                          ats_score, semantic_score, combined_score, matched_skills, missing_skills, feedback):
     """Save analysis result to history"""
     try:
-        result = supabase.table('analysis_history').insert({
+        result = _db().insert('analysis_history', {
             'student_email': student_email,
             'company_name': company_name,
             'job_role': job_role,
@@ -148,192 +400,317 @@ def save_analysis_result(student_email, company_name, job_role, resume_version,
             'matched_skills': matched_skills,
             'missing_skills': missing_skills,
             'feedback': feedback
-        }).execute()
-        return result.data
+        })
+        return result
     except Exception as e:
         print(f"Error saving analysis: {e}")
         return None
 
 
+@timed("db_get_student_analysis_history")
 def get_student_analysis_history(student_email):
-    """Get all analysis history for a student, grouped by company"""
+    """Get all analysis history for a student, grouped by company (without feedback)"""
     try:
-        response = supabase.table('analysis_history').select('*').eq('student_email', student_email).order('analyzed_at', desc=True).execute()
-        return response.data if response.data else []
+        return _db().select('analysis_history', ANALYSIS_SUMMARY_COLUMNS, filters={'student_email': student_email}, order_by='analyzed_at', desc=True)
     except Exception as e:
         print(f"Error fetching analysis history: {e}")
         return []
 
 
+@timed("db_get_company_specific_history")
 def get_company_specific_history(student_email, company_name):
-    """Get all analyses for a specific company"""
+    """Get all analyses for a specific company (without feedback)"""
     try:
-        response = supabase.table('analysis_history').select('*').eq('student_email', student_email).eq('company_name', company_name).order('analyzed_at', desc=True).execute()
-        return response.data if response.data else []
+        return _db().select('analysis_history', ANALYSIS_SUMMARY_COLUMNS, filters={'student_email': student_email, 'company_name': company_name}, order_by='analyzed_at', desc=True)
     except Exception as e:
         print(f"Error fetching company history: {e}")
         return []
 
 
+@timed("db_get_latest_analysis_for_company")
 def get_latest_analysis_for_company(student_email, company_name):
-    """Get the most recent analysis for a company"""
+    """Get the most recent analysis for a company (without feedback)"""
     try:
-        response = supabase.table('analysis_history').select('*').eq('student_email', student_email).eq('company_name', company_name).order('analyzed_at', desc=True).limit(1).execute()
-        if response.data and len(response.data) > 0:
-            return response.data[0]
+        rows = _db().select('analysis_history', ANALYSIS_SUMMARY_COLUMNS, filters={'student_email': student_email, 'company_name': company_name}, order_by='analyzed_at', desc=True, limit=1)
+        if rows:
+            return rows[0]
         return None
     except Exception as e:
         print(f"Error fetching latest analysis: {e}")
         return None
+
+
 # ============ ANNOUNCEMENT FUNCTIONS ============
 
+@timed("db_create_announcement")
 def create_announcement(title, message, posted_by_email, posted_by_name):
     """Create a new announcement from placement cell"""
     try:
-        result = supabase.table('announcements').insert({
+        result = _db().insert('announcements', {
             'title': title,
             'message': message,
             'posted_by': posted_by_email,
             'posted_by_name': posted_by_name,
             'is_active': True
-        }).execute()
-        return result.data
+        })
+        _read_cache.invalidate('active_announcements')
+        return result
     except Exception as e:
         print(f"Error creating announcement: {e}")
         return None
 
 
+@timed("db_get_active_announcements")
 def get_active_announcements():
     """Get all active announcements (for students to see)"""
     try:
-        response = supabase.table('announcements').select('*').eq('is_active', True).order('created_at', desc=True).execute()
-        return response.data if response.data else []
+        return _read_cache.get_or_load('active_announcements', lambda: _db().select(
+            'announcements', '*', filters={'is_active': True}, order_by='created_at', desc=True
+        ))
     except Exception as e:
         print(f"Error fetching announcements: {e}")
         return []
 
 
+@timed("db_get_all_announcements")
 def get_all_announcements():
     """Get all announcements (for placement cell to manage)"""
     try:
-        response = supabase.table('announcements').select('*').order('created_at', desc=True).execute()
-        return response.data if response.data else []
+        return _db().select('announcements', '*', order_by='created_at', desc=True)
     except Exception as e:
         print(f"Error fetching all announcements: {e}")
         return []
 
 
+@timed("db_delete_announcement")
 def delete_announcement(announcement_id):
     """Delete an announcement"""
     try:
-        result = supabase.table('announcements').delete().eq('id', announcement_id).execute()
-        return result.data
+        result = _db().delete('announcements', {'id': announcement_id})
+        _read_cache.invalidate('active_announcements')
+        return result
     except Exception as e:
         print(f"Error deleting announcement: {e}")
         return None
 
 
+@timed("db_toggle_announcement_status")
 def toggle_announcement_status(announcement_id, is_active):
     """Activate or deactivate an announcement"""
     try:
-        result = supabase.table('announcements').update({'is_active': is_active}).eq('id', announcement_id).execute()
-        return result.data
+        result = _db().update('announcements', {'is_active': is_active}, {'id': announcement_id})
+        _read_cache.invalidate('active_announcements')
+        return result
     except Exception as e:
         print(f"Error toggling announcement: {e}")
         return None
 
 # ============ PUBLISHED RANKINGS FUNCTIONS ============
 
+# Ranking headers without the legacy rankings JSON; entries live in ranking_entries
+RANKING_SUMMARY_COLUMNS = ('id, title, company_name, job_role, description, '
+                           'published_by, published_by_name, is_active, created_at')
+
+# What other students see of a leaderboard row (no raw emails)
+RANKING_ENTRY_COLUMNS = 'rank, student_display, combined_score, ats_score, semantic_score'
+
+ENTRY_CHUNK_SIZE = 500
+
+
+def _mask_email(email):
+    """Anonymize an email (or any other identifier) for display to other students"""
+    local, at, domain = (email or "").partition('@')
+    # Show at most half of the local part, so short names are not given away
+    return local[:min(3, len(local) // 2)] + "***" + at + domain
+
+
+@timed("db_publish_ranking")
 def publish_ranking(title, company_name, job_role, description, rankings, published_by_email, published_by_name):
     """Publish student rankings for a company/role"""
     try:
-        result = supabase.table('published_rankings').insert({
+        result = _db().insert('published_rankings', {
             'title': title,
             'company_name': company_name,
             'job_role': job_role,
             'description': description,
-            'rankings': rankings,  # JSON format
+            'rankings': [],  # Entries are stored in ranking_entries
             'published_by': published_by_email,
             'published_by_name': published_by_name,
             'is_active': True
-        }).execute()
-        return result.data
+        })
+        ranking_id = result[0]['id']
+
+        entries = [
+            {
+                'ranking_id': ranking_id,
+                'rank': r['rank'],
+                'student_email': r['student_email'],
+                'student_name': r.get('student_name'),
+                'student_display': _mask_email(r['student_email']),
+                'combined_score': r['combined_score'],
+                'ats_score': r['ats_score'],
+                'semantic_score': r['semantic_score']
+            }
+            for r in rankings
+        ]
+        try:
+            for start in range(0, len(entries), ENTRY_CHUNK_SIZE):
+                _db().insert('ranking_entries', entries[start:start + ENTRY_CHUNK_SIZE])
+        except Exception:
+            # Don't leave a half-published ranking behind
+            _db().delete('ranking_entries', {'ranking_id': ranking_id})
+            _db().delete('published_rankings', {'id': ranking_id})
+            raise
+
+        _read_cache.invalidate('active_rankings')
+        return result
     except Exception as e:
         print(f"Error publishing ranking: {e}")
         return None
 
 
+@timed("db_get_active_rankings")
 def get_active_rankings():
-    """Get all active published rankings"""
+    """Get all active published rankings (headers only)"""
     try:
-        response = supabase.table('published_rankings').select('*').eq('is_active', True).order('created_at', desc=True).execute()
-        return response.data if response.data else []
+        return _read_cache.get_or_load('active_rankings', lambda: _db().select(
+            'published_rankings', RANKING_SUMMARY_COLUMNS, filters={'is_active': True}, order_by='created_at', desc=True
+        ))
     except Exception as e:
         print(f"Error fetching rankings: {e}")
         return []
 
 
+@timed("db_get_all_rankings")
 def get_all_rankings():
-    """Get all published rankings (for placement cell)"""
+    """Get all published rankings (headers only, for placement cell)"""
     try:
-        response = supabase.table('published_rankings').select('*').order('created_at', desc=True).execute()
-        return response.data if response.data else []
+        return _db().select('published_rankings', RANKING_SUMMARY_COLUMNS, order_by='created_at', desc=True)
     except Exception as e:
         print(f"Error fetching all rankings: {e}")
         return []
 
 
+@timed("db_get_student_ranks")
+def get_student_ranks(ranking_ids, student_email):
+    """Get a student's entry in each of the given rankings, as {ranking_id: entry}"""
+    try:
+        ranking_ids = list(ranking_ids)
+        if not ranking_ids:
+            return {}
+        rows = _db().select(
+            'ranking_entries', 'ranking_id, ' + RANKING_ENTRY_COLUMNS,
+            filters={'student_email': student_email}, in_filters={'ranking_id': ranking_ids}
+        )
+        return {row['ranking_id']: row for row in rows}
+    except Exception as e:
+        print(f"Error fetching student ranks: {e}")
+        return {}
+
+
+@timed("db_get_ranking_entries")
+def get_ranking_entries(ranking_id, limit=25, offset=0, columns=RANKING_ENTRY_COLUMNS):
+    """Get one page of a ranking's entries (anonymized by default), best rank first"""
+    try:
+        # Published entries never change, so pages can be shared between students
+        return _read_cache.get_or_load(('ranking_entries', ranking_id, limit, offset, columns), lambda: _db().select(
+            'ranking_entries', columns, filters={'ranking_id': ranking_id},
+            order_by='rank', limit=limit, offset=offset
+        ))
+    except Exception as e:
+        print(f"Error fetching ranking entries: {e}")
+        return []
+
+
+@timed("db_get_ranking_size")
+def get_ranking_size(ranking_id):
+    """Get the number of students in a ranking (ranks run 1..N)"""
+    try:
+        # Published entries never change, so the size is cached like their pages
+        rows = _read_cache.get_or_load(('ranking_size', ranking_id), lambda: _db().select(
+            'ranking_entries', 'rank', filters={'ranking_id': ranking_id}, order_by='rank', desc=True, limit=1
+        ))
+        return rows[0]['rank'] if rows else 0
+    except Exception as e:
+        print(f"Error fetching ranking size: {e}")
+        return 0
+
+
+@timed("db_delete_ranking")
 def delete_ranking(ranking_id):
     """Delete a published ranking"""
     try:
-        result = supabase.table('published_rankings').delete().eq('id', ranking_id).execute()
-        return result.data
+        _db().delete('ranking_entries', {'ranking_id': ranking_id})
+        result = _db().delete('published_rankings', {'id': ranking_id})
+        _read_cache.invalidate('active_rankings')
+        _read_cache.invalidate_matching(
+            lambda key: isinstance(key, tuple) and key[0] in ('ranking_entries', 'ranking_size') and key[1] == ranking_id
+        )
+        return result
     except Exception as e:
         print(f"Error deleting ranking: {e}")
         return None
 
 
-def get_all_student_analyses(company_name, job_role):
-    """Get all student analyses for a specific company and job role"""
+@timed("db_get_all_student_analyses")
+def get_all_student_analyses(company_name, job_role, limit=None, offset=0):
+    """
+    Get LATEST analysis per student for a specific company and job role,
+    best combined score first.
+
+    Deduplication happens in the store (latest_student_analyses view), so
+    the payload grows with the number of students, not with re-analyses.
+    Use limit/offset to page through large cohorts; id breaks score ties
+    so pages neither overlap nor skip rows.
+    """
     try:
-        response = supabase.table('analysis_history').select('*').eq('company_name', company_name).eq('job_role', job_role).order('combined_score', desc=True).execute()
-        return response.data if response.data else []
+        return _db().select(
+            'latest_student_analyses', ANALYSIS_SUMMARY_COLUMNS,
+            filters={'company_name': company_name, 'job_role': job_role},
+            order_by=['combined_score', 'id'], desc=True, limit=limit, offset=offset
+        )
     except Exception as e:
         print(f"Error fetching student analyses: {e}")
         return []
-def get_all_student_analyses(company_name, job_role):
-    """Get LATEST analysis per student for a specific company and job role"""
-    try:
-        # Get all analyses for this company/role
-        response = supabase.table('analysis_history').select('*').eq('company_name', company_name).eq('job_role', job_role).order('analyzed_at', desc=True).execute()
-        
-        if not response.data:
-            return []
-        
-        # Filter to get only the LATEST analysis per student
-        seen_students = set()
-        latest_analyses = []
-        
-        for analysis in response.data:
-            student_email = analysis['student_email']
-            if student_email not in seen_students:
-                seen_students.add(student_email)
-                latest_analyses.append(analysis)
-        
-        # Sort by combined score descending
-        latest_analyses.sort(key=lambda x: x['combined_score'], reverse=True)
-        
-        return latest_analyses
+
+
+@timed("db_count_student_analyses")
+def count_student_analyses(company_name, job_role):
+    """Count students with at least one analysis for a company and job role"""
+    try:
+        return _db().count(
+            'latest_student_analyses',
+            filters={'company_name': company_name, 'job_role': job_role}
+        )
     except Exception as e:
-        print(f"Error fetching student analyses: {e}")
-        return []
+        print(f"Error counting student analyses: {e}")
+        return 0
+
+
+@timed("db_get_student_by_email")
 def get_student_by_email(email):
     """Get student details by email"""
     try:
-        response = supabase.table('students').select('*').eq('email', email).execute()
-        if response.data and len(response.data) > 0:
-            return response.data[0]
+        rows = _db().select('students', '*', filters={'email': email})
+        if rows:
+            return rows[0]
         return None
     except Exception as e:
         print(f"Error fetching student: {e}")
         return None
+
+
+@timed("db_get_students_by_emails")
+def get_students_by_emails(emails):
+    """Get student details for many emails at once, as {email: student}"""
+    try:
+        unique_emails = list(dict.fromkeys(email for email in emails if email))
+        students = {}
+        for start in range(0, len(unique_emails), EMAIL_CHUNK_SIZE):
+            chunk = unique_emails[start:start + EMAIL_CHUNK_SIZE]
+            for student in _db().select('students', 'email, name, year, branch', in_filters={'email': chunk}):
+                students[student['email']] = student
+        return students
+    except Exception as e:
+        print(f"Error fetching students: {e}")
+        return {}
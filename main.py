@@ -1,104 +1,339 @@
-# Home.py
-import streamlit as st
-import nltk
-
-# Download NLTK data on first run
-try:
-    nltk.data.find('tokenizers/punkt')
-except LookupError:
-    nltk.download('punkt')
-    nltk.download('punkt_tab')
-    nltk.download('stopwords')
-    nltk.download('wordnet')
-    nltk.download('omw-1.4')
-
-# Rest of your existing Home.py code continues below...
 # main.py
+"""
+Headless batch scorer: score a folder or zip of resume PDFs against
+company/job roles outside the Streamlit app.
+
+    python main.py resumes/ --targets all --output scores.csv
+    python main.py drive.zip --targets "Infosys::Systems Engineer" --output scores.jsonl
+    python main.py resumes/ --targets all --output scores.xlsx --workers 8
+
+Extraction and preprocessing run in a process pool, encoding runs in
+batches, and rows are appended to the output after every chunk of files.
+Progress is checkpointed next to the output (<output>.checkpoint), so an
+interrupted run picks up where it stopped when started again with the
+same arguments (use --fresh to start over). Excel output is streamed to
+<output>.partial.jsonl and converted once every file is scored.
+
+A file whose extraction times out or crashes its worker gets an error row
+but is left out of the checkpoint, so running again retries just those files.
+"""
+import argparse
+import csv
+import io
+import json
 import os
-from pdf_processor import extract_text_from_pdf, create_dummy_pdf
-from text_preprocessor import preprocess_text
-from data_manager import JOB_SKILL_DATABASE
-from matcher import match_resume_to_job
+import sys
+import time
+import zipfile
+from worker_pool import WorkerPool, TIMED_OUT, WORKER_CRASHED
+
+# Files handed to the pool (and then encoded) per round; also the checkpoint interval
+CHUNK_SIZE = int(os.getenv("SKILLSYNC_CLI_CHUNK_SIZE", "64"))
+
+# Resumes with less extracted text than this are reported as unreadable
+MIN_TEXT_LENGTH = 50
 
-def process_resume_from_pdf(pdf_path):
+OUTPUT_FIELDS = [
+    'file', 'company', 'job_role', 'ats_score', 'semantic_score', 'combined_score',
+    'matched_skills', 'missing_skills', 'total_skills', 'error'
+]
+
+
+# ============ INPUT ============
+
+def list_inputs(input_path):
     """
-    Extracts text from a PDF resume and then preprocesses it.
+    List the PDFs in a directory (recursively) or zip file.
+
+    Returns:
+        list: (file_id, source) pairs sorted by file_id, where source is a
+              path for directories and the member name for zips.
     """
-    raw_text = extract_text_from_pdf(pdf_path)
-    if raw_text:
-        processed_text = preprocess_text(raw_text)
-        return processed_text
-    return ""
+    if zipfile.is_zipfile(input_path):
+        with zipfile.ZipFile(input_path) as archive:
+            names = [name for name in archive.namelist() if name.lower().endswith('.pdf') and not name.endswith('/')]
+        return sorted((name, name) for name in names)
 
-if __name__ == "__main__":
-    print("=" * 60)
-    print("SMART HIRING SYSTEM - TESTING PHASE")
-    print("=" * 60)
-    
-    # Create a dummy PDF for testing
-    dummy_pdf_content = """Software Engineer with 3 years of experience in Python development and machine learning.
-Skills include Python, Java, SQL, Data Structures, Algorithms, Cloud Computing (AWS), Web Development.
-Completed projects in data analysis and automated testing.
-Seeking a challenging software engineering role."""
-    
-    dummy_pdf_path = os.path.join("data", "sample_resume_for_test.pdf")
-    
-    # Ensure data directory exists
-    os.makedirs("data", exist_ok=True)
-    
-    print("\n[1/3] Creating and processing sample resume...")
-    try:
-        create_dummy_pdf(dummy_pdf_path, dummy_pdf_content)
-        print(f"✓ Created dummy PDF at: {dummy_pdf_path}")
-        
-        processed_resume_text = process_resume_from_pdf(dummy_pdf_path)
-        
-        if processed_resume_text:
-            print(f"✓ Successfully extracted and preprocessed resume")
-            print(f"   Processed text preview: {processed_resume_text[:100]}...")
+    if os.path.isdir(input_path):
+        found = []
+        for root, _, files in os.walk(input_path):
+            for name in files:
+                if name.lower().endswith('.pdf'):
+                    path = os.path.join(root, name)
+                    found.append((os.path.relpath(path, input_path), path))
+        return sorted(found)
+
+    raise ValueError(f"{input_path} is neither a directory nor a zip file")
+
+
+def _extract_and_preprocess(source):
+    """Extract and preprocess one resume (runs inside pool workers)"""
+    from pdf_processor import extract_text_from_pdf, extract_text_from_pdf_bytes
+    from text_preprocessor import preprocess_text
+
+    raw_text = extract_text_from_pdf_bytes(source) if isinstance(source, bytes) else extract_text_from_pdf(source)
+    if not raw_text or len(raw_text.strip()) < MIN_TEXT_LENGTH:
+        return None
+    return preprocess_text(raw_text)
+
+
+# ============ OUTPUT ============
+
+class ResultWriter:
+    """Append-only CSV or JSONL writer that reports its byte size for checkpoints"""
+
+    def __init__(self, path, fmt):
+        self.fmt = fmt
+        self.file = open(path, 'ab')
+        self.needs_header = fmt == 'csv' and self.file.tell() == 0
+
+    def write(self, rows):
+        buffer = io.StringIO()
+        if self.fmt == 'csv':
+            writer = csv.DictWriter(buffer, fieldnames=OUTPUT_FIELDS)
+            if self.needs_header:
+                writer.writeheader()
+                self.needs_header = False
+            for row in rows:
+                writer.writerow({
+                    **row,
+                    'matched_skills': '; '.join(row['matched_skills']),
+                    'missing_skills': '; '.join(row['missing_skills'])
+                })
         else:
-            print("✗ Failed to process the sample resume.")
-            exit(1)
-    
-    except Exception as e:
-        print(f"✗ An error occurred: {e}")
-        exit(1)
-    
-    print("\n[2/3] Matching resume against job roles...")
-    
-    # Test matching for Software Engineer role
-    test_job_role = "Software Engineer"
-    print(f"\n--- Matching for: {test_job_role} ---")
-    
-    matching_result = match_resume_to_job(processed_resume_text, test_job_role)
-    
-    print(f"\n📊 MATCHING RESULTS:")
-    print(f"   ATS Score (Keyword Match): {matching_result['ats_score']}%")
-    print(f"   Semantic Similarity Score: {matching_result['semantic_score']}%")
-    print(f"   Combined Score: {matching_result['combined_score']}%")
-    
-    print(f"\n✓ Matched Skills ({len(matching_result['matched_skills'])}/{matching_result['total_skills']}):")
-    for skill in matching_result['matched_skills'][:10]:  # Show first 10
-        print(f"   • {skill}")
-    
-    print(f"\n✗ Missing Skills ({len(matching_result['missing_skills'])}):")
-    for skill in matching_result['missing_skills'][:5]:  # Show first 5
-        print(f"   • {skill}")
-    
-    print(f"\n💡 PERSONALIZED FEEDBACK (Top 3 recommendations):")
-    count = 0
-    for skill, course in matching_result['feedback'].items():
-        if count >= 3:
-            break
-        print(f"   {count+1}. {skill}: {course}")
-        count += 1
-    
-    print("\n[3/3] Cleaning up...")
-    if os.path.exists(dummy_pdf_path):
-        os.remove(dummy_pdf_path)
-        print(f"✓ Cleaned up {dummy_pdf_path}")
-    
-    print("\n" + "=" * 60)
-    print("✓ ALL TESTS COMPLETED SUCCESSFULLY!")
-    print("=" * 60)
-    print("\nNext step: Run the Streamlit app with 'streamlit run app.py'")
+            for row in rows:
+                buffer.write(json.dumps(row, ensure_ascii=False) + "\n")
+
+        self.file.write(buffer.getvalue().encode('utf-8'))
+        self.file.flush()
+        os.fsync(self.file.fileno())
+        return self.file.tell()
+
+    def close(self):
+        self.file.close()
+
+
+def _load_checkpoint(checkpoint_path):
+    """Get (scored file ids, output size at the last checkpoint)"""
+    done = set()
+    output_bytes = 0
+    with open(checkpoint_path) as f:
+        for line in f:
+            try:
+                entry = json.loads(line)
+            except ValueError:
+                break  # Torn last line from an interrupted write
+            done.update(entry['files'])
+            output_bytes = entry['output_bytes']
+    return done, output_bytes
+
+
+def _append_checkpoint(checkpoint_path, file_ids, output_bytes):
+    with open(checkpoint_path, 'a') as f:
+        f.write(json.dumps({'files': file_ids, 'output_bytes': output_bytes}) + "\n")
+        f.flush()
+        os.fsync(f.fileno())
+
+
+def _write_excel(jsonl_path, excel_path):
+    import pandas as pd
+
+    with open(jsonl_path, encoding='utf-8') as f:
+        rows = [json.loads(line) for line in f if line.strip()]
+    df = pd.DataFrame(rows, columns=OUTPUT_FIELDS)
+    for column in ('matched_skills', 'missing_skills'):
+        df[column] = df[column].map(lambda skills: '; '.join(skills) if isinstance(skills, list) else skills)
+    df.to_excel(excel_path, index=False)
+
+
+# ============ SCORING ============
+
+def _error_row(file_id, message):
+    return {
+        'file': file_id, 'company': None, 'job_role': None, 'ats_score': None,
+        'semantic_score': None, 'combined_score': None, 'matched_skills': [],
+        'missing_skills': [], 'total_skills': None, 'error': message
+    }
+
+
+def _result_row(file_id, result):
+    if 'error' in result:
+        return _error_row(file_id, result['error'])
+    return {
+        'file': file_id,
+        'company': result['company'],
+        'job_role': result['job_role'],
+        'ats_score': result['ats_score'],
+        'semantic_score': result['semantic_score'],
+        'combined_score': result['combined_score'],
+        'matched_skills': result['matched_skills'],
+        'missing_skills': result['missing_skills'],
+        'total_skills': result['total_skills'],
+        'error': None
+    }
+
+
+def _process_chunk(pool, chunk, archive, timeout):
+    """
+    Extract and preprocess one chunk of files in the pool.
+
+    Returns:
+        tuple: ({file_id: processed text, or None if unreadable},
+                {file_id: TIMED_OUT or WORKER_CRASHED} for files to retry)
+    """
+    payloads = [archive.read(source) if archive else source for _, source in chunk]
+    processed = {}
+    failed = {}
+    for idx, text, error in pool.map_unordered(payloads, timeout):
+        file_id = chunk[idx][0]
+        if error in (TIMED_OUT, WORKER_CRASHED):
+            print(f"Error processing {file_id}: extraction {error}", file=sys.stderr)
+            failed[file_id] = error
+            continue
+        if error:
+            print(f"Error processing {file_id}: {error}", file=sys.stderr)
+        processed[file_id] = text
+    return processed, failed
+
+
+def score(input_path, targets, output_path, fmt, workers, batch_size, chunk_size=CHUNK_SIZE,
+          timeout=120, fresh=False):
+    """
+    Score every PDF under input_path against targets, streaming rows to output_path.
+
+    Args:
+        timeout (float): Seconds each file's extraction may take.
+
+    Returns:
+        int: Number of files scored in this run (files that timed out or
+             crashed their worker are not counted; run again to retry them).
+    """
+    from matcher import match_resumes_to_jobs
+
+    stream_path = f"{output_path}.partial.jsonl" if fmt == 'xlsx' else output_path
+    stream_format = 'jsonl' if fmt == 'xlsx' else fmt
+    checkpoint_path = f"{output_path}.checkpoint"
+
+    done = set()
+    if fresh or not os.path.exists(checkpoint_path):
+        for path in {stream_path, checkpoint_path}:
+            if os.path.exists(path):
+                os.remove(path)
+    else:
+        done, output_bytes = _load_checkpoint(checkpoint_path)
+        # Drop rows written after the last checkpoint; their files are scored again
+        if os.path.exists(stream_path):
+            with open(stream_path, 'r+b') as f:
+                f.truncate(output_bytes)
+        print(f"Resuming: {len(done)} file(s) already scored", file=sys.stderr)
+
+    inputs = [item for item in list_inputs(input_path) if item[0] not in done]
+    total = len(inputs) + len(done)
+    archive = zipfile.ZipFile(input_path) if zipfile.is_zipfile(input_path) else None
+    writer = ResultWriter(stream_path, stream_format)
+    pool = WorkerPool(_extract_and_preprocess, workers)
+    started = time.perf_counter()
+    retry = {}
+
+    try:
+        for start in range(0, len(inputs), chunk_size):
+            chunk = inputs[start:start + chunk_size]
+            processed, failed = _process_chunk(pool, chunk, archive, timeout)
+            retry.update(failed)
+
+            readable = [(file_id, text) for file_id, text in processed.items() if text]
+            scored = match_resumes_to_jobs([text for _, text in readable], targets, batch_size=batch_size)
+
+            rows = []
+            for (file_id, _), results in zip(readable, scored):
+                rows.extend(_result_row(file_id, result) for result in results)
+            rows.extend(
+                _error_row(file_id, "Could not extract text from PDF")
+                for file_id, text in processed.items() if not text
+            )
+
+            output_bytes = writer.write(rows)
+            _append_checkpoint(checkpoint_path, list(processed), output_bytes)
+
+            finished = len(done) + start + len(chunk)
+            rate = (start + len(chunk)) / (time.perf_counter() - started)
+            print(f"[{finished}/{total}] scored ({rate:.1f} files/s)", file=sys.stderr)
+
+        # Reported after the checkpoint, so a resumed run drops these rows and retries the files
+        writer.write([_error_row(file_id, f"Extraction {error}") for file_id, error in sorted(retry.items())])
+    finally:
+        pool.shutdown()
+        writer.close()
+        if archive:
+            archive.close()
+
+    if fmt == 'xlsx':
+        _write_excel(stream_path, output_path)
+    if retry:
+        print(f"{len(retry)} file(s) timed out or crashed their worker; "
+              f"run again with the same arguments to retry them", file=sys.stderr)
+        return len(inputs) - len(retry)
+
+    if fmt == 'xlsx':
+        os.remove(stream_path)
+    os.remove(checkpoint_path)
+    return len(inputs)
+
+
+def parse_targets(values):
+    """Turn 'all' or 'Company::Role' strings into (company, role) pairs"""
+    from role_index import get_all_targets
+    from company_database import COMPANY_JOB_SKILLS
+
+    if values == ['all']:
+        return get_all_targets()
+
+    targets = []
+    for value in values:
+        company_name, sep, job_role = value.partition('::')
+        if not sep:
+            raise ValueError(f"Target '{value}' must look like 'Company::Role' (or use 'all')")
+        if job_role not in COMPANY_JOB_SKILLS.get(company_name, {}):
+            raise ValueError(f"Unknown target '{value}'")
+        targets.append((company_name, job_role))
+    return targets
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Score resume PDFs against company job roles")
+    parser.add_argument("input", help="directory of PDFs (searched recursively) or a .zip of PDFs")
+    parser.add_argument("--targets", nargs="+", default=["all"],
+                        help="'all' (default) or one or more 'Company::Role' targets")
+    parser.add_argument("--output", required=True, help="output file (.csv, .jsonl or .xlsx)")
+    parser.add_argument("--format", choices=["csv", "jsonl", "xlsx"], help="output format (default: from extension)")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="extraction processes")
+    parser.add_argument("--batch-size", type=int, help="texts per encoder call (default SKILLSYNC_ENCODE_BATCH_SIZE)")
+    parser.add_argument("--chunk-size", type=int, default=CHUNK_SIZE, help="files per round and checkpoint")
+    parser.add_argument("--timeout", type=float, default=120, help="seconds allowed per file for extraction")
+    parser.add_argument("--fresh", action="store_true", help="ignore an existing checkpoint and start over")
+    args = parser.parse_args(argv)
+
+    fmt = args.format or os.path.splitext(args.output)[1].lstrip('.').lower()
+    if fmt not in ("csv", "jsonl", "xlsx"):
+        parser.error("cannot infer the format from --output; pass --format")
+
+    try:
+        targets = parse_targets(args.targets)
+    except ValueError as e:
+        parser.error(str(e))
+
+    if args.batch_size is None:
+        from matcher import ENCODE_BATCH_SIZE
+        args.batch_size = ENCODE_BATCH_SIZE
+
+    from metrics import start_exporters
+    start_exporters()
+
+    print(f"Scoring against {len(targets)} target(s)", file=sys.stderr)
+    scored = score(args.input, targets, args.output, fmt, args.workers, args.batch_size,
+                   chunk_size=args.chunk_size, timeout=args.timeout, fresh=args.fresh)
+    print(f"Done: {scored} file(s) scored, results in {args.output}", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
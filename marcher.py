@@ -1,54 +1,89 @@
 # matcher.py
-from sentence_transformers import SentenceTransformer
-from sklearn.metrics.pairwise import cosine_similarity
+import os
+import threading
+from functools import partial
 import numpy as np
 from company_database import COMPANY_JOB_SKILLS, SKILL_COURSE_MAP
+from metrics import timed
+from model_registry import MODEL_NAME, get_model, start_background_warm_up
+from role_index import load_or_build_role_index
+from resume_cache import get_resume_embeddings
+from skill_matcher import find_skills, split_skills
+from skill_matrix import skill_matrix, find_skill_ids
 
-# Load the S-BERT model (this happens once when the module is imported)
-print("Loading S-BERT model... (this may take a moment)")
-model = SentenceTransformer('all-MiniLM-L6-v2')
-print("S-BERT model loaded successfully!")
+# Number of texts per encoder forward pass for bulk encoding
+ENCODE_BATCH_SIZE = int(os.getenv("SKILLSYNC_ENCODE_BATCH_SIZE", "32"))
 
-def match_resume_to_job(processed_resume_text, company_name, job_role):
+_role_index = None
+_role_index_lock = threading.Lock()
+
+
+def _encode_normalized(texts, batch_size=ENCODE_BATCH_SIZE):
     """
-    Complete matching function using company-specific job role skills.
-    
-    Args:
-        processed_resume_text (str): The preprocessed resume text.
-        company_name (str): The company name
-        job_role (str): The job role to match against.
-    
-    Returns:
-        dict: Complete matching results with scores and feedback.
+    Encode a list of texts into unit-length float32 row vectors.
+
+    Texts are encoded longest-first so each batch holds similar lengths and
+    wastes little padding; rows are returned in the original order.
     """
-    # Get skills for this specific company and job role
+    order = sorted(range(len(texts)), key=lambda idx: len(texts[idx]), reverse=True)
+    encoded = get_model().encode(
+        [texts[idx] for idx in order],
+        batch_size=batch_size,
+        convert_to_numpy=True,
+        normalize_embeddings=True
+    ).astype(np.float32)
+
+    embeddings = np.empty_like(encoded)
+    embeddings[order] = encoded
+    return embeddings
+
+
+# The two encoder call sites, timed separately
+_encode_roles = timed("encode_roles")(_encode_normalized)
+_encode_resumes = timed("encode_resumes")(_encode_normalized)
+
+
+def get_role_index():
+    """Get the precomputed role embeddings (loaded from disk when the catalog is unchanged)"""
+    global _role_index
+    if _role_index is None:
+        with _role_index_lock:
+            if _role_index is None:
+                _role_index = load_or_build_role_index(_encode_roles, MODEL_NAME)
+    return _role_index
+
+
+def embed_resumes(processed_resume_texts, batch_size=ENCODE_BATCH_SIZE):
+    """Get normalized embeddings for preprocessed resumes (cached, misses encoded in batches)"""
+    return get_resume_embeddings(processed_resume_texts, partial(_encode_resumes, batch_size=batch_size), MODEL_NAME)
+
+
+def warm_up_in_background():
+    """Load the model, run a dummy encode and load the role index off the request path"""
+    return start_background_warm_up(get_role_index)
+
+
+def _validate_target(company_name, job_role):
+    """Return an error result if the company/job role is not in the catalog"""
     if company_name not in COMPANY_JOB_SKILLS:
         return {'error': f"Company '{company_name}' not found in database."}
-    
+
     if job_role not in COMPANY_JOB_SKILLS[company_name]:
         return {'error': f"Job role '{job_role}' not found for {company_name}."}
-    
+
+    return None
+
+
+def _build_result(found_skills, company_name, job_role, similarity):
+    """Combine keyword matching, semantic similarity and feedback into a result dict"""
     required_skills = COMPANY_JOB_SKILLS[company_name][job_role]
-    
-    # Calculate ATS score (keyword matching)
-    matched_skills = []
-    missing_skills = []
-    
-    for skill in required_skills:
-        if skill in processed_resume_text:
-            matched_skills.append(skill)
-        else:
-            missing_skills.append(skill)
-    
+
+    # Calculate ATS score (whole-token keyword matching)
+    matched_skills, missing_skills = split_skills(found_skills, required_skills)
+
     ats_score = (len(matched_skills) / len(required_skills)) * 100 if required_skills else 0
-    
-    # Calculate semantic similarity
-    job_description_text = f"Required skills for {job_role} at {company_name}: {', '.join(required_skills)}."
-    resume_embedding = model.encode([processed_resume_text])
-    job_embedding = model.encode([job_description_text])
-    similarity = cosine_similarity(resume_embedding, job_embedding)[0][0]
     semantic_score = similarity * 100
-    
+
     # Get feedback
     feedback = {}
     for skill in missing_skills:
@@ -56,10 +91,10 @@ def match_resume_to_job(processed_resume_text, company_name, job_role):
             feedback[skill] = SKILL_COURSE_MAP[skill]
         else:
             feedback[skill] = f"Consider learning about '{skill}' through online resources."
-    
+
     # Combined score
     combined_score = (ats_score + semantic_score) / 2
-    
+
     return {
         'company': company_name,
         'job_role': job_role,
@@ -71,3 +106,191 @@ def match_resume_to_job(processed_resume_text, company_name, job_role):
         'total_skills': len(required_skills),
         'feedback': feedback
     }
+
+
+@timed("match_resume_to_jobs")
+def match_resume_to_jobs(processed_resume_text, targets):
+    """
+    Match one resume against several company/job roles in a single pass.
+
+    The resume is encoded at most once (repeat resumes hit the resume
+    embedding cache), job embeddings come from the precomputed
+    role index, and every similarity comes from one matrix-vector product.
+
+    Args:
+        processed_resume_text (str): The preprocessed resume text.
+        targets (list): (company_name, job_role) pairs to match against.
+
+    Returns:
+        list: One result dict per target, in the same order. Unknown
+              companies/roles get an {'error': ...} dict.
+    """
+    targets = list(targets)
+    results = [None] * len(targets)
+
+    valid_targets = []
+    for idx, (company_name, job_role) in enumerate(targets):
+        error = _validate_target(company_name, job_role)
+        if error:
+            results[idx] = error
+        else:
+            valid_targets.append((idx, company_name, job_role))
+
+    if not valid_targets:
+        return results
+
+    # Calculate semantic similarity (cosine of unit vectors == dot product)
+    resume_embedding = get_resume_embeddings([processed_resume_text], _encode_resumes, MODEL_NAME)[0]
+    job_embeddings = get_role_index().rows([
+        (company_name, job_role) for _, company_name, job_role in valid_targets
+    ])
+    similarities = job_embeddings @ resume_embedding
+
+    # One pass over the resume finds the skills for every role
+    found_skills = find_skills(processed_resume_text)
+
+    for (idx, company_name, job_role), similarity in zip(valid_targets, similarities):
+        results[idx] = _build_result(found_skills, company_name, job_role, float(similarity))
+
+    return results
+
+
+def match_resume_to_job(processed_resume_text, company_name, job_role):
+    """
+    Complete matching function using company-specific job role skills.
+
+    Args:
+        processed_resume_text (str): The preprocessed resume text.
+        company_name (str): The company name
+        job_role (str): The job role to match against.
+
+    Returns:
+        dict: Complete matching results with scores and feedback.
+    """
+    return match_resume_to_jobs(processed_resume_text, [(company_name, job_role)])[0]
+
+
+@timed("match_resumes_to_job")
+def match_resumes_to_job(processed_resume_texts, company_name, job_role, batch_size=ENCODE_BATCH_SIZE):
+    """
+    Match many resumes against one company/job role (bulk analysis).
+
+    Every resume not already in the embedding cache is encoded in a single
+    batched encoder call.
+
+    Args:
+        processed_resume_texts (list): The preprocessed resume texts.
+        company_name (str): The company name
+        job_role (str): The job role to match against.
+        batch_size (int): Texts per encoder forward pass.
+
+    Returns:
+        list: One result dict per resume, in input order. If the
+              company/job role is unknown every entry is an {'error': ...} dict.
+    """
+    error = _validate_target(company_name, job_role)
+    if error:
+        return [dict(error) for _ in processed_resume_texts]
+
+    if not processed_resume_texts:
+        return []
+
+    resume_embeddings = get_resume_embeddings(
+        processed_resume_texts, partial(_encode_resumes, batch_size=batch_size), MODEL_NAME
+    )
+    job_embedding = get_role_index().rows([(company_name, job_role)])[0]
+    similarities = resume_embeddings @ job_embedding
+
+    return [
+        _build_result(find_skills(processed_text), company_name, job_role, float(similarity))
+        for processed_text, similarity in zip(processed_resume_texts, similarities)
+    ]
+
+
+@timed("match_resumes_to_jobs")
+def match_resumes_to_jobs(processed_resume_texts, targets, batch_size=ENCODE_BATCH_SIZE):
+    """
+    Match many resumes against many company/job roles (batch scoring).
+
+    Resumes are encoded in batched encoder calls, skills are found once per
+    resume, and all similarities come from one resume x role matrix product.
+
+    Args:
+        processed_resume_texts (list): The preprocessed resume texts.
+        targets (list): (company_name, job_role) pairs to match against.
+        batch_size (int): Texts per encoder forward pass.
+
+    Returns:
+        list: For each resume, a list with one result dict per target (in
+              target order). Unknown companies/roles get an {'error': ...} dict.
+    """
+    targets = list(targets)
+    errors = [_validate_target(company_name, job_role) for company_name, job_role in targets]
+    valid = [idx for idx, error in enumerate(errors) if error is None]
+
+    if not processed_resume_texts:
+        return []
+
+    similarities = None
+    if valid:
+        resume_embeddings = get_resume_embeddings(
+            processed_resume_texts, partial(_encode_resumes, batch_size=batch_size), MODEL_NAME
+        )
+        job_embeddings = get_role_index().rows([targets[idx] for idx in valid])
+        similarities = resume_embeddings @ job_embeddings.T
+
+    all_results = []
+    for row, processed_text in enumerate(processed_resume_texts):
+        results = [dict(error) if error else None for error in errors]
+        if valid:
+            found_skills = find_skills(processed_text)
+            for col, idx in enumerate(valid):
+                company_name, job_role = targets[idx]
+                results[idx] = _build_result(found_skills, company_name, job_role, float(similarities[row, col]))
+        all_results.append(results)
+    return all_results
+
+
+# Roles suggested by recommend_roles unless asked otherwise
+DEFAULT_RECOMMENDATIONS = 5
+
+
+@timed("recommend_roles")
+def recommend_roles(processed_resume_text, k=DEFAULT_RECOMMENDATIONS):
+    """
+    Find the best-fit company/job roles for a resume across the whole catalog.
+
+    Every role is scored in one vectorized step: semantic similarity is one
+    product with the role embedding matrix and ATS is one product with the
+    role x skill matrix. Full results (skills, feedback) are built only for
+    the top k.
+
+    Args:
+        processed_resume_text (str): The preprocessed resume text.
+        k (int): Number of roles to return.
+
+    Returns:
+        list: Up to k result dicts (as from match_resume_to_job) with an
+              extra 'rank' key, best combined score first.
+    """
+    targets = skill_matrix.targets
+    k = max(0, min(k, len(targets)))
+    if k == 0:
+        return []
+
+    resume_embedding = get_resume_embeddings([processed_resume_text], _encode_resumes, MODEL_NAME)[0]
+    semantic_scores = get_role_index().rows(targets) @ resume_embedding * 100
+    ats_scores = skill_matrix.ats_scores(skill_matrix.resume_vectors([find_skill_ids(processed_resume_text)]))[0]
+    combined_scores = (ats_scores + semantic_scores) / 2
+
+    top = np.argpartition(-combined_scores, k - 1)[:k]
+    top = top[np.argsort(-combined_scores[top], kind='stable')]
+
+    found_skills = find_skills(processed_resume_text)
+    recommendations = []
+    for rank, row in enumerate(top, 1):
+        company_name, job_role = targets[row]
+        result = _build_result(found_skills, company_name, job_role, float(semantic_scores[row] / 100))
+        result['rank'] = rank
+        recommendations.append(result)
+    return recommendations
@@ -0,0 +1,253 @@
+# metrics.py
+"""
+In-process timing spans, counters and histograms.
+
+Instrument code with the timed decorator or the span context manager:
+
+    @timed("preprocess_text")
+    def preprocess_text(text): ...
+
+    with span("encode_resumes"):
+        ...
+
+When SKILLSYNC_METRICS is off (the default) timed returns the function
+unchanged and span returns a shared no-op, so instrumentation costs
+nothing. When on, metrics are exposed as Prometheus text:
+    - render_prometheus() for the diagnostics panel,
+    - http://<host>:SKILLSYNC_METRICS_PORT/metrics if a port is set,
+    - rewritten to SKILLSYNC_METRICS_FILE every SKILLSYNC_METRICS_FILE_INTERVAL
+      seconds if a file is set (e.g. for node_exporter's textfile collector).
+"""
+import multiprocessing
+import os
+import threading
+import time
+from collections import deque
+from contextlib import nullcontext
+from functools import wraps
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import numpy as np
+
+METRICS_ENABLED = os.getenv("SKILLSYNC_METRICS", "false").lower() in ("1", "true", "yes")
+METRICS_PORT = int(os.getenv("SKILLSYNC_METRICS_PORT", "0"))
+METRICS_FILE = os.getenv("SKILLSYNC_METRICS_FILE", "")
+METRICS_FILE_INTERVAL = float(os.getenv("SKILLSYNC_METRICS_FILE_INTERVAL", "15"))
+
+# Histogram bucket upper bounds in seconds (PDF parsing to slow DB calls)
+BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+# Recent durations kept per span for exact percentiles in the diagnostics panel
+RECENT_SAMPLES = 2048
+
+_NOOP = nullcontext()
+
+
+class Histogram:
+    """Cumulative-bucket latency histogram plus a window of recent samples"""
+
+    def __init__(self):
+        self.bucket_counts = [0] * len(BUCKETS)
+        self.count = 0
+        self.total = 0.0
+        self.errors = 0
+        self.recent = deque(maxlen=RECENT_SAMPLES)
+
+    def observe(self, seconds, error=False):
+        for idx, bound in enumerate(BUCKETS):
+            if seconds <= bound:
+                self.bucket_counts[idx] += 1
+                break
+        self.count += 1
+        self.total += seconds
+        self.errors += error
+        self.recent.append(seconds)
+
+
+_spans = {}
+_counters = {}
+_lock = threading.Lock()
+
+
+def observe(name, seconds, error=False):
+    """Record one duration for a span"""
+    with _lock:
+        histogram = _spans.get(name)
+        if histogram is None:
+            histogram = _spans[name] = Histogram()
+        histogram.observe(seconds, error)
+
+
+def inc(name, value=1):
+    """Add to a counter"""
+    if not METRICS_ENABLED:
+        return
+    with _lock:
+        _counters[name] = _counters.get(name, 0) + value
+
+
+class _Span:
+    __slots__ = ('name', 'start')
+
+    def __init__(self, name):
+        self.name = name
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        observe(self.name, time.perf_counter() - self.start, error=exc_type is not None)
+        return False
+
+
+def span(name):
+    """Context manager timing a block as the named span"""
+    return _Span(name) if METRICS_ENABLED else _NOOP
+
+
+def timed(name):
+    """Decorator timing every call of a function as the named span"""
+    def decorator(function):
+        if not METRICS_ENABLED:
+            return function
+
+        @wraps(function)
+        def wrapper(*args, **kwargs):
+            start = time.perf_counter()
+            error = True
+            try:
+                result = function(*args, **kwargs)
+                error = False
+                return result
+            finally:
+                observe(name, time.perf_counter() - start, error)
+        return wrapper
+    return decorator
+
+
+def get_span_stats():
+    """
+    Get per-span call counts and latency.
+
+    Returns:
+        list: Dicts with span, calls, errors, mean_ms and p50/p95/p99_ms
+            (percentiles over the most recent RECENT_SAMPLES calls), slowest total first.
+    """
+    with _lock:
+        snapshot = [(name, h.count, h.errors, h.total, list(h.recent)) for name, h in _spans.items()]
+
+    stats = []
+    for name, count, errors, total, recent in snapshot:
+        p50, p95, p99 = np.percentile(recent, [50, 95, 99]) * 1000 if recent else (0.0, 0.0, 0.0)
+        stats.append({
+            'span': name,
+            'calls': count,
+            'errors': errors,
+            'total_s': total,
+            'mean_ms': total / count * 1000 if count else 0.0,
+            'p50_ms': float(p50),
+            'p95_ms': float(p95),
+            'p99_ms': float(p99),
+        })
+    return sorted(stats, key=lambda row: row['total_s'], reverse=True)
+
+
+def render_prometheus():
+    """Render all spans and counters in the Prometheus text exposition format"""
+    with _lock:
+        spans = [(name, list(h.bucket_counts), h.count, h.total, h.errors) for name, h in sorted(_spans.items())]
+        counters = sorted(_counters.items())
+
+    lines = [
+        "# HELP skillsync_span_seconds Duration of instrumented pipeline stages and database calls.",
+        "# TYPE skillsync_span_seconds histogram",
+    ]
+    for name, bucket_counts, count, total, _ in spans:
+        cumulative = 0
+        for bound, bucket_count in zip(BUCKETS, bucket_counts):
+            cumulative += bucket_count
+            lines.append(f'skillsync_span_seconds_bucket{{span="{name}",le="{bound}"}} {cumulative}')
+        lines.append(f'skillsync_span_seconds_bucket{{span="{name}",le="+Inf"}} {count}')
+        lines.append(f'skillsync_span_seconds_sum{{span="{name}"}} {total:.6f}')
+        lines.append(f'skillsync_span_seconds_count{{span="{name}"}} {count}')
+
+    lines += [
+        "# HELP skillsync_span_errors_total Instrumented calls that raised.",
+        "# TYPE skillsync_span_errors_total counter",
+    ]
+    lines += [f'skillsync_span_errors_total{{span="{name}"}} {errors}' for name, _, _, _, errors in spans]
+
+    for name, value in counters:
+        lines.append(f"# TYPE skillsync_{name} counter")
+        lines.append(f"skillsync_{name} {value}")
+    return "\n".join(lines) + "\n"
+
+
+def reset():
+    """Forget everything recorded so far"""
+    with _lock:
+        _spans.clear()
+        _counters.clear()
+
+
+# ============ EXPORTERS ============
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path.split('?')[0] != "/metrics":
+            self.send_error(404)
+            return
+        body = render_prometheus().encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def _write_file_forever():
+    while True:
+        try:
+            tmp_path = f"{METRICS_FILE}.tmp"
+            with open(tmp_path, 'w') as f:
+                f.write(render_prometheus())
+            os.replace(tmp_path, METRICS_FILE)
+        except Exception as e:
+            print(f"Error writing metrics file: {e}")
+        time.sleep(METRICS_FILE_INTERVAL)
+
+
+_exporters_started = False
+_exporters_lock = threading.Lock()
+
+
+def start_exporters():
+    """
+    Start the configured HTTP endpoint / file writer once per process.
+
+    Called by the entry points (Home.py, main.py), not on import, so tools
+    and tests that import instrumented modules start no threads or ports.
+    """
+    global _exporters_started
+    # Pool workers record into their own process; only the app process exports
+    if not METRICS_ENABLED or multiprocessing.parent_process() is not None:
+        return
+    with _exporters_lock:
+        if _exporters_started:
+            return
+        _exporters_started = True
+
+    if METRICS_PORT:
+        try:
+            # Local only; put a scraper or reverse proxy next to it
+            server = ThreadingHTTPServer(("127.0.0.1", METRICS_PORT), _MetricsHandler)
+            threading.Thread(target=server.serve_forever, name="skillsync-metrics-http", daemon=True).start()
+        except OSError as e:
+            # Another process (e.g. a second Streamlit worker) already serves the port
+            print(f"Error starting metrics endpoint on port {METRICS_PORT}: {e}")
+    if METRICS_FILE:
+        threading.Thread(target=_write_file_forever, name="skillsync-metrics-file", daemon=True).start()
+
@@ -0,0 +1,100 @@
+# model_registry.py
+import os
+import threading
+import time
+
+# Sentence embedding model shared by every page in this process
+MODEL_NAME = os.getenv("SKILLSYNC_MODEL_NAME", "all-MiniLM-L6-v2")
+
+# Start loading the model in the background when the app starts
+WARMUP_ON_START = os.getenv("SKILLSYNC_MODEL_WARMUP", "true").lower() in ("1", "true", "yes")
+
+_model = None
+_model_lock = threading.Lock()
+_warmup_thread = None
+_warmup_lock = threading.Lock()
+
+_stats = {
+    'model_name': MODEL_NAME,
+    'loaded': False,
+    'import_seconds': None,
+    'load_seconds': None,
+    'warmup_seconds': None,
+    'loaded_at': None,
+    'warmup_error': None
+}
+
+
+def get_model():
+    """
+    Get the shared SentenceTransformer, loading it on first use.
+
+    The model is loaded at most once per process, even when several
+    Streamlit sessions ask for it at the same time.
+    """
+    global _model
+    if _model is not None:
+        return _model
+
+    with _model_lock:
+        if _model is None:
+            print(f"Loading S-BERT model '{MODEL_NAME}'...")
+            start = time.perf_counter()
+            from sentence_transformers import SentenceTransformer
+            imported = time.perf_counter()
+            model = SentenceTransformer(MODEL_NAME)
+            loaded = time.perf_counter()
+
+            _stats['import_seconds'] = round(imported - start, 3)
+            _stats['load_seconds'] = round(loaded - imported, 3)
+            _stats['loaded_at'] = time.strftime('%Y-%m-%d %H:%M:%S')
+            _stats['loaded'] = True
+            _model = model
+            print(f"S-BERT model loaded in {loaded - start:.1f}s")
+    return _model
+
+
+def is_model_loaded():
+    """Check whether the model is already in memory"""
+    return _model is not None
+
+
+def warm_up():
+    """Load the model and run a dummy encode so the first real request is fast"""
+    model = get_model()
+    start = time.perf_counter()
+    model.encode(["warm up the sentence encoder"], convert_to_numpy=True)
+    _stats['warmup_seconds'] = round(time.perf_counter() - start, 3)
+
+
+def start_background_warm_up(*extra_steps):
+    """
+    Warm up the model in a daemon thread, once per process.
+
+    Args:
+        *extra_steps (callable): Run after the model is warm (e.g. building indexes).
+
+    Returns:
+        threading.Thread: The warm-up thread.
+    """
+    global _warmup_thread
+
+    def _run():
+        try:
+            warm_up()
+            for step in extra_steps:
+                step()
+        except Exception as e:
+            _stats['warmup_error'] = str(e)
+            print(f"Error warming up model: {e}")
+
+    with _warmup_lock:
+        if _warmup_thread is None:
+            _warmup_thread = threading.Thread(target=_run, name="model-warmup", daemon=True)
+            _warmup_thread.start()
+    return _warmup_thread
+
+
+def get_model_stats():
+    """Get model load and warm-up timings"""
+    return dict(_stats)
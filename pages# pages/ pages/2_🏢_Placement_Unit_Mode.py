@@ -2,10 +2,15 @@
 import streamlit as st
 from database import (
     create_announcement, get_all_announcements, delete_announcement, toggle_announcement_status,
-    publish_ranking, get_all_rankings, delete_ranking,
-    get_all_student_analyses, get_student_by_email,
-    save_student_resume, get_current_resume, save_analysis_result
+    publish_ranking, get_all_rankings, delete_ranking, get_ranking_entries, get_ranking_size,
+    get_all_student_analyses, count_student_analyses, get_students_by_emails,
+    save_resumes_bulk
 )
+from cohort_index import (
+    save_features, rank_cohort, stale_students, sync_features, top_students_for_role, similar_students,
+    cohort_ats_scores
+)
+from ann_index import ANN_NPROBE
 from company_database import COMPANY_JOB_SKILLS
 from datetime import datetime
 import pandas as pd
@@ -29,7 +34,7 @@ st.write(f"**Welcome, {officer_name}!**")
 st.write("---")
 
 # Create tabs for different functions
-tab1, tab2, tab3 = st.tabs(["📢 Announcements", "🏆 Rank Students", "📋 Manage Published Results"])
+tab1, tab2, tab3, tab4, tab5 = st.tabs(["📢 Announcements", "🏆 Rank Students", "📋 Manage Published Results", "🗺️ Role Fit Heatmap", "🩺 Diagnostics"])
 
 # ============ TAB 1: ANNOUNCEMENTS ============
 with tab1:
@@ -107,7 +112,7 @@ with tab2:
     st.subheader("🏆 Rank Students for Company")
     
     # Create sub-tabs for existing analyses and manual upload
-    subtab1, subtab2 = st.tabs(["📊 Rank & Publish", "📤 Upload New Resumes"])
+    subtab1, subtab2, subtab3 = st.tabs(["📊 Rank & Publish", "📤 Upload New Resumes", "🌍 Whole Cohort"])
     
     # ===== SUBTAB 1: RANK EXISTING ANALYSES =====
     with subtab1:
@@ -128,11 +133,13 @@ with tab2:
                     st.success(f"✅ Found {len(student_analyses)} unique students for {company_name} - {job_role}")
                     st.info(f"💡 Showing latest analysis per student (duplicates removed)")
                     
+                    # Get student details for everyone in one query
+                    students = get_students_by_emails([a['student_email'] for a in student_analyses])
+                    
                     # Create ranking dataframe
                     ranking_data = []
                     for idx, analysis in enumerate(student_analyses, 1):
-                        # Get student details
-                        student = get_student_by_email(analysis['student_email'])
+                        student = students.get(analysis['student_email'])
                         student_name = student['name'] if student else "Unknown"
                         
                         ranking_data.append({
@@ -217,8 +224,8 @@ with tab2:
             job_role_manual = st.selectbox("Select Job Role", available_roles_manual, key="manual_role")
             
             # Show existing analyses count
-            existing_analyses = get_all_student_analyses(company_name_manual, job_role_manual)
-            st.info(f"ℹ️ Currently {len(existing_analyses)} student(s) have analyzed for this role")
+            existing_count = count_student_analyses(company_name_manual, job_role_manual)
+            st.info(f"ℹ️ Currently {existing_count} student(s) have analyzed for this role")
             
             st.write("---")
             
@@ -240,33 +247,50 @@ with tab2:
                 
                 if st.button("🚀 Analyze All Resumes", type="primary", key="analyze_manual"):
                     # Lazy import - only load when needed
-                    from pdf_processor import extract_text_from_pdf
-                    from text_preprocessor import preprocess_text
-                    from matcher import match_resume_to_job
+                    from pdf_processor import extract_texts_from_pdfs
+                    from text_preprocessor import preprocess_many
+                    from matcher import match_resumes_to_job
                     
                     progress_bar = st.progress(0)
                     status_text = st.empty()
                     
                     results_list = []
+                    extracted = []
+                    failed = []
                     
-                    for idx, uploaded_file in enumerate(uploaded_files):
-                        status_text.text(f"Analyzing {uploaded_file.name}...")
+                    status_text.text(f"Extracting text from {len(uploaded_files)} resume(s)...")
+                    
+                    # Extract in parallel; progress advances as each file completes
+                    for done, (idx, resume_text, error) in enumerate(extract_texts_from_pdfs(uploaded_files), 1):
+                        if error:
+                            failed.append((uploaded_files[idx].name, error))
+                        elif resume_text and len(resume_text.strip()) > 50:
+                            extracted.append((idx, uploaded_files[idx].name, resume_text))
                         
-                        # Extract and process
-                        resume_text = extract_text_from_pdf(uploaded_file)
+                        status_text.text(f"Extracted {done}/{len(uploaded_files)}: {uploaded_files[idx].name}")
+                        progress_bar.progress(done / len(uploaded_files))
+                    
+                    for filename, error in failed:
+                        st.warning(f"⚠️ {filename}: extraction {error}. Try uploading it again.")
+                    
+                    # Keep upload order regardless of completion order
+                    extracted.sort(key=lambda item: item[0])
+                    
+                    if extracted:
+                        status_text.text(f"Preprocessing {len(extracted)} resume(s)...")
+                        processed_texts = preprocess_many([resume_text for _, _, resume_text in extracted])
                         
-                        if resume_text and len(resume_text.strip()) > 50:
-                            processed_text = preprocess_text(resume_text)
-                            
-                            # Calculate scores
-                            results = match_resume_to_job(processed_text, company_name_manual, job_role_manual)
-                            
+                        status_text.text(f"Scoring {len(extracted)} resume(s)...")
+                        
+                        # Calculate scores for every resume in one batched pass
+                        bulk_results = match_resumes_to_job(processed_texts, company_name_manual, job_role_manual)
+                        
+                        for (_, filename, resume_text), processed_text, results in zip(extracted, processed_texts, bulk_results):
                             if 'error' not in results:
-                                results['filename'] = uploaded_file.name
+                                results['filename'] = filename
                                 results['resume_text'] = resume_text
+                                results['processed_text'] = processed_text
                                 results_list.append(results)
-                        
-                        progress_bar.progress((idx + 1) / len(uploaded_files))
                     
                     status_text.text("✅ Analysis complete!")
                     
@@ -317,44 +341,55 @@ with tab2:
                                         st.error(f"❌ Invalid email for {results_list[idx]['filename']}")
                                         valid = False
                                         break
-                                    
-                                    # Check if student exists
-                                    student = get_student_by_email(email)
-                                    if not student:
-                                        st.error(f"❌ Student with email {email} not found in database!")
-                                        st.info(f"💡 Student must be registered first. Email: {email}")
-                                        valid = False
-                                        break
                                 
                                 if valid:
-                                    # Save all analyses
-                                    for idx, result in enumerate(results_list):
-                                        student_email = email_assignments[idx]
-                                        
-                                        # Save resume first
-                                        save_student_resume(
-                                            student_email=student_email,
-                                            resume_text=result['resume_text'],
-                                            filename=result['filename']
-                                        )
-                                        
-                                        # Get the resume version that was just saved
-                                        current_resume = get_current_resume(student_email)
-                                        
-                                        # Save analysis
-                                        save_analysis_result(
-                                            student_email=student_email,
-                                            company_name=company_name_manual,
-                                            job_role=job_role_manual,
-                                            resume_version=current_resume['version_number'],
-                                            resume_filename=result['filename'],
-                                            ats_score=result['ats_score'],
-                                            semantic_score=result['semantic_score'],
-                                            combined_score=result['combined_score'],
-                                            matched_skills=result['matched_skills'],
-                                            missing_skills=result['missing_skills'],
-                                            feedback=str(result['feedback'])
-                                        )
+                                    # Check that every student exists (one query for all emails)
+                                    registered = get_students_by_emails(email_assignments.values())
+                                    for email in email_assignments.values():
+                                        if email not in registered:
+                                            st.error(f"❌ Student with email {email} not found in database!")
+                                            st.info(f"💡 Student must be registered first. Email: {email}")
+                                            valid = False
+                                            break
+                                
+                                if valid:
+                                    # Save every resume with its analysis in one transaction
+                                    saved_resumes = save_resumes_bulk([
+                                        {
+                                            'student_email': email_assignments[idx],
+                                            'resume_text': result['resume_text'],
+                                            'resume_filename': result['filename'],
+                                            'analysis': {
+                                                'company_name': company_name_manual,
+                                                'job_role': job_role_manual,
+                                                'ats_score': result['ats_score'],
+                                                'semantic_score': result['semantic_score'],
+                                                'combined_score': result['combined_score'],
+                                                'matched_skills': result['matched_skills'],
+                                                'missing_skills': result['missing_skills'],
+                                                'feedback': str(result['feedback'])
+                                            }
+                                        }
+                                        for idx, result in enumerate(results_list)
+                                    ])
+                                    
+                                    if not saved_resumes:
+                                        st.error("❌ Failed to save resumes and analyses - nothing was saved. Please try again.")
+                                        st.stop()
+                                    
+                                    # Keep the stored features used for cohort rankings current
+                                    # (embeddings are still cached from scoring, so nothing is re-encoded)
+                                    try:
+                                        save_features([
+                                            {
+                                                'student_email': saved_resume['student_email'],
+                                                'version_number': saved_resume['version_number'],
+                                                'processed_text': result['processed_text']
+                                            }
+                                            for result, saved_resume in zip(results_list, saved_resumes)
+                                        ])
+                                    except (OSError, RuntimeError, ValueError) as e:
+                                        print(f"Error saving resume features: {e}")
                                     
                                     st.success(f"✅ All {len(results_list)} resume(s) saved successfully!")
                                     st.info("💡 Go back to 'Rank & Publish' tab to see the updated rankings with newly added students.")
@@ -371,6 +406,84 @@ with tab2:
             3. Click 'Load Student Rankings' to see ALL students (existing + newly uploaded)
             4. Publish the combined rankings
             """)
+    
+    # ===== SUBTAB 3: WHOLE COHORT =====
+    with subtab3:
+        st.write("#### Rank every student with a resume, whether or not they analyzed for this role")
+        st.info("📌 Uses each student's stored resume features - no resume is re-analyzed.")
+        
+        stale = stale_students()
+        if stale:
+            st.warning(f"⚠️ {len(stale)} current resume(s) have no stored features yet.")
+            if st.button("🔄 Compute Missing Features", key="sync_features"):
+                with st.spinner(f"Processing {len(stale)} resume(s)..."):
+                    updated = sync_features()
+                st.success(f"✅ Stored features for {updated} resume(s).")
+                st.rerun()
+        
+        company_name_cohort = st.selectbox("Select Company", sorted(list(COMPANY_JOB_SKILLS.keys())), key="cohort_company")
+        job_role_cohort = st.selectbox("Select Job Role", list(COMPANY_JOB_SKILLS[company_name_cohort].keys()), key="cohort_role")
+        
+        top_n = st.number_input("Show top N (0 = everyone)", min_value=0, max_value=1000, value=50, step=10, key="cohort_top_n")
+        nprobe = st.slider(
+            "Search breadth (higher = more exact, slower)", 1, 64, ANN_NPROBE, key="cohort_nprobe",
+            help="Number of index cells scanned for top N and similar-student searches "
+                 "in cohorts too large to search exactly"
+        )
+        
+        if st.button("🌍 Rank Whole Cohort", type="primary", key="rank_cohort"):
+            if top_n:
+                cohort_ranking = top_students_for_role(company_name_cohort, job_role_cohort, k=top_n, nprobe=nprobe)
+            else:
+                cohort_ranking = rank_cohort(company_name_cohort, job_role_cohort)
+            
+            if cohort_ranking:
+                students = get_students_by_emails([r['student_email'] for r in cohort_ranking])
+                
+                cohort_data = []
+                for r in cohort_ranking:
+                    student = students.get(r['student_email'])
+                    cohort_data.append({
+                        'Rank': r['rank'],
+                        'Student Name': student['name'] if student else "Unknown",
+                        'Email': r['student_email'],
+                        'Resume Ver.': r['resume_version'],
+                        'Combined Score': f"{r['combined_score']:.1f}%",
+                        'ATS': f"{r['ats_score']:.1f}%",
+                        'Semantic': f"{r['semantic_score']:.1f}%",
+                        'Skills Matched': f"{r['matched_count']}/{r['total_skills']}"
+                    })
+                
+                st.success(f"✅ Ranked {len(cohort_ranking)} student(s) for {company_name_cohort} - {job_role_cohort}")
+                st.dataframe(pd.DataFrame(cohort_data), use_container_width=True, hide_index=True)
+            else:
+                st.info("📭 No stored resume features yet.")
+        
+        st.write("---")
+        st.write("#### 👥 Find Similar Students")
+        st.caption("Students whose current resumes read most like a given student's (e.g. a shortlisted candidate).")
+        
+        similar_email = st.text_input("Student Email", placeholder="student@example.com", key="similar_email")
+        similar_k = st.slider("Number of students", 1, 50, 10, key="similar_k")
+        
+        if st.button("🔎 Find Similar", key="find_similar"):
+            similar = similar_students(similar_email.strip(), k=similar_k, nprobe=nprobe) if similar_email.strip() else []
+            
+            if similar:
+                students = get_students_by_emails([r['student_email'] for r in similar])
+                st.dataframe(pd.DataFrame([
+                    {
+                        'Rank': r['rank'],
+                        'Student Name': students[r['student_email']]['name'] if r['student_email'] in students else "Unknown",
+                        'Email': r['student_email'],
+                        'Resume Ver.': r['resume_version'],
+                        'Similarity': f"{r['similarity']:.1f}%",
+                        'Shared Skills': r['shared_skills']
+                    }
+                    for r in similar
+                ]), use_container_width=True, hide_index=True)
+            else:
+                st.info("📭 No stored resume features for that student.")
 
 # ============ TAB 3: MANAGE PUBLISHED RESULTS ============
 with tab3:
@@ -394,11 +507,10 @@ with tab3:
                     st.info(f"**Description:** {ranking['description']}")
                 
                 # Show top 5 rankings
-                rankings_list = ranking['rankings']
-                if rankings_list:
-                    st.write(f"**Total Students Ranked:** {len(rankings_list)}")
+                top_5 = get_ranking_entries(ranking['id'], limit=5, columns='rank, student_name, combined_score')
+                if top_5:
+                    st.write(f"**Total Students Ranked:** {get_ranking_size(ranking['id'])}")
                     
-                    top_5 = rankings_list[:5]
                     df_data = []
                     for r in top_5:
                         df_data.append({
@@ -415,3 +527,133 @@ with tab3:
                     st.rerun()
     else:
         st.info("📭 No published rankings yet.")
+
+# ============ TAB 4: ROLE FIT HEATMAP ============
+with tab4:
+    st.subheader("🗺️ Cohort Role Fit")
+    st.write("ATS fit of every student's processed current resume against every company role.")
+    
+    if st.button("🗺️ Build Heatmap", type="primary", key="build_heatmap"):
+        # Lazy import - only load when needed
+        import numpy as np
+        from skill_matrix import skill_matrix
+        import altair as alt
+        
+        # Stored skills of every processed resume, whole cohort x whole catalog in one product
+        with st.spinner("Scoring stored resume features against every role..."):
+            cohort, scores = cohort_ats_scores()
+        
+        if len(cohort):
+            student_labels = cohort.students
+            role_labels = [f"{company} - {role}" for company, role in skill_matrix.targets]
+            
+            heatmap_df = pd.DataFrame(scores, index=student_labels, columns=role_labels)
+            heatmap_long = heatmap_df.reset_index(names='Student').melt(
+                id_vars='Student', var_name='Role', value_name='ATS Score'
+            )
+            
+            chart = alt.Chart(heatmap_long).mark_rect().encode(
+                x=alt.X('Role:N', sort=role_labels),
+                y=alt.Y('Student:N', sort=student_labels),
+                color=alt.Color('ATS Score:Q', scale=alt.Scale(domain=[0, 100], scheme='viridis')),
+                tooltip=['Student', 'Role', alt.Tooltip('ATS Score:Q', format='.1f')]
+            )
+            st.altair_chart(chart, use_container_width=True)
+            
+            # Best-fit role per student (skills decoded only for these rows)
+            st.write("#### 🎯 Best-Fit Role per Student")
+            best_rows = scores.argmax(axis=1)
+            
+            best_fit_data = []
+            for idx, (student_email, row) in enumerate(zip(cohort.students, best_rows)):
+                company, role = skill_matrix.targets[row]
+                matched_skills, missing_skills = skill_matrix.decode(np.flatnonzero(cohort.skill_vectors[idx]), company, role)
+                best_fit_data.append({
+                    'Student': student_email,
+                    'Best-Fit Role': f"{company} - {role}",
+                    'ATS Score': f"{scores[idx, row]:.1f}%",
+                    'Matched Skills': ', '.join(matched_skills),
+                    'Missing Skills': ', '.join(missing_skills)
+                })
+            
+            st.dataframe(pd.DataFrame(best_fit_data), use_container_width=True, hide_index=True)
+        else:
+            st.info("📭 No processed resumes yet. Process them under Rank Students → Whole Cohort first.")
+
+# ============ TAB 5: DIAGNOSTICS ============
+with tab5:
+    st.subheader("🩺 Pipeline Diagnostics")
+    
+    # Lazy import - only load when needed
+    from metrics import METRICS_ENABLED, get_span_stats, render_prometheus
+    from database import get_read_cache_stats
+    from resume_cache import get_cache_stats
+    from text_preprocessor import get_token_cache_stats
+    from model_registry import get_model_stats
+    from auth import get_password_hash_stats
+    from vector_store import get_all_store_stats
+    
+    if not METRICS_ENABLED:
+        st.info("ℹ️ Stage timing is off. Set SKILLSYNC_METRICS=true and restart to record spans.")
+    
+    span_stats = get_span_stats()
+    if span_stats:
+        st.write("#### ⏱️ Stage Timings (this server process)")
+        st.dataframe(pd.DataFrame([
+            {
+                'Span': row['span'],
+                'Calls': row['calls'],
+                'Errors': row['errors'],
+                'Total (s)': round(row['total_s'], 2),
+                'Mean (ms)': round(row['mean_ms'], 1),
+                'p50 (ms)': round(row['p50_ms'], 1),
+                'p95 (ms)': round(row['p95_ms'], 1),
+                'p99 (ms)': round(row['p99_ms'], 1)
+            }
+            for row in span_stats
+        ]), use_container_width=True, hide_index=True)
+        
+        st.download_button(
+            "📥 Download Prometheus Metrics",
+            data=render_prometheus(),
+            file_name="skillsync_metrics.prom",
+            mime="text/plain"
+        )
+    elif METRICS_ENABLED:
+        st.info("📭 No spans recorded yet.")
+    
+    st.write("#### 🗃️ Caches")
+    col1, col2, col3 = st.columns(3)
+    with col1:
+        st.write("**Resume embeddings**")
+        st.json(get_cache_stats())
+    with col2:
+        st.write("**Token normalization**")
+        st.json(get_token_cache_stats())
+    with col3:
+        st.write("**Announcements & rankings**")
+        st.json(get_read_cache_stats())
+    
+    store_stats = get_all_store_stats()
+    if store_stats:
+        st.write("#### 💾 Vector Stores")
+        st.dataframe(pd.DataFrame([
+            {
+                'Store': name,
+                'Live Rows': stats['live'],
+                'Dead Rows': stats['dead'],
+                'Dim': stats['dim'],
+                'Type': stats['dtype'],
+                'Size (MB)': round(stats['bytes'] / 1e6, 1),
+                'Generation': stats['generation']
+            }
+            for name, stats in store_stats.items()
+        ]), use_container_width=True, hide_index=True)
+    
+    col1, col2 = st.columns(2)
+    with col1:
+        st.write("#### 🤖 Model")
+        st.json(get_model_stats())
+    with col2:
+        st.write("#### 🔐 Password Hashing")
+        st.json(get_password_hash_stats())
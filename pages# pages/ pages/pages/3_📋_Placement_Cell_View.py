@@ -1,8 +1,14 @@
 # pages/3_📋_Placement_Cell_View.py
 import streamlit as st
-from database import get_active_announcements, get_active_rankings
+from database import (
+    get_active_announcements, get_active_rankings,
+    get_student_ranks, get_ranking_entries, get_ranking_size
+)
 import pandas as pd
 
+# Leaderboard rows shown per page
+RANKING_PAGE_SIZE = 25
+
 st.title("📋 Placement Cell - Announcements & Results")
 
 # Check authentication
@@ -47,6 +53,9 @@ with tab2:
     rankings = get_active_rankings()
     
     if rankings:
+        # The student's own entry in every ranking, in one query
+        my_ranks = get_student_ranks([ranking['id'] for ranking in rankings], student_email)
+        
         for ranking in rankings:
             with st.expander(f"🏢 {ranking['title']} - {ranking['created_at'][:10]}", expanded=False):
                 st.write(f"**Company:** {ranking['company_name']}")
@@ -60,27 +69,29 @@ with tab2:
                 st.write("")
                 st.write("**📊 Student Rankings:**")
                 
-                # Show rankings table
-                rankings_list = ranking['rankings']
-                
                 # Check if current student is in the list
-                student_rank = None
-                for r in rankings_list:
-                    if r['student_email'] == student_email:
-                        student_rank = r
-                        break
+                student_rank = my_ranks.get(ranking['id'])
                 
                 if student_rank:
                     st.success(f"🎉 **Your Rank: {student_rank['rank']}** | Score: {student_rank['combined_score']:.1f}%")
                 
-                # Show full rankings
+                # Show one page of the rankings
+                total = get_ranking_size(ranking['id'])
+                pages = max(1, -(-total // RANKING_PAGE_SIZE))
+                page = 1
+                if pages > 1:
+                    page = st.number_input(
+                        f"Page (of {pages})", min_value=1, max_value=pages, value=1,
+                        key=f"ranking_page_{ranking['id']}"
+                    )
+                
                 df_data = []
-                for r in rankings_list:
-                    # Anonymize other students' emails
-                    if r['student_email'] == student_email:
+                for r in get_ranking_entries(ranking['id'], limit=RANKING_PAGE_SIZE, offset=(page - 1) * RANKING_PAGE_SIZE):
+                    # Other students' emails are stored anonymized
+                    if student_rank and r['rank'] == student_rank['rank']:
                         email_display = "You ⭐"
                     else:
-                        email_display = r['student_email'][:3] + "***@" + r['student_email'].split('@')[1]
+                        email_display = r['student_display']
                     
                     df_data.append({
                         'Rank': r['rank'],
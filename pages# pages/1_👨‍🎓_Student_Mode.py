@@ -5,15 +5,19 @@ Home page for SkillSync application.
 import streamlit as st
 from pdf_processor import extract_text_from_pdf
 from text_preprocessor import preprocess_text
-from matcher import match_resume_to_job
+from matcher import match_resume_to_job, match_resume_to_jobs, recommend_roles
+from role_index import get_all_targets
 from database import (
     save_student_resume, 
     get_current_resume, 
+    get_resume_text,
     get_all_resume_versions,
     save_analysis_result,
     get_student_analysis_history,
-    get_company_specific_history
+    fetch_concurrently,
+    READ_FAILED
 )
+from cohort_index import save_features
 from datetime import datetime
 import pandas as pd
 
@@ -34,11 +38,37 @@ student_name = st.session_state['user_name']
 st.write(f"**Welcome, {student_name}!**")
 st.write("---")
 
+
+def get_processed_resume_text(resume):
+    """Preprocess a resume version once per session and reuse it across analyses"""
+    cache_key = (resume['student_email'], resume['version_number'])
+    cached = st.session_state.get('processed_resume')
+    if cached and cached[0] == cache_key:
+        return cached[1]
+    # The text itself is only fetched when an analysis needs it
+    processed_text = preprocess_text(get_resume_text(resume['student_email'], resume['version_number']) or "")
+    st.session_state['processed_resume'] = (cache_key, processed_text)
+    return processed_text
+
+
+# Independent reads for this render run at the same time
+page_data = fetch_concurrently({
+    'current_resume': (get_current_resume, student_email),
+    'analysis_history': (get_student_analysis_history, student_email),
+}, defaults={'analysis_history': []})
+
+if page_data['current_resume'] is READ_FAILED:
+    # Don't offer an upload as if the student had no resume
+    st.error("❌ Could not load your resume - the database is slow to respond. Please try again.")
+    if st.button("🔄 Retry"):
+        st.rerun()
+    st.stop()
+
 # ============ SECTION 1: CURRENT RESUME & UPLOAD ============
 
 st.subheader("📄 Your Resume")
 
-current_resume = get_current_resume(student_email)
+current_resume = page_data['current_resume']
 
 col1, col2 = st.columns([2, 1])
 
@@ -88,6 +118,22 @@ with st.expander("📤 Upload New Resume", expanded=not current_resume):
                 result = save_student_resume(student_email, resume_text, uploaded_file.name)
                 
                 if result:
+                    # Preprocess once: the analyses below reuse this text and its cached embedding
+                    processed_text = preprocess_text(resume_text)
+                    st.session_state['processed_resume'] = (
+                        (student_email, result[0]['version_number']), processed_text
+                    )
+                    
+                    # Keep the stored features used for cohort rankings current
+                    try:
+                        save_features([{
+                            'student_email': student_email,
+                            'version_number': result[0]['version_number'],
+                            'processed_text': processed_text
+                        }])
+                    except (OSError, RuntimeError, ValueError) as e:
+                        print(f"Error saving resume features: {e}")
+                    
                     st.success(f"✅ Resume uploaded successfully as Version {result[0]['version_number']}!")
                     st.balloons()
                     st.rerun()
@@ -102,7 +148,7 @@ st.write("---")
 
 st.subheader("📊 Your Previous Insights")
 
-analysis_history = get_student_analysis_history(student_email)
+analysis_history = page_data['analysis_history']
 
 if analysis_history:
     # Group by company
@@ -160,6 +206,28 @@ if not current_resume:
     st.warning("⚠️ Please upload a resume first!")
     st.stop()
 
+# Best-fit roles across the whole catalog, to help pick a company
+with st.expander("🎯 Not sure where to apply? See your best-fit roles", expanded=False):
+    top_k = st.slider("Number of roles", min_value=3, max_value=15, value=5, key="recommend_k")
+    
+    if st.button("🎯 Recommend Roles", use_container_width=True):
+        with st.spinner("Scoring your resume against every role..."):
+            processed_text = get_processed_resume_text(current_resume)
+            st.session_state['recommendations'] = (
+                (current_resume['version_number'], top_k),
+                recommend_roles(processed_text, top_k)
+            )
+    
+    cached = st.session_state.get('recommendations')
+    if cached and cached[0] == (current_resume['version_number'], top_k):
+        for r in cached[1]:
+            st.write(f"**#{r['rank']} {r['company']} - {r['job_role']}** | "
+                     f"Combined {r['combined_score']:.1f}% (ATS {r['ats_score']:.1f}%, Semantic {r['semantic_score']:.1f}%)")
+            col_a, col_b = st.columns(2)
+            col_a.write("✅ " + (", ".join(r['matched_skills']) or "No matching skills yet"))
+            col_b.write("❌ " + (", ".join(r['missing_skills'][:8]) or "Nothing missing"))
+        st.caption("Pick one of these companies below to run and save a full analysis.")
+
 # Import from your company database
 from company_database import COMPANY_JOB_SKILLS
 
@@ -171,8 +239,8 @@ if company_name:
     available_roles = list(COMPANY_JOB_SKILLS[company_name].keys())
     job_role = st.selectbox("Select Job Role", available_roles)
     
-    # Check for previous analysis
-    previous_analysis = get_company_specific_history(student_email, company_name)
+    # Check for previous analysis (already loaded with the full history, newest first)
+    previous_analysis = [a for a in analysis_history if a['company_name'] == company_name]
     
     if previous_analysis:
         st.info(f"💡 You have {len(previous_analysis)} previous analysis{'es' if len(previous_analysis) > 1 else ''} for {company_name}")
@@ -180,7 +248,7 @@ if company_name:
     if st.button("🚀 Analyze Resume", use_container_width=True, type="primary"):
         with st.spinner("Analyzing your resume..."):
             # Preprocess resume text
-            processed_text = preprocess_text(current_resume['resume_text'])
+            processed_text = get_processed_resume_text(current_resume)
             
             # Calculate scores using your matcher function
             results = match_resume_to_job(processed_text, company_name, job_role)
@@ -304,3 +372,32 @@ if company_name:
                         st.info(f"📚 {results['feedback'][skill]}")
                 else:
                     st.write("*You have all required skills!*")
+
+st.write("---")
+
+# ============ SECTION 4: COMPARE ACROSS ALL COMPANIES ============
+
+st.subheader("🌐 Analyze Against Every Company")
+st.write("Score your current resume against every company and job role in one go.")
+
+if st.button("🌐 Analyze Against All Companies", use_container_width=True):
+    with st.spinner("Scoring your resume against every role..."):
+        processed_text = get_processed_resume_text(current_resume)
+        all_results = match_resume_to_jobs(processed_text, get_all_targets())
+        all_results = [r for r in all_results if 'error' not in r]
+        all_results.sort(key=lambda x: x['combined_score'], reverse=True)
+        
+        overview_data = []
+        for idx, r in enumerate(all_results, 1):
+            overview_data.append({
+                'Rank': idx,
+                'Company': r['company'],
+                'Job Role': r['job_role'],
+                'Combined Score': f"{r['combined_score']:.1f}%",
+                'ATS Score': f"{r['ats_score']:.1f}%",
+                'Semantic Score': f"{r['semantic_score']:.1f}%",
+                'Skills Matched': f"{len(r['matched_skills'])}/{r['total_skills']}"
+            })
+        
+        st.dataframe(pd.DataFrame(overview_data), use_container_width=True, hide_index=True)
+        st.info("💡 Pick a company above and click **Analyze Resume** to save a detailed analysis to your history.")
@@ -1,11 +1,15 @@
 # pdf_processor.py
+import io
+import os
+import threading
 from PyPDF2 import PdfReader
+from metrics import inc, timed
+from worker_pool import WorkerPool, TIMED_OUT
 # text_preprocessor.py
 # text_preprocessor.py
 import re
 import nltk
 from nltk.corpus import stopwords
-from nltk.stem import WordNetLemmatizer
 
 # Download required NLTK data
 try:
@@ -33,8 +37,11 @@ try:
 except LookupError:
     nltk.download('omw-1.4', quiet=True)
 
-# Now safe to use stopwords
+# Now safe to use stopwords (and the shared, cached lemmatizer)
 stop_words = set(stopwords.words('english'))
+from text_preprocessor import lemmatize_token
+
+_NON_ALPHA = re.compile(r'[^a-zA-Z\s]')
 
 
 def preprocess_text(text):
@@ -56,7 +63,7 @@ def preprocess_text(text):
     text = text.lower()
     
     # Remove special characters and numbers
-    text = re.sub(r'[^a-zA-Z\s]', '', text)
+    text = _NON_ALPHA.sub('', text)
     
     # Tokenize
     words = text.split()
@@ -64,14 +71,14 @@ def preprocess_text(text):
     # Remove stopwords
     words = [word for word in words if word not in stop_words]
     
-    # Lemmatize
-    lemmatizer = WordNetLemmatizer()
-    words = [lemmatizer.lemmatize(word) for word in words]
+    # Lemmatize (cached per distinct token)
+    words = [lemmatize_token(word) for word in words]
     
     return ' '.join(words)
 
 
 
+@timed("extract_text_from_pdf")
 def extract_text_from_pdf(pdf_path):
     """
     Extract text from a PDF file.
@@ -91,3 +98,71 @@ def extract_text_from_pdf(pdf_path):
     except Exception as e:
         print(f"Error extracting text from PDF: {e}")
         return ""
+
+
+# ============ PARALLEL EXTRACTION ============
+
+# Worker processes for multi-file extraction (0 = one per CPU)
+PDF_WORKERS = int(os.getenv("SKILLSYNC_PDF_WORKERS", "0")) or os.cpu_count() or 1
+
+# Seconds each file may take before its worker is terminated
+PDF_FILE_TIMEOUT = float(os.getenv("SKILLSYNC_PDF_FILE_TIMEOUT", "60"))
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def _get_pool():
+    """Get the shared extraction pool, creating it on first use"""
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = WorkerPool(extract_text_from_pdf_bytes, PDF_WORKERS)
+        return _pool
+
+
+def _read_pdf_bytes(pdf_file):
+    """Get the raw bytes of an uploaded file, file object or path"""
+    if isinstance(pdf_file, (str, os.PathLike)):
+        with open(pdf_file, 'rb') as f:
+            return f.read()
+    if hasattr(pdf_file, 'getvalue'):
+        return pdf_file.getvalue()
+    return pdf_file.read()
+
+
+def extract_text_from_pdf_bytes(pdf_bytes):
+    """Extract text from PDF bytes (runs inside pool workers)"""
+    return extract_text_from_pdf(io.BytesIO(pdf_bytes))
+
+
+def extract_texts_from_pdfs(pdf_files, timeout=PDF_FILE_TIMEOUT):
+    """
+    Extract text from several PDFs in parallel, yielding results as they complete.
+
+    A file that fails to parse yields an empty string. A file that runs past
+    its timeout, or crashes its worker, has that worker terminated and
+    yields an error, so one bad PDF never holds back the rest.
+
+    Args:
+        pdf_files (list): Uploaded files, file objects or paths.
+        timeout (float): Seconds each file may take.
+
+    Yields:
+        tuple: (index into pdf_files, extracted text, error or None), where
+               error is worker_pool.TIMED_OUT or worker_pool.WORKER_CRASHED.
+    """
+    if PDF_WORKERS <= 1:
+        for idx, pdf_file in enumerate(pdf_files):
+            yield idx, extract_text_from_pdf_bytes(_read_pdf_bytes(pdf_file)), None
+        return
+
+    payloads = [_read_pdf_bytes(pdf_file) for pdf_file in pdf_files]
+    for idx, text, error in _get_pool().map_unordered(payloads, timeout):
+        if error == TIMED_OUT:
+            inc("pdf_extract_timeouts_total")
+        elif error:
+            inc("pdf_worker_crashes_total")
+        if error:
+            print(f"Error extracting text from PDF {idx}: {error}")
+        yield idx, text or "", error
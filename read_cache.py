@@ -0,0 +1,132 @@
+# read_cache.py
+import threading
+import time
+from collections import OrderedDict
+
+
+class _Load:
+    """A load in flight for one key, shared by the threads waiting on it"""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.waiters = 0
+        self.generation = 0
+
+
+class TTLCache:
+    """
+    Thread-safe read-through cache whose entries expire after ttl seconds.
+
+    Concurrent misses on one key share a single load, and invalidate() also
+    discards loads that were already in flight so a write is never hidden
+    by a value read before it. Expired and invalidated entries are evicted,
+    and past max_entries the least recently used one is dropped.
+    A ttl of 0 disables caching.
+    """
+
+    def __init__(self, ttl, max_entries=1024):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._data = OrderedDict()  # key -> (expires_at, value), least recently used first
+        self._lock = threading.Lock()
+        self._loads = {}  # key -> _Load, only while some thread is loading or waiting
+
+    def _fresh(self, key):
+        entry = self._data.get(key)
+        if entry is None:
+            return None
+        if entry[0] <= time.monotonic():
+            del self._data[key]
+            self.evictions += 1
+            return None
+        self._data.move_to_end(key)
+        return entry
+
+    def _store(self, key, value):
+        self._data[key] = (time.monotonic() + self.ttl, value)
+        self._data.move_to_end(key)
+        if len(self._data) <= self.max_entries:
+            return
+        now = time.monotonic()
+        for expired in [k for k, (expires_at, _) in self._data.items() if expires_at <= now]:
+            del self._data[expired]
+            self.evictions += 1
+        while len(self._data) > self.max_entries:
+            self._data.popitem(last=False)
+            self.evictions += 1
+
+    def get_or_load(self, key, load):
+        """Get the cached value for key, calling load() on a miss or after expiry"""
+        if self.ttl <= 0:
+            return load()
+
+        with self._lock:
+            entry = self._fresh(key)
+            if entry is not None:
+                self.hits += 1
+                return entry[1]
+            pending = self._loads.get(key)
+            if pending is None:
+                pending = self._loads[key] = _Load()
+            pending.waiters += 1
+
+        try:
+            with pending.lock:
+                with self._lock:
+                    # Another thread may have loaded it while we waited
+                    entry = self._fresh(key)
+                    if entry is not None:
+                        self.hits += 1
+                        return entry[1]
+                    self.misses += 1
+                    generation = pending.generation
+
+                value = load()
+
+                with self._lock:
+                    if pending.generation == generation:
+                        self._store(key, value)
+                return value
+        finally:
+            with self._lock:
+                pending.waiters -= 1
+                if not pending.waiters:
+                    del self._loads[key]
+
+    def invalidate(self, *keys):
+        """Drop keys so the next read goes to the backend"""
+        with self._lock:
+            for key in keys:
+                self._data.pop(key, None)
+                if key in self._loads:
+                    self._loads[key].generation += 1
+
+    def invalidate_matching(self, match):
+        """Drop every key for which match(key) is true"""
+        with self._lock:
+            for key in [key for key in self._data if match(key)]:
+                del self._data[key]
+            for key, pending in self._loads.items():
+                if match(key):
+                    pending.generation += 1
+
+    def clear(self):
+        with self._lock:
+            for pending in self._loads.values():
+                pending.generation += 1
+            self._data.clear()
+
+    def stats(self):
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': self.hits / total if total else 0.0,
+                'size': len(self._data),
+                'evictions': self.evictions,
+                'ttl_seconds': self.ttl,
+            }
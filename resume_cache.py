@@ -0,0 +1,173 @@
+# resume_cache.py
+import hashlib
+import os
+import threading
+from collections import OrderedDict
+import numpy as np
+from vector_store import get_store
+
+# Maximum number of resume embeddings kept in memory per process
+RESUME_CACHE_SIZE = int(os.getenv("SKILLSYNC_RESUME_CACHE_SIZE", "1024"))
+
+# Keep embeddings in an on-disk vector store shared by every process on this machine
+LOCAL_RESUME_STORE = os.getenv("SKILLSYNC_LOCAL_RESUME_STORE", "true").lower() in ("1", "true", "yes")
+
+# Also store embeddings in the resume_embeddings table next to student_resumes
+PERSIST_RESUME_EMBEDDINGS = os.getenv("SKILLSYNC_PERSIST_RESUME_EMBEDDINGS", "false").lower() in ("1", "true", "yes")
+
+
+def resume_hash(processed_text, model_name):
+    """Content address of a preprocessed resume for a given model"""
+    return hashlib.sha256(f"{model_name}\0{processed_text}".encode('utf-8')).hexdigest()
+
+
+class LRUCache:
+    """Thread-safe, size-bounded least-recently-used cache with hit/miss counters"""
+
+    def __init__(self, max_size):
+        self.max_size = max_size
+        self.hits = 0
+        self.misses = 0
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            if key in self._data:
+                self._data.move_to_end(key)
+                self.hits += 1
+                return self._data[key]
+            self.misses += 1
+            return None
+
+    def put(self, key, value):
+        with self._lock:
+            self._data[key] = value
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_size:
+                self._data.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self):
+        return len(self._data)
+
+
+_embeddings = LRUCache(RESUME_CACHE_SIZE)
+
+
+def _local_store(model_name, dim=None):
+    """Get this model's local resume vector store (None if off, or not created yet and no dim given)"""
+    if not LOCAL_RESUME_STORE:
+        return None
+    return get_store(f"resumes-{model_name}", dim)
+
+
+def _load_local(content_hashes, model_name):
+    """Fetch embeddings kept in the local vector store"""
+    if not content_hashes:
+        return {}
+    try:
+        store = _local_store(model_name)
+        return store.get(content_hashes) if store is not None else {}
+    except (OSError, ValueError, RuntimeError) as e:
+        print(f"Error reading local resume embeddings: {e}")
+        return {}
+
+
+def _save_local(new_embeddings, model_name):
+    if not new_embeddings:
+        return
+    try:
+        store = _local_store(model_name, len(next(iter(new_embeddings.values()))))
+        if store is not None:
+            store.add(list(new_embeddings), np.vstack(list(new_embeddings.values())))
+    except (OSError, ValueError, RuntimeError) as e:
+        print(f"Error saving local resume embeddings: {e}")
+
+
+def _load_persisted(content_hashes, model_name):
+    """Fetch stored embeddings for the given hashes, or {} if persistence is off"""
+    if not PERSIST_RESUME_EMBEDDINGS or not content_hashes:
+        return {}
+    from database import get_resume_embeddings
+    return {
+        content_hash: np.asarray(embedding, dtype=np.float32)
+        for content_hash, embedding in get_resume_embeddings(content_hashes, model_name).items()
+    }
+
+
+def _persist(new_embeddings, model_name):
+    if not PERSIST_RESUME_EMBEDDINGS or not new_embeddings:
+        return
+    from database import save_resume_embeddings
+    save_resume_embeddings({
+        content_hash: embedding.tolist() for content_hash, embedding in new_embeddings.items()
+    }, model_name)
+
+
+def get_resume_embeddings(processed_texts, encode, model_name):
+    """
+    Get normalized embeddings for preprocessed resumes, encoding only cache misses.
+
+    Lookups go memory -> local vector store -> resume_embeddings table
+    (if enabled) -> encoder. All misses are encoded together in one call.
+
+    Args:
+        processed_texts (list): Preprocessed resume texts.
+        encode (callable): Encodes a list of texts into normalized row vectors.
+        model_name (str): Name of the embedding model, part of the cache key.
+
+    Returns:
+        np.ndarray: One embedding row per input text, in input order.
+    """
+    hashes = [resume_hash(text, model_name) for text in processed_texts]
+
+    found = {}
+    for content_hash in dict.fromkeys(hashes):
+        embedding = _embeddings.get(content_hash)
+        if embedding is not None:
+            found[content_hash] = embedding
+
+    missing = [content_hash for content_hash in dict.fromkeys(hashes) if content_hash not in found]
+    if missing:
+        for content_hash, embedding in _load_local(missing, model_name).items():
+            _embeddings.put(content_hash, embedding)
+            found[content_hash] = embedding
+
+    missing = [content_hash for content_hash in missing if content_hash not in found]
+    if missing:
+        persisted = _load_persisted(missing, model_name)
+        for content_hash, embedding in persisted.items():
+            _embeddings.put(content_hash, embedding)
+            found[content_hash] = embedding
+        _save_local(persisted, model_name)
+
+    to_encode = {}
+    for text, content_hash in zip(processed_texts, hashes):
+        if content_hash not in found:
+            to_encode[content_hash] = text
+
+    if to_encode:
+        encoded = dict(zip(to_encode, encode(list(to_encode.values()))))
+        for content_hash, embedding in encoded.items():
+            _embeddings.put(content_hash, embedding)
+            found[content_hash] = embedding
+        _save_local(encoded, model_name)
+        _persist(encoded, model_name)
+
+    return np.vstack([found[content_hash] for content_hash in hashes])
+
+
+def get_cache_stats():
+    """Get in-memory resume embedding cache counters"""
+    return {
+        'size': len(_embeddings),
+        'max_size': _embeddings.max_size,
+        'hits': _embeddings.hits,
+        'misses': _embeddings.misses,
+        'persistent': PERSIST_RESUME_EMBEDDINGS,
+        'local_store': LOCAL_RESUME_STORE
+    }
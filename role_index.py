@@ -0,0 +1,137 @@
+# role_index.py
+import hashlib
+import json
+import os
+import re
+import time
+import numpy as np
+from company_database import COMPANY_JOB_SKILLS
+
+# Where precomputed role embeddings are stored between restarts
+ROLE_INDEX_DIR = os.getenv("SKILLSYNC_ROLE_INDEX_DIR", os.path.join(".cache", "role_index"))
+
+# Older indexes for the same model are deleted once unused for this many seconds
+# (loading an index marks it used, so a process still on an older catalog keeps its file)
+ROLE_INDEX_STALE_AFTER = float(os.getenv("SKILLSYNC_ROLE_INDEX_STALE_AFTER", str(24 * 3600)))
+
+
+def get_all_targets():
+    """Get every (company, job role) pair in the catalog"""
+    return [
+        (company_name, job_role)
+        for company_name, roles in COMPANY_JOB_SKILLS.items()
+        for job_role in roles
+    ]
+
+
+def build_job_description(company_name, job_role):
+    """Build the text that represents a company/job role for semantic matching"""
+    required_skills = COMPANY_JOB_SKILLS[company_name][job_role]
+    return f"Required skills for {job_role} at {company_name}: {', '.join(required_skills)}."
+
+
+def catalog_hash(model_name):
+    """
+    Hash the catalog contents together with the model name.
+
+    The job description texts are hashed (not just the skill lists) so a
+    change to the description template also invalidates the index.
+    """
+    payload = json.dumps({
+        'model': model_name,
+        'roles': [
+            [company_name, job_role, build_job_description(company_name, job_role)]
+            for company_name, job_role in get_all_targets()
+        ]
+    }, ensure_ascii=False)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()[:16]
+
+
+class RoleIndex:
+    """Normalized embeddings for every catalog role, one row per (company, job role)"""
+
+    def __init__(self, targets, embeddings, key):
+        self.targets = targets
+        self.embeddings = embeddings
+        self.key = key
+        self._positions = {target: idx for idx, target in enumerate(targets)}
+
+    def __len__(self):
+        return len(self.targets)
+
+    def __contains__(self, target):
+        return target in self._positions
+
+    def position(self, company_name, job_role):
+        """Get the row number of a company/job role"""
+        return self._positions[(company_name, job_role)]
+
+    def rows(self, targets):
+        """Get the embedding rows for a list of (company, job role) pairs"""
+        return self.embeddings[[self._positions[target] for target in targets]]
+
+
+def _model_prefix(model_name):
+    return re.sub(r'[^\w.-]', '_', model_name) + "-"
+
+
+def _index_path(key, model_name):
+    return os.path.join(ROLE_INDEX_DIR, f"{_model_prefix(model_name)}{key}.npy")
+
+
+def _save_embeddings(key, model_name, embeddings):
+    """Write the embeddings atomically and drop this model's indexes for older catalogs"""
+    os.makedirs(ROLE_INDEX_DIR, exist_ok=True)
+    path = _index_path(key, model_name)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, 'wb') as f:
+        np.save(f, embeddings)
+    os.replace(tmp_path, path)
+
+    # Other models' indexes are never touched
+    prefix = _model_prefix(model_name)
+    for filename in os.listdir(ROLE_INDEX_DIR):
+        other = os.path.join(ROLE_INDEX_DIR, filename)
+        if not filename.startswith(prefix) or not filename.endswith('.npy') or other == path:
+            continue
+        try:
+            if time.time() - os.path.getmtime(other) > ROLE_INDEX_STALE_AFTER:
+                os.remove(other)
+        except OSError:
+            pass
+
+
+def load_or_build_role_index(encode, model_name):
+    """
+    Load the role index from disk, or build and save it if the catalog or model changed.
+
+    Args:
+        encode (callable): Encodes a list of texts into normalized row vectors.
+        model_name (str): Name of the embedding model, part of the index key.
+
+    Returns:
+        RoleIndex: Embeddings for every role in COMPANY_JOB_SKILLS.
+    """
+    targets = get_all_targets()
+    key = catalog_hash(model_name)
+    path = _index_path(key, model_name)
+
+    if os.path.exists(path):
+        try:
+            embeddings = np.load(path, mmap_mode='r')
+            if embeddings.shape[0] == len(targets):
+                # Mark it in use so other processes' saves keep it
+                os.utime(path)
+                return RoleIndex(targets, embeddings, key)
+        except (OSError, ValueError) as e:
+            print(f"Error loading role index, rebuilding: {e}")
+
+    job_texts = [build_job_description(company_name, job_role) for company_name, job_role in targets]
+    embeddings = np.asarray(encode(job_texts), dtype=np.float32)
+
+    try:
+        _save_embeddings(key, model_name, embeddings)
+    except OSError as e:
+        print(f"Error saving role index: {e}")
+
+    return RoleIndex(targets, embeddings, key)
@@ -0,0 +1,124 @@
+# skill_matcher.py
+from collections import deque
+from company_database import COMPANY_JOB_SKILLS
+from data_manager import JOB_SKILL_DATABASE
+
+
+def _is_boundary(text, idx):
+    """A position is a token boundary if it is outside the text or not a letter/digit"""
+    return idx < 0 or idx >= len(text) or not text[idx].isalnum()
+
+
+class SkillAutomaton:
+    """
+    Aho-Corasick automaton over a fixed set of skills.
+
+    One linear pass over a text finds every skill that occurs as whole
+    tokens, so 'c' matches "c" but not the c in "cloud".
+    """
+
+    def __init__(self, skills):
+        self.skills = sorted(set(skill.lower() for skill in skills if skill))
+        self.skill_ids = {skill: idx for idx, skill in enumerate(self.skills)}
+
+        # State 0 is the root; each state has transitions, a fail link and outputs
+        self._goto = [{}]
+        self._fail = [0]
+        self._output = [[]]
+
+        for skill in self.skills:
+            state = 0
+            for char in skill:
+                next_state = self._goto[state].get(char)
+                if next_state is None:
+                    next_state = len(self._goto)
+                    self._goto.append({})
+                    self._fail.append(0)
+                    self._output.append([])
+                    self._goto[state][char] = next_state
+                state = next_state
+            self._output[state].append(self.skill_ids[skill])
+
+        # Breadth-first pass to set fail links and merge outputs along them
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for char, next_state in self._goto[state].items():
+                queue.append(next_state)
+                fail = self._fail[state]
+                while fail and char not in self._goto[fail]:
+                    fail = self._fail[fail]
+                self._fail[next_state] = self._goto[fail].get(char, 0)
+                self._output[next_state] = self._output[next_state] + self._output[self._fail[next_state]]
+
+        self._lengths = [len(skill) for skill in self.skills]
+
+    def find_skill_ids(self, text):
+        """
+        Find every skill that occurs in the text as whole tokens.
+
+        Args:
+            text (str): Lowercased (preprocessed) text.
+
+        Returns:
+            set: IDs (positions in self.skills) of the skills found.
+        """
+        found = set()
+        goto, fail, output, lengths = self._goto, self._fail, self._output, self._lengths
+        state = 0
+
+        for end, char in enumerate(text):
+            while state and char not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(char, 0)
+
+            if output[state] and _is_boundary(text, end + 1):
+                for skill_id in output[state]:
+                    if skill_id not in found and _is_boundary(text, end - lengths[skill_id]):
+                        found.add(skill_id)
+        return found
+
+    def find_skills(self, text):
+        """Find every skill that occurs in the text as whole tokens"""
+        return {self.skills[skill_id] for skill_id in self.find_skill_ids(text)}
+
+
+def _catalog_skills():
+    """Every skill in COMPANY_JOB_SKILLS and JOB_SKILL_DATABASE"""
+    skills = set()
+    for roles in COMPANY_JOB_SKILLS.values():
+        for required_skills in roles.values():
+            skills.update(required_skills)
+    for required_skills in JOB_SKILL_DATABASE.values():
+        skills.update(required_skills)
+    return skills
+
+
+# Compiled once per process from the whole catalog
+skill_automaton = SkillAutomaton(_catalog_skills())
+
+
+def find_skills(processed_text):
+    """Find every catalog skill in a preprocessed resume in one pass"""
+    return skill_automaton.find_skills(processed_text.lower())
+
+
+def split_skills(found_skills, required_skills):
+    """
+    Split a role's required skills into matched and missing, keeping catalog order.
+
+    Args:
+        found_skills (set): Skills found in the resume (from find_skills).
+        required_skills (list): The role's required skills.
+
+    Returns:
+        tuple: (matched_skills, missing_skills)
+    """
+    matched_skills = []
+    missing_skills = []
+    for skill in required_skills:
+        if skill.lower() in found_skills:
+            matched_skills.append(skill)
+        else:
+            missing_skills.append(skill)
+    return matched_skills, missing_skills
@@ -0,0 +1,87 @@
+# skill_matrix.py
+import numpy as np
+from company_database import COMPANY_JOB_SKILLS
+from role_index import get_all_targets
+from skill_matcher import skill_automaton
+
+
+class SkillMatrix:
+    """
+    Role x skill incidence matrix for vectorized ATS scoring.
+
+    Rows follow get_all_targets() (the same order as the role index) and
+    columns are the skill IDs of the catalog skill automaton.
+    """
+
+    def __init__(self, targets):
+        self.targets = targets
+        self.skills = skill_automaton.skills
+        self._positions = {target: idx for idx, target in enumerate(targets)}
+
+        # Counts rather than 0/1 so a skill listed twice weighs like the original loop
+        self.incidence = np.zeros((len(targets), len(self.skills)), dtype=np.float32)
+        for row, (company_name, job_role) in enumerate(targets):
+            for skill in COMPANY_JOB_SKILLS[company_name][job_role]:
+                self.incidence[row, skill_automaton.skill_ids[skill.lower()]] += 1
+
+        self.required_counts = self.incidence.sum(axis=1)
+
+    def position(self, company_name, job_role):
+        """Get the row number of a company/job role"""
+        return self._positions[(company_name, job_role)]
+
+    def resume_vectors(self, skill_id_sets):
+        """
+        Turn resumes' found skill IDs into a binary resume x skill matrix.
+
+        Args:
+            skill_id_sets (list): One iterable of skill IDs per resume.
+
+        Returns:
+            np.ndarray: float32 matrix of shape (n_resumes, n_skills).
+        """
+        vectors = np.zeros((len(skill_id_sets), len(self.skills)), dtype=np.float32)
+        for row, skill_ids in enumerate(skill_id_sets):
+            vectors[row, list(skill_ids)] = 1
+        return vectors
+
+    def ats_scores(self, resume_vectors, rows=None):
+        """
+        ATS scores for every resume against every (or selected) role in one product.
+
+        Args:
+            resume_vectors (np.ndarray): Output of resume_vectors().
+            rows (list): Role row numbers to score; all roles if None.
+
+        Returns:
+            np.ndarray: Percentages of shape (n_resumes, n_roles).
+        """
+        incidence = self.incidence if rows is None else self.incidence[rows]
+        counts = self.required_counts if rows is None else self.required_counts[rows]
+        matched = resume_vectors @ incidence.T
+        return np.divide(matched * 100, counts, out=np.zeros_like(matched), where=counts > 0)
+
+    def decode(self, skill_ids, company_name, job_role):
+        """
+        Get matched and missing skills for one resume/role pair, in catalog order.
+
+        Only needed for the rows actually being displayed.
+        """
+        skill_ids = set(skill_ids)
+        matched_skills = []
+        missing_skills = []
+        for skill in COMPANY_JOB_SKILLS[company_name][job_role]:
+            if skill_automaton.skill_ids[skill.lower()] in skill_ids:
+                matched_skills.append(skill)
+            else:
+                missing_skills.append(skill)
+        return matched_skills, missing_skills
+
+
+# Compiled once per process from the catalog
+skill_matrix = SkillMatrix(get_all_targets())
+
+
+def find_skill_ids(processed_text):
+    """Find the skill IDs (matrix columns) present in a preprocessed resume"""
+    return skill_automaton.find_skill_ids(processed_text.lower())
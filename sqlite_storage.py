@@ -0,0 +1,425 @@
+# sqlite_storage.py
+import json
+import os
+import sqlite3
+import threading
+from contextlib import contextmanager
+from storage import StorageBackend
+
+# Database file for the local backend
+SQLITE_PATH = os.getenv("SKILLSYNC_SQLITE_PATH", "skillsync.db")
+
+_NOW = "(strftime('%Y-%m-%dT%H:%M:%f', 'now'))"
+
+SCHEMA = f"""
+CREATE TABLE IF NOT EXISTS students (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    email TEXT NOT NULL UNIQUE,
+    name TEXT NOT NULL,
+    password TEXT NOT NULL,
+    year TEXT,
+    branch TEXT,
+    created_at TEXT NOT NULL DEFAULT {_NOW}
+);
+
+CREATE TABLE IF NOT EXISTS placement_officers (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    email TEXT NOT NULL UNIQUE,
+    name TEXT NOT NULL,
+    password TEXT NOT NULL,
+    created_at TEXT NOT NULL DEFAULT {_NOW}
+);
+
+CREATE TABLE IF NOT EXISTS student_resumes (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    student_email TEXT NOT NULL,
+    resume_text TEXT,
+    resume_filename TEXT,
+    version_number INTEGER NOT NULL,
+    is_current INTEGER NOT NULL DEFAULT 1,
+    uploaded_at TEXT NOT NULL DEFAULT {_NOW}
+);
+CREATE INDEX IF NOT EXISTS idx_student_resumes_email ON student_resumes (student_email, version_number);
+CREATE INDEX IF NOT EXISTS idx_student_resumes_current ON student_resumes (is_current, student_email);
+-- At most one current resume per student (older files may predate atomic saves)
+UPDATE student_resumes SET is_current = 0
+WHERE is_current = 1 AND id NOT IN (
+    SELECT MAX(id) FROM student_resumes WHERE is_current = 1 GROUP BY student_email
+);
+CREATE UNIQUE INDEX IF NOT EXISTS idx_student_resumes_one_current ON student_resumes (student_email) WHERE is_current = 1;
+
+CREATE TABLE IF NOT EXISTS resume_embeddings (
+    content_hash TEXT NOT NULL,
+    model_name TEXT NOT NULL,
+    embedding TEXT NOT NULL,
+    created_at TEXT NOT NULL DEFAULT {_NOW},
+    PRIMARY KEY (content_hash, model_name)
+);
+
+-- Embedding and found skills of each student's current resume (cohort ranking)
+CREATE TABLE IF NOT EXISTS resume_features (
+    student_email TEXT PRIMARY KEY,
+    version_number INTEGER NOT NULL,
+    model_name TEXT NOT NULL,
+    skills TEXT NOT NULL,
+    embedding TEXT NOT NULL,
+    updated_at TEXT NOT NULL DEFAULT {_NOW}
+);
+
+CREATE TABLE IF NOT EXISTS analysis_history (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    student_email TEXT NOT NULL,
+    company_name TEXT NOT NULL,
+    job_role TEXT NOT NULL,
+    resume_version INTEGER,
+    resume_filename TEXT,
+    ats_score REAL,
+    semantic_score REAL,
+    combined_score REAL,
+    matched_skills TEXT,
+    missing_skills TEXT,
+    feedback TEXT,
+    analyzed_at TEXT NOT NULL DEFAULT {_NOW}
+);
+CREATE INDEX IF NOT EXISTS idx_analysis_history_email ON analysis_history (student_email, analyzed_at);
+CREATE INDEX IF NOT EXISTS idx_analysis_history_role ON analysis_history (company_name, job_role, analyzed_at);
+CREATE INDEX IF NOT EXISTS idx_analysis_history_analyzed_at ON analysis_history (analyzed_at);
+CREATE INDEX IF NOT EXISTS idx_analysis_history_latest ON analysis_history (company_name, job_role, student_email, analyzed_at);
+
+-- Latest analysis per (company, role, student); each row is one index probe
+CREATE VIEW IF NOT EXISTS latest_student_analyses AS
+SELECT a.* FROM analysis_history a
+WHERE a.id = (
+    SELECT b.id FROM analysis_history b
+    WHERE b.company_name = a.company_name AND b.job_role = a.job_role AND b.student_email = a.student_email
+    ORDER BY b.analyzed_at DESC, b.id DESC
+    LIMIT 1
+);
+
+CREATE TABLE IF NOT EXISTS announcements (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    title TEXT NOT NULL,
+    message TEXT NOT NULL,
+    posted_by TEXT,
+    posted_by_name TEXT,
+    is_active INTEGER NOT NULL DEFAULT 1,
+    created_at TEXT NOT NULL DEFAULT {_NOW}
+);
+CREATE INDEX IF NOT EXISTS idx_announcements_active ON announcements (is_active, created_at);
+
+CREATE TABLE IF NOT EXISTS published_rankings (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    title TEXT NOT NULL,
+    company_name TEXT,
+    job_role TEXT,
+    description TEXT,
+    rankings TEXT,
+    published_by TEXT,
+    published_by_name TEXT,
+    is_active INTEGER NOT NULL DEFAULT 1,
+    created_at TEXT NOT NULL DEFAULT {_NOW}
+);
+CREATE INDEX IF NOT EXISTS idx_published_rankings_active ON published_rankings (is_active, created_at);
+
+-- One row per ranked student; the rankings JSON column is only kept for older rows
+CREATE TABLE IF NOT EXISTS ranking_entries (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    ranking_id INTEGER NOT NULL REFERENCES published_rankings (id) ON DELETE CASCADE,
+    rank INTEGER NOT NULL,
+    student_email TEXT NOT NULL,
+    student_name TEXT,
+    student_display TEXT,
+    combined_score REAL,
+    ats_score REAL,
+    semantic_score REAL,
+    UNIQUE (ranking_id, rank)
+);
+CREATE INDEX IF NOT EXISTS idx_ranking_entries_student ON ranking_entries (student_email, ranking_id);
+"""
+
+# One-off data migrations, run in order; PRAGMA user_version records how many have run
+MIGRATIONS = [
+    # Backfill rankings published before ranking_entries existed. Legacy
+    # rankings may hold tied ranks, so entries are numbered by position
+    # (ranks run 1..N as for new rankings); emails are masked like _mask_email.
+    """
+    INSERT INTO ranking_entries (ranking_id, rank, student_email, student_name, student_display, combined_score, ats_score, semantic_score)
+    SELECT ranking_id, ROW_NUMBER() OVER (PARTITION BY ranking_id ORDER BY legacy_rank, position),
+           email, name,
+           substr(local_part, 1, min(3, length(local_part) / 2)) || '***' ||
+           CASE WHEN instr(email, '@') > 0 THEN substr(email, instr(email, '@')) ELSE '' END,
+           combined_score, ats_score, semantic_score
+    FROM (
+        SELECT p.id AS ranking_id, CAST(e.key AS INTEGER) AS position,
+               json_extract(e.value, '$.rank') AS legacy_rank,
+               json_extract(e.value, '$.student_email') AS email,
+               json_extract(e.value, '$.student_name') AS name,
+               CASE WHEN instr(json_extract(e.value, '$.student_email'), '@') > 0
+                    THEN substr(json_extract(e.value, '$.student_email'), 1, instr(json_extract(e.value, '$.student_email'), '@') - 1)
+                    ELSE json_extract(e.value, '$.student_email') END AS local_part,
+               json_extract(e.value, '$.combined_score') AS combined_score,
+               json_extract(e.value, '$.ats_score') AS ats_score,
+               json_extract(e.value, '$.semantic_score') AS semantic_score
+        FROM published_rankings p, json_each(p.rankings) e
+        WHERE json_valid(p.rankings)
+          AND json_type(p.rankings) = 'array'
+          AND NOT EXISTS (SELECT 1 FROM ranking_entries r WHERE r.ranking_id = p.id)
+    )
+    """,
+]
+
+# Columns stored as JSON text / 0-1 integers and converted back on read
+JSON_COLUMNS = {'matched_skills', 'missing_skills', 'rankings', 'embedding', 'skills'}
+BOOL_COLUMNS = {'is_current', 'is_active'}
+
+
+class SQLiteStorage(StorageBackend):
+    """
+    Local single-file storage backend (WAL mode, one connection per thread).
+
+    Same tables and row shapes as the Supabase project, so database.py
+    behaves identically on either backend.
+    """
+
+    def __init__(self, path=None):
+        self.path = path or SQLITE_PATH
+        self._local = threading.local()
+
+        conn = self._connection()
+        conn.executescript(SCHEMA)
+        self._migrate()
+        self._columns = {
+            table: [row['name'] for row in conn.execute(f"PRAGMA table_info({table})")]
+            for (table,) in conn.execute("SELECT name FROM sqlite_master WHERE type IN ('table', 'view') AND name NOT LIKE 'sqlite_%'")
+        }
+
+    def _connection(self):
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            conn.row_factory = sqlite3.Row
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    @contextmanager
+    def _transaction(self):
+        conn = self._connection()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            yield conn
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+
+    def _migrate(self):
+        """Run the MIGRATIONS this database has not run yet"""
+        if self._connection().execute("PRAGMA user_version").fetchone()[0] >= len(MIGRATIONS):
+            return
+        with self._transaction() as conn:
+            # Re-read under the write lock: another process may have just migrated
+            done = conn.execute("PRAGMA user_version").fetchone()[0]
+            for migration in MIGRATIONS[done:]:
+                conn.execute(migration)
+            conn.execute(f"PRAGMA user_version = {len(MIGRATIONS)}")
+
+    # ---- helpers ----
+
+    def _check_columns(self, table, columns):
+        """Reject unknown tables/columns (names are interpolated into SQL)"""
+        if table not in self._columns:
+            raise ValueError(f"Unknown table '{table}'")
+        unknown = set(columns) - set(self._columns[table])
+        if unknown:
+            raise ValueError(f"Unknown column(s) {sorted(unknown)} for table '{table}'")
+
+    def _projection(self, table, columns):
+        self._check_columns(table, [])
+        if columns.strip() == "*":
+            return list(self._columns[table])
+        names = [name.strip() for name in columns.split(",") if name.strip()]
+        self._check_columns(table, names)
+        return names
+
+    @staticmethod
+    def _encode(row):
+        return {
+            column: json.dumps(value) if column in JSON_COLUMNS and value is not None
+            else int(value) if column in BOOL_COLUMNS and value is not None
+            else value
+            for column, value in row.items()
+        }
+
+    @staticmethod
+    def _decode(row):
+        decoded = dict(row)
+        for column, value in decoded.items():
+            if value is None:
+                continue
+            if column in JSON_COLUMNS:
+                decoded[column] = json.loads(value)
+            elif column in BOOL_COLUMNS:
+                decoded[column] = bool(value)
+        return decoded
+
+    def _where(self, table, filters, in_filters=None):
+        filters = filters or {}
+        in_filters = in_filters or {}
+        self._check_columns(table, list(filters) + list(in_filters))
+
+        clauses = []
+        params = []
+        for column, value in self._encode(filters).items():
+            clauses.append(f"{column} = ?")
+            params.append(value)
+        for column, values in in_filters.items():
+            values = list(values)
+            if not values:
+                clauses.append("1 = 0")
+                continue
+            clauses.append(f"{column} IN ({', '.join('?' * len(values))})")
+            params.extend(values)
+
+        return (" WHERE " + " AND ".join(clauses) if clauses else ""), params
+
+    def _rows_by_rowid(self, conn, table, rowids):
+        """Read back rows by rowid, in the given order"""
+        if not rowids:
+            return []
+        rows = {
+            row['_rowid']: row
+            for row in conn.execute(
+                f"SELECT rowid AS _rowid, * FROM {table} WHERE rowid IN ({', '.join('?' * len(rowids))})", rowids
+            )
+        }
+        result = []
+        for rowid in rowids:
+            if rowid in rows:
+                row = dict(rows[rowid])
+                del row['_rowid']
+                result.append(self._decode(row))
+        return result
+
+    # ---- StorageBackend ----
+
+    def select(self, table, columns="*", filters=None, in_filters=None,
+               order_by=None, desc=False, limit=None, offset=None):
+        names = self._projection(table, columns)
+        where, params = self._where(table, filters, in_filters)
+        sql = f"SELECT {', '.join(names)} FROM {table}{where}"
+
+        if order_by:
+            order_columns = [order_by] if isinstance(order_by, str) else list(order_by)
+            self._check_columns(table, order_columns)
+            direction = "DESC" if desc else "ASC"
+            # id/rowid breaks ties the way insertion order would (views only have id)
+            tiebreak = 'id' if 'id' in self._columns[table] else 'rowid'
+            if tiebreak not in order_columns:
+                order_columns.append(tiebreak)
+            sql += " ORDER BY " + ", ".join(f"{column} {direction}" for column in order_columns)
+        if limit is not None or offset:
+            sql += " LIMIT ? OFFSET ?"
+            params += [-1 if limit is None else limit, offset or 0]
+
+        return [self._decode(row) for row in self._connection().execute(sql, params)]
+
+    def count(self, table, filters=None, in_filters=None):
+        where, params = self._where(table, filters, in_filters)
+        return self._connection().execute(f"SELECT COUNT(*) FROM {table}{where}", params).fetchone()[0]
+
+    def insert(self, table, rows):
+        rows = [rows] if isinstance(rows, dict) else list(rows)
+        with self._transaction() as conn:
+            rowids = []
+            for row in rows:
+                self._check_columns(table, row)
+                row = self._encode(row)
+                columns = list(row)
+                cursor = conn.execute(
+                    f"INSERT INTO {table} ({', '.join(columns)}) VALUES ({', '.join('?' * len(columns))})",
+                    [row[column] for column in columns]
+                )
+                rowids.append(cursor.lastrowid)
+            return self._rows_by_rowid(conn, table, rowids)
+
+    def upsert(self, table, rows, on_conflict):
+        rows = [rows] if isinstance(rows, dict) else list(rows)
+        conflict_columns = [name.strip() for name in on_conflict.split(",")]
+        self._check_columns(table, conflict_columns)
+
+        with self._transaction() as conn:
+            upserted = []
+            for row in rows:
+                self._check_columns(table, row)
+                encoded = self._encode(row)
+                columns = list(encoded)
+                updates = [column for column in columns if column not in conflict_columns]
+                conn.execute(
+                    f"INSERT INTO {table} ({', '.join(columns)}) VALUES ({', '.join('?' * len(columns))}) "
+                    f"ON CONFLICT ({', '.join(conflict_columns)}) DO "
+                    + (f"UPDATE SET {', '.join(f'{column} = excluded.{column}' for column in updates)}" if updates else "NOTHING"),
+                    [encoded[column] for column in columns]
+                )
+                where, params = self._where(table, {column: row[column] for column in conflict_columns})
+                upserted.extend(self._decode(r) for r in conn.execute(f"SELECT * FROM {table}{where}", params))
+            return upserted
+
+    def update(self, table, values, filters):
+        self._check_columns(table, values)
+        where, params = self._where(table, filters)
+        encoded = self._encode(values)
+        columns = list(encoded)
+
+        with self._transaction() as conn:
+            rowids = [row[0] for row in conn.execute(f"SELECT rowid FROM {table}{where}", params)]
+            if rowids:
+                conn.execute(
+                    f"UPDATE {table} SET {', '.join(f'{column} = ?' for column in columns)} "
+                    f"WHERE rowid IN ({', '.join('?' * len(rowids))})",
+                    [encoded[column] for column in columns] + rowids
+                )
+            return self._rows_by_rowid(conn, table, rowids)
+
+    def delete(self, table, filters):
+        where, params = self._where(table, filters)
+        with self._transaction() as conn:
+            deleted = [self._decode(row) for row in conn.execute(f"SELECT * FROM {table}{where}", params)]
+            conn.execute(f"DELETE FROM {table}{where}", params)
+            return deleted
+
+    def save_resume_versions(self, resumes):
+        with self._transaction() as conn:
+            rowids = []
+            for resume in resumes:
+                student_email = resume['student_email']
+                (current_max,) = conn.execute(
+                    "SELECT COALESCE(MAX(version_number), 0) FROM student_resumes WHERE student_email = ?",
+                    [student_email]
+                ).fetchone()
+                conn.execute(
+                    "UPDATE student_resumes SET is_current = 0 WHERE student_email = ? AND is_current = 1",
+                    [student_email]
+                )
+                cursor = conn.execute(
+                    "INSERT INTO student_resumes (student_email, resume_text, resume_filename, version_number, is_current) "
+                    "VALUES (?, ?, ?, ?, 1)",
+                    [student_email, resume.get('resume_text'), resume.get('resume_filename'), current_max + 1]
+                )
+                rowids.append(cursor.lastrowid)
+
+                if resume.get('analysis'):
+                    analysis = self._encode({
+                        **resume['analysis'],
+                        'student_email': student_email,
+                        'resume_version': current_max + 1,
+                        'resume_filename': resume.get('resume_filename')
+                    })
+                    self._check_columns('analysis_history', analysis)
+                    columns = list(analysis)
+                    conn.execute(
+                        f"INSERT INTO analysis_history ({', '.join(columns)}) VALUES ({', '.join('?' * len(columns))})",
+                        [analysis[column] for column in columns]
+                    )
+            return self._rows_by_rowid(conn, 'student_resumes', rowids)
@@ -0,0 +1,91 @@
+# storage.py
+import os
+import threading
+from abc import ABC, abstractmethod
+
+# Which storage backend database.py uses: "supabase" (default) or "sqlite"
+STORAGE_BACKEND = os.getenv("SKILLSYNC_STORAGE", "supabase").lower()
+
+
+class StorageBackend(ABC):
+    """
+    Table-level operations that database.py is written against.
+
+    Rows are plain dicts. Every method returns a list of rows (the rows
+    read, inserted, updated or deleted), mirroring Supabase's response.data.
+
+    Args common to several methods:
+        table (str): Table name.
+        filters (dict): column -> value equality filters (AND-ed).
+        in_filters (dict): column -> list of allowed values.
+    """
+
+    @abstractmethod
+    def select(self, table, columns="*", filters=None, in_filters=None,
+               order_by=None, desc=False, limit=None, offset=None):
+        """Read rows, optionally projected, filtered, ordered and paged
+
+        order_by is a column name or a list of them (later columns break
+        ties); desc applies to every column.
+        """
+
+    @abstractmethod
+    def count(self, table, filters=None, in_filters=None):
+        """Count the rows matching the filters without reading them"""
+
+    @abstractmethod
+    def insert(self, table, rows):
+        """Insert one row (dict) or many rows (list of dicts)"""
+
+    @abstractmethod
+    def upsert(self, table, rows, on_conflict):
+        """Insert rows, replacing existing rows that clash on the on_conflict columns"""
+
+    @abstractmethod
+    def update(self, table, values, filters):
+        """Set values on every row matching filters"""
+
+    @abstractmethod
+    def delete(self, table, filters):
+        """Delete every row matching filters"""
+
+    @abstractmethod
+    def save_resume_versions(self, resumes):
+        """
+        Atomically save new current resume versions.
+
+        For each entry (student_email, resume_text, resume_filename) the next
+        version number is assigned and all older versions stop being current,
+        all in one transaction so concurrent saves never leave two current
+        rows. Several entries for one student get consecutive versions in
+        input order.
+
+        An entry may also carry an 'analysis' dict (analysis_history columns
+        other than student_email, resume_version and resume_filename); it is
+        inserted in the same transaction against the new version, so either
+        every resume and analysis is saved or none is.
+
+        Returns:
+            list: The inserted student_resumes rows, in input order.
+        """
+
+
+_storage = None
+_storage_lock = threading.Lock()
+
+
+def get_storage():
+    """Get the process-wide storage backend selected by SKILLSYNC_STORAGE"""
+    global _storage
+    if _storage is None:
+        with _storage_lock:
+            if _storage is None:
+                if STORAGE_BACKEND == "sqlite":
+                    from sqlite_storage import SQLiteStorage
+                    _storage = SQLiteStorage()
+                elif STORAGE_BACKEND == "supabase":
+                    from supabase_storage import SupabaseStorage
+                    _storage = SupabaseStorage()
+                else:
+                    raise ValueError(f"Unknown storage backend '{STORAGE_BACKEND}' (expected 'supabase' or 'sqlite')")
+    return _storage
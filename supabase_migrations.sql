@@ -0,0 +1,134 @@
+-- supabase_migrations.sql
+-- Schema changes required by newer features. Run in the Supabase SQL editor.
+
+-- ============ RESUME EMBEDDINGS ============
+-- Content-addressed resume embeddings (SKILLSYNC_PERSIST_RESUME_EMBEDDINGS=true)
+create table if not exists resume_embeddings (
+    content_hash text not null,
+    model_name text not null,
+    embedding real[] not null,
+    created_at timestamptz not null default now(),
+    primary key (content_hash, model_name)
+);
+
+-- ============ LATEST ANALYSIS PER STUDENT ============
+-- Used by get_all_student_analyses: one row per student for a company/role
+create index if not exists idx_analysis_history_latest
+    on analysis_history (company_name, job_role, student_email, analyzed_at desc);
+
+create or replace view latest_student_analyses as
+select distinct on (company_name, job_role, student_email) *
+from analysis_history
+order by company_name, job_role, student_email, analyzed_at desc, id desc;
+
+-- ============ ATOMIC RESUME VERSIONING ============
+-- At most one current resume per student
+update student_resumes r set is_current = false
+where r.is_current and exists (
+    select 1 from student_resumes newer
+    where newer.student_email = r.student_email and newer.is_current
+      and newer.version_number > r.version_number
+);
+
+create unique index if not exists idx_student_resumes_one_current
+    on student_resumes (student_email) where is_current;
+
+-- Used by save_resumes_bulk / save_student_resume: versions and inserts
+-- many resumes in one transaction. Entries are processed per student in
+-- input order; per-student advisory locks (taken in email order, so two
+-- bulk saves cannot deadlock) serialize concurrent saves. An entry's
+-- optional 'analysis' object is inserted into analysis_history against
+-- the new version in the same transaction.
+create or replace function save_resumes_bulk(resumes jsonb)
+returns setof student_resumes
+language plpgsql
+as $$
+declare
+    entry jsonb;
+    next_version integer;
+    saved student_resumes;
+begin
+    for entry in
+        select e.value
+        from jsonb_array_elements(resumes) with ordinality as e(value, idx)
+        order by e.value->>'student_email', e.idx
+    loop
+        perform pg_advisory_xact_lock(hashtext(entry->>'student_email'));
+
+        select coalesce(max(version_number), 0) + 1 into next_version
+        from student_resumes
+        where student_email = entry->>'student_email';
+
+        update student_resumes set is_current = false
+        where student_email = entry->>'student_email' and is_current;
+
+        insert into student_resumes (student_email, resume_text, resume_filename, version_number, is_current)
+        values (entry->>'student_email', entry->>'resume_text', entry->>'resume_filename', next_version, true)
+        returning * into saved;
+
+        if entry ? 'analysis' then
+            insert into analysis_history (student_email, company_name, job_role, resume_version, resume_filename,
+                                          ats_score, semantic_score, combined_score, matched_skills, missing_skills, feedback)
+            select saved.student_email, a.company_name, a.job_role, saved.version_number, saved.resume_filename,
+                   a.ats_score, a.semantic_score, a.combined_score, a.matched_skills, a.missing_skills, a.feedback
+            from jsonb_populate_record(null::analysis_history, entry->'analysis') as a;
+        end if;
+
+        return next saved;
+    end loop;
+end;
+$$;
+
+-- ============ RANKING ENTRIES ============
+-- One row per ranked student, so a student's rank is an index lookup and
+-- the leaderboard pages server-side (get_student_ranks, get_ranking_entries).
+-- student_display is the anonymized email shown to other students.
+create table if not exists ranking_entries (
+    id bigint generated by default as identity primary key,
+    ranking_id bigint not null references published_rankings (id) on delete cascade,
+    rank integer not null,
+    student_email text not null,
+    student_name text,
+    student_display text,
+    combined_score real,
+    ats_score real,
+    semantic_score real,
+    unique (ranking_id, rank)
+);
+
+create index if not exists idx_ranking_entries_student
+    on ranking_entries (student_email, ranking_id);
+
+-- Backfill rankings published before ranking_entries existed. Safe to re-run:
+-- rankings that already have entries are skipped. Legacy rankings may hold
+-- tied ranks, so entries are numbered by position (ranks run 1..N as for new
+-- rankings); emails are masked like database._mask_email.
+insert into ranking_entries (ranking_id, rank, student_email, student_name, student_display, combined_score, ats_score, semantic_score)
+select p.id,
+       row_number() over (partition by p.id order by (e.value->>'rank')::integer, e.position),
+       e.value->>'student_email',
+       e.value->>'student_name',
+       left(split_part(e.value->>'student_email', '@', 1), least(3, length(split_part(e.value->>'student_email', '@', 1)) / 2))
+           || '***'
+           || case when position('@' in e.value->>'student_email') > 0
+                   then '@' || split_part(e.value->>'student_email', '@', 2) else '' end,
+       (e.value->>'combined_score')::real,
+       (e.value->>'ats_score')::real,
+       (e.value->>'semantic_score')::real
+from published_rankings p
+cross join lateral jsonb_array_elements(p.rankings::jsonb) with ordinality as e(value, position)
+where p.rankings is not null
+  and jsonb_typeof(p.rankings::jsonb) = 'array'
+  and not exists (select 1 from ranking_entries r where r.ranking_id = p.id);
+
+-- ============ RESUME FEATURES ============
+-- Embedding and found skills of each student's current resume, so a whole
+-- cohort can be ranked for any role without re-encoding (cohort_index.py)
+create table if not exists resume_features (
+    student_email text primary key,
+    version_number integer not null,
+    model_name text not null,
+    skills jsonb not null,
+    embedding real[] not null,
+    updated_at timestamptz not null default now()
+);
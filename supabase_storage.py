@@ -0,0 +1,71 @@
+# supabase_storage.py
+import os
+from supabase import create_client
+from supabase.lib.client_options import ClientOptions
+from storage import StorageBackend
+
+# Seconds a PostgREST request may take; bounds how long a hung read holds a thread
+SUPABASE_TIMEOUT = float(os.getenv("SKILLSYNC_SUPABASE_TIMEOUT", "30"))
+
+
+class SupabaseStorage(StorageBackend):
+    """Storage backend on a remote Supabase (PostgREST) project"""
+
+    def __init__(self, url=None, key=None):
+        self.client = create_client(
+            url or os.getenv("SUPABASE_URL"), key or os.getenv("SUPABASE_KEY"),
+            options=ClientOptions(postgrest_client_timeout=SUPABASE_TIMEOUT)
+        )
+
+    @staticmethod
+    def _apply_filters(query, filters, in_filters=None):
+        for column, value in (filters or {}).items():
+            query = query.eq(column, value)
+        for column, values in (in_filters or {}).items():
+            query = query.in_(column, list(values))
+        return query
+
+    def select(self, table, columns="*", filters=None, in_filters=None,
+               order_by=None, desc=False, limit=None, offset=None):
+        query = self._apply_filters(self.client.table(table).select(columns), filters, in_filters)
+        for column in [order_by] if isinstance(order_by, str) else (order_by or []):
+            query = query.order(column, desc=desc)
+        if offset:
+            query = query.range(offset, offset + (limit or 1000) - 1)
+        elif limit is not None:
+            query = query.limit(limit)
+        return query.execute().data or []
+
+    def count(self, table, filters=None, in_filters=None):
+        # head=True: PostgREST sends only the Content-Range total, no rows
+        query = self.client.table(table).select('*', count='exact', head=True)
+        return self._apply_filters(query, filters, in_filters).execute().count or 0
+
+    def insert(self, table, rows):
+        return self.client.table(table).insert(rows).execute().data or []
+
+    def upsert(self, table, rows, on_conflict):
+        return self.client.table(table).upsert(rows, on_conflict=on_conflict).execute().data or []
+
+    def update(self, table, values, filters):
+        query = self._apply_filters(self.client.table(table).update(values), filters)
+        return query.execute().data or []
+
+    def delete(self, table, filters):
+        query = self._apply_filters(self.client.table(table).delete(), filters)
+        return query.execute().data or []
+
+    def save_resume_versions(self, resumes):
+        # save_resumes_bulk (supabase_migrations.sql) versions and inserts resumes and analyses in one transaction
+        resumes = list(resumes)
+        saved = self.client.rpc('save_resumes_bulk', {'resumes': resumes}).execute().data or []
+
+        # The function works through students in email order; restore input order
+        by_student = {}
+        for row in sorted(saved, key=lambda row: row['version_number']):
+            by_student.setdefault(row['student_email'], []).append(row)
+        return [
+            by_student[resume['student_email']].pop(0)
+            for resume in resumes
+            if by_student.get(resume['student_email'])
+        ]
@@ -0,0 +1,58 @@
+# test_ann_index.py
+import numpy as np
+from ann_index import IVFIndex
+
+
+def _unit_rows(n, dim=8, seed=0):
+    rows = np.random.default_rng(seed).normal(size=(n, dim)).astype(np.float32)
+    return rows / np.linalg.norm(rows, axis=1, keepdims=True)
+
+
+def _getter(matrix):
+    return lambda rows: matrix[np.asarray(rows, dtype=np.int64)]
+
+
+def test_full_probe_search_is_exact():
+    vectors = _unit_rows(200)
+    index = IVFIndex.build([f"k{i}" for i in range(200)], _getter(vectors), nlist=8)
+    query = vectors[17]
+
+    rows, scores = index.search(query, 5, _getter(vectors), nprobe=index.nlist)
+
+    expected = np.argsort(-(vectors @ query), kind='stable')[:5]
+    np.testing.assert_array_equal(rows, expected)
+    np.testing.assert_allclose(scores, vectors[expected] @ query, rtol=1e-6)
+    assert rows[0] == 17
+
+
+def test_candidates_reach_min_count():
+    vectors = _unit_rows(100)
+    index = IVFIndex.build([f"k{i}" for i in range(100)], _getter(vectors), nlist=10)
+
+    assert len(index.candidates(vectors[0], nprobe=1, min_count=60)) >= 60
+    assert len(index.candidates(vectors[0], nprobe=index.nlist)) == 100
+
+
+def test_sync_inserts_drops_and_reorders():
+    vectors = _unit_rows(60)
+    keys = [f"k{i}" for i in range(50)]
+    index = IVFIndex.build(keys, _getter(vectors[:50]), nlist=5)
+
+    # Drop k0..k9, add k50..k59, and reverse the order
+    new_keys = [f"k{i}" for i in range(10, 60)][::-1]
+    new_vectors = vectors[10:60][::-1]
+    index.sync(new_keys, _getter(new_vectors))
+
+    assert len(index) == 50
+    rows = index.candidates(new_vectors[0], nprobe=index.nlist)
+    np.testing.assert_array_equal(rows, np.arange(50))
+    found, _ = index.search(new_vectors[3], 1, _getter(new_vectors), nprobe=index.nlist)
+    assert new_keys[found[0]] == new_keys[3]
+
+
+def test_needs_rebuild_after_growth():
+    vectors = _unit_rows(10)
+    index = IVFIndex.build([f"k{i}" for i in range(10)], _getter(vectors), nlist=2)
+
+    assert not index.needs_rebuild(10)
+    assert index.needs_rebuild(41)
@@ -0,0 +1,87 @@
+# test_cohort_index.py
+import pytest
+import cohort_index
+import database
+import storage
+from matcher import match_resume_to_job
+from read_cache import TTLCache
+from sqlite_storage import SQLiteStorage
+
+RESUMES = {
+    'a@x.com': "python sql linux aws cloud support troubleshoot network",
+    'b@x.com': "java spring api web develop",
+    'c@x.com': "python machine learning data analysis sql",
+}
+
+
+@pytest.fixture
+def cohort(stub_model, tmp_path, monkeypatch):
+    """Empty SQLite database, stub encoder and nothing cached in cohort_index"""
+    monkeypatch.setattr(storage, '_storage', SQLiteStorage(str(tmp_path / "test.db")))
+    monkeypatch.setattr(database, '_read_cache', TTLCache(60))
+    monkeypatch.setattr(cohort_index, '_stale_cache', TTLCache(60))
+    monkeypatch.setattr(cohort_index, '_cohort', None)
+    monkeypatch.setattr(cohort_index, '_ann_index', None)
+    monkeypatch.setattr(cohort_index, '_ann_cohort', None)
+    return stub_model
+
+
+def _upload(texts):
+    """Save new resume versions and return them as save_features input"""
+    saved = database.save_resumes_bulk([
+        {'student_email': email, 'resume_text': text, 'resume_filename': 'resume.pdf'} for email, text in texts.items()
+    ])
+    return [
+        {'student_email': row['student_email'], 'version_number': row['version_number'], 'processed_text': texts[row['student_email']]}
+        for row in saved
+    ]
+
+
+def test_empty_cohort(cohort):
+    assert cohort_index.rank_cohort("Amazon", "Support Engineer III") == []
+    assert cohort_index.top_students_for_role("Amazon", "Support Engineer III") == []
+    assert cohort_index.similar_students('a@x.com') == []
+    assert cohort_index.stale_students() == []
+
+
+def test_rank_cohort_agrees_with_matching_each_resume(cohort):
+    cohort_index.save_features(_upload(RESUMES))
+
+    ranking = cohort_index.rank_cohort("Amazon", "Support Engineer III")
+
+    expected = {email: match_resume_to_job(text, "Amazon", "Support Engineer III") for email, text in RESUMES.items()}
+    assert [r['rank'] for r in ranking] == [1, 2, 3]
+    assert [r['combined_score'] for r in ranking] == sorted((r['combined_score'] for r in ranking), reverse=True)
+    for r in ranking:
+        assert r['ats_score'] == expected[r['student_email']]['ats_score']
+        assert abs(r['combined_score'] - expected[r['student_email']]['combined_score']) < 0.01
+    assert cohort_index.top_students_for_role("Amazon", "Support Engineer III", k=2) == ranking[:2]
+
+
+def test_saving_features_clears_the_stale_list(cohort):
+    features = _upload(RESUMES)
+    assert sorted(cohort_index.stale_students()) == sorted(RESUMES)
+
+    cohort_index.save_features(features[:2])
+    assert cohort_index.stale_students() == [features[2]['student_email']]
+
+    # A newer version makes the student stale again once the cached answer is dropped
+    _upload({'a@x.com': "rust go"})
+    cohort_index.invalidate_cohort()
+    assert sorted(cohort_index.stale_students()) == sorted(['a@x.com', features[2]['student_email']])
+
+
+def test_similar_students_is_exact_for_small_cohorts(cohort, monkeypatch):
+    cohort_index.save_features(_upload(RESUMES))
+    embeddings = dict(zip(RESUMES, cohort.encode(list(RESUMES.values()))))
+    expected = sorted(['b@x.com', 'c@x.com'], key=lambda email: -float(embeddings[email] @ embeddings['a@x.com']))
+
+    similar = cohort_index.similar_students('a@x.com')
+
+    assert [r['student_email'] for r in similar] == expected
+    assert similar[0]['similarity'] == round(float(embeddings[expected[0]] @ embeddings['a@x.com']) * 100, 2)
+    assert cohort_index._ann_index is None
+
+    monkeypatch.setattr(cohort_index, 'COHORT_ANN_MIN_SIZE', 0)
+    assert cohort_index.similar_students('a@x.com', nprobe=64) == similar
+    assert cohort_index._ann_index is not None
@@ -0,0 +1,33 @@
+# test_database.py
+import pytest
+import database
+import storage
+from read_cache import TTLCache
+from sqlite_storage import SQLiteStorage
+
+
+@pytest.fixture
+def db(tmp_path, monkeypatch):
+    """database functions on a fresh SQLite file, with an empty read cache"""
+    backend = SQLiteStorage(str(tmp_path / "test.db"))
+    monkeypatch.setattr(storage, '_storage', backend)
+    monkeypatch.setattr(database, '_read_cache', TTLCache(60))
+    return backend
+
+
+def _entry(rank, email):
+    return {'rank': rank, 'student_email': email, 'combined_score': 90 - rank, 'ats_score': 90, 'semantic_score': 90}
+
+
+def test_ranking_size_is_cached_until_the_ranking_is_deleted(db, monkeypatch):
+    ranking_id = database.publish_ranking('t', 'Acme', 'Dev', '', [_entry(1, 'a@x.com'), _entry(2, 'b@x.com')], 'o@x.com', 'O')[0]['id']
+    assert database.get_ranking_size(ranking_id) == 2
+
+    selects = []
+    select = db.select
+    monkeypatch.setattr(db, 'select', lambda *args, **kwargs: selects.append(args[0]) or select(*args, **kwargs))
+    assert database.get_ranking_size(ranking_id) == 2
+    assert selects == []
+
+    database.delete_ranking(ranking_id)
+    assert database.get_ranking_size(ranking_id) == 0
@@ -0,0 +1,122 @@
+# test_main.py
+import csv
+import sys
+import types
+import pytest
+import main
+from worker_pool import TIMED_OUT
+
+
+class Interrupted(Exception):
+    pass
+
+
+@pytest.fixture
+def inputs(tmp_path):
+    folder = tmp_path / "resumes"
+    folder.mkdir()
+    for name in ("a", "b", "c", "d", "e"):
+        (folder / f"{name}.pdf").write_bytes(b"")
+    return str(folder)
+
+
+@pytest.fixture(autouse=True)
+def fake_matcher(monkeypatch):
+    """Score every readable resume 1.0 without loading the encoder"""
+    def match_resumes_to_jobs(texts, targets, batch_size=None):
+        return [
+            [{'company': company, 'job_role': role, 'ats_score': 1.0, 'semantic_score': 1.0,
+              'combined_score': 1.0, 'matched_skills': [], 'missing_skills': [], 'total_skills': 0}
+             for company, role in targets]
+            for _ in texts
+        ]
+    monkeypatch.setitem(sys.modules, 'matcher', types.SimpleNamespace(match_resumes_to_jobs=match_resumes_to_jobs))
+
+
+def _fake_extraction(monkeypatch, unreadable=(), failing=(), interrupt_on=None):
+    """Replace the worker pool with in-process extraction; raise Interrupted on one file's chunk"""
+    processed_log = []
+
+    def process_chunk(pool, chunk, archive, timeout):
+        file_ids = [file_id for file_id, _ in chunk]
+        if interrupt_on in file_ids:
+            raise Interrupted()
+        processed_log.extend(file_ids)
+        processed = {file_id: None if file_id in unreadable else "text" for file_id in file_ids if file_id not in failing}
+        return processed, {file_id: TIMED_OUT for file_id in file_ids if file_id in failing}
+
+    monkeypatch.setattr(main, "_process_chunk", process_chunk)
+    return processed_log
+
+
+def _read_rows(path):
+    with open(path, newline='') as f:
+        return list(csv.DictReader(f))
+
+
+def _score(inputs, output):
+    return main.score(inputs, [("Acme", "Dev")], output, 'csv', workers=1, batch_size=8, chunk_size=2)
+
+
+def test_interrupted_run_resumes_without_duplicates(inputs, tmp_path, monkeypatch):
+    output = str(tmp_path / "scores.csv")
+
+    _fake_extraction(monkeypatch, interrupt_on="c.pdf")
+    with pytest.raises(Interrupted):
+        _score(inputs, output)
+    assert (tmp_path / "scores.csv.checkpoint").exists()
+
+    processed = _fake_extraction(monkeypatch, unreadable={"e.pdf"})
+    assert _score(inputs, output) == 3
+
+    assert processed == ["c.pdf", "d.pdf", "e.pdf"]
+    rows = _read_rows(output)
+    assert sorted(row['file'] for row in rows) == ["a.pdf", "b.pdf", "c.pdf", "d.pdf", "e.pdf"]
+    assert [row['error'] for row in rows if row['file'] == "e.pdf"] == ["Could not extract text from PDF"]
+    assert not (tmp_path / "scores.csv.checkpoint").exists()
+
+
+def test_rows_after_the_last_checkpoint_are_dropped_on_resume(inputs, tmp_path, monkeypatch):
+    output = str(tmp_path / "scores.csv")
+    _fake_extraction(monkeypatch, interrupt_on="c.pdf")
+    with pytest.raises(Interrupted):
+        _score(inputs, output)
+    # A row written after the checkpoint by a run that died before checkpointing it
+    with open(output, 'a') as f:
+        f.write("c.pdf,Acme,Dev,1.0,1.0,1.0,,,0,\n")
+
+    _fake_extraction(monkeypatch)
+    _score(inputs, output)
+
+    assert [row['file'] for row in _read_rows(output)].count("c.pdf") == 1
+
+
+def test_timed_out_files_are_retried_on_the_next_run(inputs, tmp_path, monkeypatch):
+    output = str(tmp_path / "scores.csv")
+
+    _fake_extraction(monkeypatch, failing={"b.pdf"})
+    assert _score(inputs, output) == 4
+    assert [row['error'] for row in _read_rows(output) if row['file'] == "b.pdf"] == ["Extraction timed out"]
+    assert (tmp_path / "scores.csv.checkpoint").exists()
+
+    processed = _fake_extraction(monkeypatch)
+    assert _score(inputs, output) == 1
+
+    assert processed == ["b.pdf"]
+    rows = _read_rows(output)
+    assert sorted(row['file'] for row in rows) == ["a.pdf", "b.pdf", "c.pdf", "d.pdf", "e.pdf"]
+    assert all(not row['error'] for row in rows)
+    assert not (tmp_path / "scores.csv.checkpoint").exists()
+
+
+def test_fresh_ignores_the_checkpoint(inputs, tmp_path, monkeypatch):
+    output = str(tmp_path / "scores.csv")
+    _fake_extraction(monkeypatch, interrupt_on="c.pdf")
+    with pytest.raises(Interrupted):
+        _score(inputs, output)
+
+    processed = _fake_extraction(monkeypatch)
+    main.score(inputs, [("Acme", "Dev")], output, 'csv', workers=1, batch_size=8, chunk_size=2, fresh=True)
+
+    assert len(processed) == 5
+    assert len(_read_rows(output)) == 5
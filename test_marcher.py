@@ -0,0 +1,60 @@
+# test_marcher.py
+import numpy as np
+from company_database import COMPANY_JOB_SKILLS
+from matcher import get_role_index, match_resume_to_job, match_resume_to_jobs
+from role_index import get_all_targets
+
+RESUME = "python sql linux aws cloud support troubleshoot network"
+
+
+def test_results_follow_target_order(stub_model):
+    targets = get_all_targets()[:5][::-1]
+
+    results = match_resume_to_jobs(RESUME, targets)
+
+    assert [(r['company'], r['job_role']) for r in results] == targets
+
+
+def test_resume_is_encoded_once_for_every_role(stub_model):
+    get_role_index()
+    encoded_before = len(stub_model.encoded)
+
+    match_resume_to_jobs(RESUME, get_all_targets())
+    match_resume_to_jobs(RESUME, get_all_targets()[:3])
+
+    assert stub_model.encoded[encoded_before:] == [RESUME]
+
+
+def test_scores_match_single_role_matching(stub_model):
+    company_name, job_role = "Amazon", "Support Engineer III"
+    resume_embedding = stub_model.encode([RESUME])[0]
+    role_embedding = get_role_index().rows([(company_name, job_role)])[0]
+
+    result = match_resume_to_jobs(RESUME, [(company_name, job_role)])[0]
+
+    required = COMPANY_JOB_SKILLS[company_name][job_role]
+    assert result['matched_skills'] == required
+    assert result['missing_skills'] == []
+    assert result['ats_score'] == 100.0
+    assert abs(result['semantic_score'] - float(role_embedding @ resume_embedding) * 100) < 0.01
+    assert abs(result['combined_score'] - (result['ats_score'] + result['semantic_score']) / 2) < 0.01
+    assert match_resume_to_job(RESUME, company_name, job_role) == result
+
+
+def test_unknown_targets_get_error_dicts_in_place(stub_model):
+    valid = get_all_targets()[0]
+    targets = [("No Such Company", "Dev"), valid, (valid[0], "No Such Role")]
+
+    results = match_resume_to_jobs(RESUME, targets)
+
+    assert results[0] == {'error': "Company 'No Such Company' not found in database."}
+    assert (results[1]['company'], results[1]['job_role']) == valid
+    assert results[2] == {'error': f"Job role 'No Such Role' not found for {valid[0]}."}
+
+
+def test_only_unknown_targets_skip_the_encoder(stub_model):
+    results = match_resume_to_jobs(RESUME, [("No Such Company", "Dev")])
+
+    assert 'error' in results[0]
+    assert stub_model.encoded == []
+    assert isinstance(get_role_index().embeddings, np.ndarray)
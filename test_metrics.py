@@ -0,0 +1,59 @@
+# test_metrics.py
+import threading
+import pytest
+import metrics
+from metrics import render_prometheus, span, timed
+
+
+@pytest.fixture
+def enabled(monkeypatch):
+    monkeypatch.setattr(metrics, 'METRICS_ENABLED', True)
+    metrics.reset()
+    yield
+    metrics.reset()
+
+
+def _double(x):
+    return x * 2
+
+
+def test_disabled_instrumentation_is_free(monkeypatch):
+    monkeypatch.setattr(metrics, 'METRICS_ENABLED', False)
+    metrics.reset()
+
+    assert timed("double")(_double) is _double
+    assert span("a") is span("b")
+    with span("block"):
+        pass
+    metrics.inc("calls")
+    assert metrics.get_span_stats() == []
+
+
+def test_timed_records_calls_and_errors(enabled):
+    double = timed("double")(_double)
+    double(2)
+    with pytest.raises(TypeError):
+        double(None)
+
+    stats = metrics.get_span_stats()
+    assert [(s['span'], s['calls'], s['errors']) for s in stats] == [("double", 2, 1)]
+
+
+def test_prometheus_buckets_are_cumulative(enabled):
+    metrics.observe("db_read", 0.003)
+    metrics.observe("db_read", 0.2)
+    metrics.observe("db_read", 60)
+    metrics.inc("resumes_scored", 3)
+
+    text = render_prometheus()
+
+    assert 'skillsync_span_seconds_bucket{span="db_read",le="0.005"} 1' in text
+    assert 'skillsync_span_seconds_bucket{span="db_read",le="30.0"} 2' in text
+    assert 'skillsync_span_seconds_bucket{span="db_read",le="+Inf"} 3' in text
+    assert 'skillsync_span_seconds_count{span="db_read"} 3' in text
+    assert "skillsync_resumes_scored 3" in text
+
+
+def test_importing_starts_no_exporters():
+    assert not metrics._exporters_started
+    assert not [t for t in threading.enumerate() if t.name.startswith("skillsync-metrics")]
@@ -0,0 +1,84 @@
+# test_read_cache.py
+import threading
+import time
+from read_cache import TTLCache
+
+
+def test_concurrent_misses_share_one_load():
+    cache = TTLCache(60)
+    calls = []
+
+    def load():
+        calls.append(1)
+        time.sleep(0.1)
+        return "value"
+
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(cache.get_or_load("k", load))) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len(calls) == 1
+    assert results == ["value"] * 8
+    assert not cache._loads
+
+
+def test_invalidate_discards_a_load_in_flight():
+    cache = TTLCache(60)
+    started, release = threading.Event(), threading.Event()
+
+    def stale_load():
+        started.set()
+        release.wait()
+        return "old"
+
+    reader = threading.Thread(target=cache.get_or_load, args=("k", stale_load))
+    reader.start()
+    started.wait()
+    cache.invalidate("k")
+    release.set()
+    reader.join()
+
+    assert cache.get_or_load("k", lambda: "new") == "new"
+
+
+def test_invalidate_matching_drops_only_matching_keys():
+    cache = TTLCache(60)
+    for key in [("page", 1, 0), ("page", 1, 25), ("page", 2, 0)]:
+        cache.get_or_load(key, lambda: "cached")
+
+    cache.invalidate_matching(lambda key: key[:2] == ("page", 1))
+
+    assert cache.get_or_load(("page", 1, 0), lambda: "fresh") == "fresh"
+    assert cache.get_or_load(("page", 2, 0), lambda: "fresh") == "cached"
+
+
+def test_expired_entries_are_evicted():
+    cache = TTLCache(0.05)
+    cache.get_or_load("k", lambda: 1)
+    time.sleep(0.06)
+
+    assert cache.get_or_load("k", lambda: 2) == 2
+    assert cache.stats()['evictions'] == 1
+
+
+def test_least_recently_used_entry_is_evicted_past_max_entries():
+    cache = TTLCache(60, max_entries=2)
+    cache.get_or_load("a", lambda: 1)
+    cache.get_or_load("b", lambda: 2)
+    cache.get_or_load("a", lambda: 0)  # Hit: "a" is now most recent
+    cache.get_or_load("c", lambda: 3)
+
+    assert cache.stats()['size'] == 2
+    assert cache.get_or_load("a", lambda: 0) == 1
+    assert cache.get_or_load("b", lambda: "reloaded") == "reloaded"
+
+
+def test_zero_ttl_disables_caching():
+    cache = TTLCache(0)
+    values = iter([1, 2])
+
+    assert cache.get_or_load("k", lambda: next(values)) == 1
+    assert cache.get_or_load("k", lambda: next(values)) == 2
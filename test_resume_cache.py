@@ -0,0 +1,63 @@
+# test_resume_cache.py
+import numpy as np
+import database
+import resume_cache
+import storage
+import vector_store
+from resume_cache import LRUCache, get_resume_embeddings
+from sqlite_storage import SQLiteStorage
+
+
+def test_only_distinct_misses_are_encoded(stub_model):
+    first = get_resume_embeddings(["a", "b", "a"], stub_model.encode, "model-a")
+    second = get_resume_embeddings(["b", "c"], stub_model.encode, "model-a")
+
+    assert stub_model.encoded == ["a", "b", "c"]
+    np.testing.assert_array_equal(first[0], first[2])
+    np.testing.assert_array_equal(second[0], first[1])
+
+
+def test_model_name_is_part_of_the_key(stub_model):
+    get_resume_embeddings(["a"], stub_model.encode, "model-a")
+    get_resume_embeddings(["a"], stub_model.encode, "model-b")
+
+    assert stub_model.encoded == ["a", "a"]
+
+
+def test_local_store_serves_other_processes(stub_model, monkeypatch):
+    expected = get_resume_embeddings(["a", "b"], stub_model.encode, "model-a")
+    # A fresh process: empty memory cache, same vector store on disk
+    monkeypatch.setattr(resume_cache, '_embeddings', LRUCache(1024))
+    monkeypatch.setattr(vector_store, '_stores', {})
+
+    again = get_resume_embeddings(["a", "b"], stub_model.encode, "model-a")
+
+    assert stub_model.encoded == ["a", "b"]
+    np.testing.assert_array_equal(again, expected)
+
+
+def test_persisted_embeddings_are_read_in_chunks(stub_model, tmp_path, monkeypatch):
+    monkeypatch.setattr(storage, '_storage', SQLiteStorage(str(tmp_path / "test.db")))
+    monkeypatch.setattr(database, 'EMAIL_CHUNK_SIZE', 2)
+    monkeypatch.setattr(resume_cache, 'PERSIST_RESUME_EMBEDDINGS', True)
+    monkeypatch.setattr(resume_cache, 'LOCAL_RESUME_STORE', False)
+    texts = ["a", "b", "c", "d", "e"]
+    expected = get_resume_embeddings(texts, stub_model.encode, "model-a")
+    monkeypatch.setattr(resume_cache, '_embeddings', LRUCache(1024))
+
+    again = get_resume_embeddings(texts, stub_model.encode, "model-a")
+
+    assert stub_model.encoded == texts
+    np.testing.assert_allclose(again, expected, rtol=1e-6)
+
+
+def test_lru_evicts_least_recently_used():
+    cache = LRUCache(2)
+    cache.put("a", 1)
+    cache.put("b", 2)
+    cache.get("a")
+    cache.put("c", 3)
+
+    assert cache.get("b") is None
+    assert (cache.get("a"), cache.get("c")) == (1, 3)
+    assert (cache.hits, cache.misses, len(cache)) == (3, 1, 2)
@@ -0,0 +1,48 @@
+# test_role_index.py
+import os
+import numpy as np
+import role_index
+from role_index import catalog_hash, get_all_targets, load_or_build_role_index
+
+
+def test_index_is_built_once_and_reloaded(stub_model):
+    first = load_or_build_role_index(stub_model.encode, "model-a")
+    encoded = len(stub_model.encoded)
+    second = load_or_build_role_index(stub_model.encode, "model-a")
+
+    assert encoded == len(get_all_targets())
+    assert len(stub_model.encoded) == encoded
+    assert second.key == first.key
+    np.testing.assert_array_equal(second.embeddings, first.embeddings)
+    target = get_all_targets()[3]
+    np.testing.assert_array_equal(second.rows([target])[0], first.embeddings[second.position(*target)])
+
+
+def test_catalog_change_rebuilds(stub_model, monkeypatch):
+    first = load_or_build_role_index(stub_model.encode, "model-a")
+    company_name, job_role = get_all_targets()[0]
+    monkeypatch.setitem(role_index.COMPANY_JOB_SKILLS[company_name], job_role, ["rust"])
+
+    second = load_or_build_role_index(stub_model.encode, "model-a")
+
+    assert second.key != first.key
+    assert catalog_hash("model-a") != catalog_hash("model-b")
+
+
+def test_save_prunes_only_this_models_stale_indexes(stub_model, monkeypatch):
+    index_dir = role_index.ROLE_INDEX_DIR
+    os.makedirs(index_dir)
+    stale_same_model = os.path.join(index_dir, "model-a-oldcatalog.npy")
+    recent_same_model = os.path.join(index_dir, "model-a-othercatalog.npy")
+    other_model = os.path.join(index_dir, "model-b-oldcatalog.npy")
+    for path in (stale_same_model, recent_same_model, other_model):
+        np.save(path, np.zeros((1, 2), dtype=np.float32))
+    old = os.path.getmtime(stale_same_model) - 2 * role_index.ROLE_INDEX_STALE_AFTER
+    os.utime(stale_same_model, (old, old))
+    os.utime(other_model, (old, old))
+
+    load_or_build_role_index(stub_model.encode, "model-a")
+
+    assert not os.path.exists(stale_same_model)
+    assert os.path.exists(recent_same_model)
+    assert os.path.exists(other_model)
@@ -0,0 +1,52 @@
+# test_skill_matcher.py
+from skill_matcher import SkillAutomaton, split_skills
+
+
+def test_matches_whole_tokens_only():
+    automaton = SkillAutomaton(["c", "java", "sql"])
+
+    assert automaton.find_skills("c and java") == {"c", "java"}
+    assert automaton.find_skills("cloud javascript mysql") == set()
+
+
+def test_boundaries_at_text_edges_and_punctuation():
+    automaton = SkillAutomaton(["r", "python"])
+
+    assert automaton.find_skills("r") == {"r"}
+    assert automaton.find_skills("python,r.") == {"python", "r"}
+    assert automaton.find_skills("pythonr") == set()
+
+
+def test_multi_word_and_overlapping_skills():
+    automaton = SkillAutomaton(["machine learn", "learn", "deep learn"])
+
+    assert automaton.find_skills("deep learn and machine learn") == {"deep learn", "machine learn", "learn"}
+    assert automaton.find_skills("machine learning") == set()
+
+
+def test_skill_found_after_failed_partial_match():
+    # "dat" starts "data" but fails; the fail link must still find "docker"
+    automaton = SkillAutomaton(["data", "docker"])
+
+    assert automaton.find_skills("dat docker") == {"docker"}
+
+
+def test_skills_with_symbols():
+    automaton = SkillAutomaton(["c++", "ci/cd"])
+
+    assert automaton.find_skills("c++ ci/cd") == {"c++", "ci/cd"}
+    assert automaton.find_skills("c++x") == set()
+
+
+def test_skills_are_lowercased_and_deduplicated():
+    automaton = SkillAutomaton(["SQL", "sql", ""])
+
+    assert automaton.skills == ["sql"]
+    assert automaton.find_skill_ids("sql") == {0}
+
+
+def test_split_skills_keeps_catalog_order():
+    matched, missing = split_skills({"sql", "java"}, ["Java", "Python", "SQL"])
+
+    assert matched == ["Java", "SQL"]
+    assert missing == ["Python"]
@@ -0,0 +1,108 @@
+# test_sqlite_storage.py
+import json
+import pytest
+from sqlite_storage import MIGRATIONS, SQLiteStorage
+
+
+@pytest.fixture
+def storage(tmp_path):
+    return SQLiteStorage(str(tmp_path / "test.db"))
+
+
+def _analysis(email, company, role, score):
+    return {
+        'student_email': email, 'company_name': company, 'job_role': role,
+        'resume_version': 1, 'resume_filename': 'resume.pdf', 'ats_score': score,
+        'semantic_score': score, 'combined_score': score,
+        'matched_skills': ['sql'], 'missing_skills': [], 'feedback': 'ok'
+    }
+
+
+def test_schema_and_row_round_trip(storage):
+    storage.insert('students', {'email': 'a@x.com', 'name': 'A', 'password': 'hash', 'year': '1', 'branch': 'CSE'})
+    storage.insert('analysis_history', _analysis('a@x.com', 'Acme', 'Dev', 50))
+
+    row = storage.select('analysis_history', 'matched_skills, combined_score')[0]
+    assert row == {'matched_skills': ['sql'], 'combined_score': 50}
+    assert storage.count('students') == 1
+    assert storage.select('students', 'email', filters={'email': 'b@x.com'}) == []
+
+
+def test_unknown_tables_and_columns_are_rejected(storage):
+    with pytest.raises(ValueError):
+        storage.select('nope')
+    with pytest.raises(ValueError):
+        storage.select('students', 'email; DROP TABLE students')
+    with pytest.raises(ValueError):
+        storage.insert('students', {'email': 'a@x.com', 'bogus': 1})
+
+
+def test_latest_student_analyses_view(storage):
+    storage.insert('analysis_history', [
+        _analysis('a@x.com', 'Acme', 'Dev', 40),
+        _analysis('a@x.com', 'Acme', 'Dev', 70),
+        _analysis('b@x.com', 'Acme', 'Dev', 60),
+        _analysis('a@x.com', 'Acme', 'QA', 10),
+    ])
+
+    latest = storage.select('latest_student_analyses', 'student_email, combined_score',
+                            filters={'company_name': 'Acme', 'job_role': 'Dev'},
+                            order_by='combined_score', desc=True)
+    assert latest == [
+        {'student_email': 'a@x.com', 'combined_score': 70},
+        {'student_email': 'b@x.com', 'combined_score': 60},
+    ]
+    assert storage.count('latest_student_analyses', filters={'company_name': 'Acme', 'job_role': 'Dev'}) == 2
+
+
+def test_save_resume_versions_keeps_one_current_version(storage):
+    storage.save_resume_versions([{'student_email': 'a@x.com', 'resume_text': 'v1', 'resume_filename': '1.pdf'}])
+    saved = storage.save_resume_versions([
+        {'student_email': 'a@x.com', 'resume_text': 'v2', 'resume_filename': '2.pdf'},
+        {'student_email': 'b@x.com', 'resume_text': 'b1', 'resume_filename': 'b.pdf'},
+    ])
+
+    assert [(row['student_email'], row['version_number']) for row in saved] == [('a@x.com', 2), ('b@x.com', 1)]
+    current = storage.select('student_resumes', 'student_email, version_number', filters={'is_current': True},
+                             order_by='student_email')
+    assert current == [{'student_email': 'a@x.com', 'version_number': 2}, {'student_email': 'b@x.com', 'version_number': 1}]
+
+
+def test_save_resume_versions_is_all_or_nothing(storage):
+    with pytest.raises(ValueError):
+        storage.save_resume_versions([
+            {'student_email': 'a@x.com', 'resume_text': 'ok', 'resume_filename': 'a.pdf',
+             'analysis': {'company_name': 'Acme', 'job_role': 'Dev'}},
+            {'student_email': 'b@x.com', 'resume_text': 'bad', 'resume_filename': 'b.pdf',
+             'analysis': {'bogus_column': 1}},
+        ])
+
+    assert storage.count('student_resumes') == 0
+    assert storage.count('analysis_history') == 0
+
+
+def test_ranking_backfill_runs_once_and_tolerates_ties(tmp_path):
+    path = str(tmp_path / "legacy.db")
+    storage = SQLiteStorage(path)
+    conn = storage._connection()
+    # A database from before ranking_entries: legacy JSON with a tied rank
+    conn.execute("PRAGMA user_version = 0")
+    conn.execute(
+        "INSERT INTO published_rankings (title, company_name, job_role, rankings) VALUES ('t', 'Acme', 'Dev', ?)",
+        [json.dumps([
+            {'rank': 1, 'student_email': 'alice@x.com', 'combined_score': 90},
+            {'rank': 1, 'student_email': 'bob', 'combined_score': 90},
+            {'rank': 3, 'student_email': 'cy@x.com', 'combined_score': 80},
+        ])]
+    )
+
+    SQLiteStorage(path)
+    SQLiteStorage(path)
+
+    entries = storage.select('ranking_entries', 'rank, student_email, student_display', order_by='rank')
+    assert entries == [
+        {'rank': 1, 'student_email': 'alice@x.com', 'student_display': 'al***@x.com'},
+        {'rank': 2, 'student_email': 'bob', 'student_display': 'b***'},
+        {'rank': 3, 'student_email': 'cy@x.com', 'student_display': 'c***@x.com'},
+    ]
+    assert conn.execute("PRAGMA user_version").fetchone()[0] == len(MIGRATIONS)
@@ -0,0 +1,93 @@
+# test_vector_store.py
+import numpy as np
+import pytest
+import vector_store
+from vector_store import VectorStore, block_dot
+
+
+def _rows(n, dim=4, seed=0):
+    return np.random.default_rng(seed).normal(size=(n, dim)).astype(np.float32)
+
+
+def test_add_get_and_replace(tmp_path):
+    store = VectorStore(str(tmp_path / "s"), dim=4)
+    rows = _rows(3)
+    store.add(["a", "b", "c"], rows)
+    store.add(["b"], rows[:1])
+
+    got = store.get(["a", "b", "missing"])
+    assert set(got) == {"a", "b"}
+    np.testing.assert_array_equal(got["a"], rows[0])
+    np.testing.assert_array_equal(got["b"], rows[0])
+    assert store.stats()['dead'] == 1
+
+
+def test_reopen_reads_what_was_written(tmp_path):
+    path = str(tmp_path / "s")
+    rows = _rows(5)
+    VectorStore(path, dim=4).add(list("abcde"), rows)
+    VectorStore(path).remove(["c"])
+
+    reopened = VectorStore(path)
+    assert sorted(reopened.keys()) == ["a", "b", "d", "e"]
+    np.testing.assert_array_equal(reopened.get(["e"])["e"], rows[4])
+    with pytest.raises(ValueError):
+        VectorStore(path, dim=8)
+
+
+def test_torn_writes_are_ignored(tmp_path):
+    path = str(tmp_path / "s")
+    store = VectorStore(path, dim=4)
+    store.add(["a"], _rows(1))
+    # An interrupted writer: half a row and an id line without its newline
+    with open(store._vectors_path(0), 'ab') as f:
+        f.write(b"\0" * 6)
+    with open(store._ids_path(0), 'ab') as f:
+        f.write(b"1\tb")
+
+    reopened = VectorStore(path)
+    assert reopened.keys() == ["a"]
+    reopened.add(["c"], _rows(1, seed=1))
+    assert sorted(VectorStore(path).keys()) == ["a", "c"]
+
+
+def test_compaction_keeps_live_rows(tmp_path, monkeypatch):
+    monkeypatch.setattr(vector_store, "COMPACT_MIN_DEAD", 4)
+    path = str(tmp_path / "s")
+    store = VectorStore(path, dim=4)
+    rows = _rows(6)
+    store.add(list("abcdef"), rows)
+    store.add(list("abcd"), rows[:4] * 2)
+
+    # 4 of 10 rows dead passes COMPACT_DEAD_RATIO, so the add compacted
+    assert store.generation == 1
+    assert store.stats()['rows'] == 6
+    np.testing.assert_array_equal(store.get(["a"])["a"], rows[0] * 2)
+    np.testing.assert_array_equal(store.get(["f"])["f"], rows[5])
+    assert not (tmp_path / "s" / "vectors.0.bin").exists()
+
+
+def test_snapshot_survives_compaction_in_another_instance(tmp_path):
+    path = str(tmp_path / "s")
+    reader = VectorStore(path, dim=4)
+    writer = VectorStore(path)
+    rows = _rows(3)
+    writer.add(list("abc"), rows)
+
+    vectors, positions = reader.snapshot(["b", "missing"])
+    writer.remove(["a"])
+    writer.compact()
+
+    assert positions[1] == -1
+    np.testing.assert_array_equal(vectors[positions[0]], rows[1])
+    _, positions = reader.snapshot(["b"])
+    assert reader.generation == 1 and positions[0] == 0
+
+
+def test_block_dot_matches_full_product():
+    vectors = _rows(10).astype(np.float16)
+    query = _rows(1, seed=1)[0]
+
+    np.testing.assert_allclose(
+        block_dot(vectors, query, block_rows=3), vectors.astype(np.float32) @ query, rtol=1e-5
+    )
@@ -0,0 +1,44 @@
+# test_worker_pool.py
+import os
+import time
+from worker_pool import WorkerPool, TIMED_OUT, WORKER_CRASHED
+
+
+def _work(item):
+    if item == "hang":
+        time.sleep(60)
+    if item == "crash":
+        os._exit(1)
+    if item == "raise":
+        raise ValueError("bad input")
+    return item.upper()
+
+
+def test_each_failure_is_reported_and_only_its_worker_replaced():
+    pool = WorkerPool(_work, 2)
+    try:
+        started = time.monotonic()
+        results = {idx: (result, error) for idx, result, error in pool.map_unordered(["a", "hang", "crash", "raise", "b"], timeout=2)}
+    finally:
+        pool.shutdown()
+
+    assert time.monotonic() - started < 30
+    assert results == {
+        0: ("A", None),
+        1: (None, TIMED_OUT),
+        2: (None, WORKER_CRASHED),
+        3: (None, "ValueError: bad input"),
+        4: ("B", None),
+    }
+
+
+def test_idle_workers_are_reused_and_stopped_on_shutdown():
+    pool = WorkerPool(_work, 1)
+    list(pool.map_unordered(["a"], timeout=30))
+    worker = pool._idle[0]
+
+    assert [result for _, result, _ in pool.map_unordered(["b"], timeout=30)] == ["B"]
+    assert pool._idle == [worker]
+
+    pool.shutdown()
+    assert not worker.process.is_alive()
@@ -1,14 +1,58 @@
 # text_preprocessor.py
+import multiprocessing
+import os
 import re
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
 from nltk.corpus import stopwords
 from nltk.stem import WordNetLemmatizer, PorterStemmer
-from nltk.tokenize import word_tokenize
+from metrics import timed
 
 # Initialize NLP tools
-stop_words = set(stopwords.words('english'))
+stop_words = frozenset(stopwords.words('english'))
 lemmatizer = WordNetLemmatizer()
 stemmer = PorterStemmer()
 
+# Resumes share a small vocabulary, so each distinct token is normalized once
+TOKEN_CACHE_SIZE = int(os.getenv("SKILLSYNC_TOKEN_CACHE_SIZE", "100000"))
+
+# Worker processes for preprocess_many (0 = one per CPU)
+PREPROCESS_WORKERS = int(os.getenv("SKILLSYNC_PREPROCESS_WORKERS", "0")) or os.cpu_count() or 1
+
+# Below this many texts a process pool costs more than it saves
+PARALLEL_MIN_TEXTS = int(os.getenv("SKILLSYNC_PREPROCESS_PARALLEL_MIN", "16"))
+
+_NON_ALPHA = re.compile(r'[^a-z\s]')
+
+# word_tokenize splits these even without punctuation; kept so output is unchanged
+_CONTRACTIONS = re.compile(r'\b(can)(not)\b|\b(gim)(me)\b|\b(gon)(na)\b|\b(got)(ta)\b|\b(lem)(me)\b|\b(wan)(na)\b')
+
+
+def _split_contraction(match):
+    first, second = [group for group in match.groups() if group]
+    return f"{first} {second}"
+
+
+def tokenize(text):
+    """Lowercase, strip non-letters and split into tokens"""
+    text = _NON_ALPHA.sub('', text.lower())
+    return _CONTRACTIONS.sub(_split_contraction, text).split()
+
+
+@lru_cache(maxsize=TOKEN_CACHE_SIZE)
+def lemmatize_token(word):
+    """Lemmatize one token (cached)"""
+    return lemmatizer.lemmatize(word)
+
+
+@lru_cache(maxsize=TOKEN_CACHE_SIZE)
+def normalize_token(word):
+    """Lemmatize then stem one token (cached)"""
+    return stemmer.stem(lemmatize_token(word))
+
+
+@timed("preprocess_text")
 def preprocess_text(text):
     """
     Applies a series of text preprocessing steps:
@@ -17,7 +61,9 @@ def preprocess_text(text):
     3. Tokenization
     4. Stop word removal
     5. Lemmatization
-    6. Stemming (optional, can be commented out if only lemmatization is desired)
+    6. Stemming (as per the paper, applied after lemmatization)
+
+    Steps 5 and 6 are cached per distinct token.
 
     Args:
         text (str): The raw input text (e.g., extracted from a resume or JD).
@@ -28,29 +74,47 @@ def preprocess_text(text):
     if not isinstance(text, str):
         return "" # Return empty string for non-string input
 
-    # 1. Lowercasing
-    text = text.lower()
+    return " ".join(normalize_token(word) for word in tokenize(text) if word not in stop_words)
 
-    # 2. Remove special characters and numbers (keeping only alphabetic characters)
-    # This also removes extra spaces
-    text = re.sub(r'[^a-z\s]', '', text)
 
-    # 3. Tokenization
-    tokens = word_tokenize(text)
+_pool = None
+_pool_lock = threading.Lock()
 
-    # 4. Stop word removal
-    filtered_tokens = [word for word in tokens if word not in stop_words]
 
-    # 5. Lemmatization
-    lemmas = [lemmatizer.lemmatize(word) for word in filtered_tokens]
+def _get_pool():
+    """Get the shared preprocessing pool, creating it on first use"""
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            # spawn: forking a multi-threaded Streamlit server is unsafe
+            _pool = ProcessPoolExecutor(max_workers=PREPROCESS_WORKERS, mp_context=multiprocessing.get_context("spawn"))
+        return _pool
 
-    # 6. Stemming (as per the paper, applying after lemmatization)
-    # Stemming is a more aggressive reduction. You might choose only lemmatization
-    # depending on desired semantic precision vs. reduction. The paper uses both.
-    stemmed_words = [stemmer.stem(word) for word in lemmas]
 
-    # Join the processed words back into a single string
-    return " ".join(stemmed_words)
+def preprocess_many(texts, parallel=True):
+    """
+    Preprocess many texts, using a process pool for large batches.
+
+    Args:
+        texts (list): Raw input texts.
+        parallel (bool): Allow the process pool (small batches always run inline).
+
+    Returns:
+        list: Processed texts, in input order.
+    """
+    texts = list(texts)
+    if not parallel or PREPROCESS_WORKERS <= 1 or len(texts) < PARALLEL_MIN_TEXTS:
+        return [preprocess_text(text) for text in texts]
+
+    chunksize = max(1, len(texts) // (PREPROCESS_WORKERS * 4))
+    return list(_get_pool().map(preprocess_text, texts, chunksize=chunksize))
+
+
+def get_token_cache_stats():
+    """Get hit/miss counters of the per-token normalization cache"""
+    info = normalize_token.cache_info()
+    return {'hits': info.hits, 'misses': info.misses, 'size': info.currsize, 'max_size': info.maxsize}
+
 
 if __name__ == "__main__":
     print("--- Testing Text Preprocessing ---")
@@ -85,3 +149,5 @@ if __name__ == "__main__":
     print("\nTesting with non-string input:")
     print(preprocess_text(None))
     print(preprocess_text(123))
+
+    print("\nToken cache:", get_token_cache_stats())
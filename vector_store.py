@@ -0,0 +1,353 @@
+# vector_store.py
+"""
+Append-only on-disk store of fixed-dimension embedding rows.
+
+A store is a directory holding:
+    meta.json          dim, dtype and the current generation
+    vectors.<gen>.bin  raw rows, memory-mapped read-only by every process
+    ids.<gen>.log      one "<row>\t<key>" line per append ("-1\t<key>" removes a key);
+                       the last line for a key wins
+
+Writers append under an exclusive file lock, rows first and id lines
+second, so readers never see a key whose row is not fully written.
+Readers take no lock: they memory-map the vectors file and tail the id
+log, so several Streamlit processes share one copy through the page cache.
+Replacing or removing a key leaves its old row dead; once enough rows are
+dead the live ones are rewritten into a new generation (compact()).
+"""
+import json
+import os
+import re
+import threading
+from contextlib import contextmanager
+import numpy as np
+
+try:
+    import fcntl
+except ImportError:  # Windows: appends are only serialized within one process
+    fcntl = None
+
+# Where vector stores live between restarts
+VECTOR_STORE_DIR = os.getenv("SKILLSYNC_VECTOR_STORE_DIR", os.path.join(".cache", "vectors"))
+
+# Row type of newly created stores: float32, or float16 for half the disk and page cache
+VECTOR_STORE_DTYPE = os.getenv("SKILLSYNC_VECTOR_STORE_DTYPE", "float32")
+
+# Compact once at least this share of rows (and COMPACT_MIN_DEAD rows) is dead
+COMPACT_DEAD_RATIO = 0.3
+COMPACT_MIN_DEAD = 1024
+
+# Rows converted to float32 at a time when scoring a float16 matrix
+DOT_BLOCK_ROWS = 65536
+
+
+def block_dot(vectors, query, block_rows=DOT_BLOCK_ROWS):
+    """
+    Compute vectors @ query without a full float32 copy of vectors.
+
+    float32 matrices are multiplied in place (zero-copy on a memory map);
+    float16 ones are upcast block by block.
+    """
+    if vectors.dtype == np.float32:
+        return vectors @ query
+    scores = np.empty(len(vectors), dtype=np.float32)
+    for start in range(0, len(vectors), block_rows):
+        scores[start:start + block_rows] = vectors[start:start + block_rows].astype(np.float32) @ query
+    return scores
+
+
+class VectorStore:
+    """Memory-mapped embedding rows addressed by string keys"""
+
+    def __init__(self, path, dim=None, dtype=VECTOR_STORE_DTYPE):
+        self.path = path
+        self._lock = threading.RLock()
+        os.makedirs(path, exist_ok=True)
+
+        with self._file_lock():
+            meta = self._read_meta()
+            if meta is None:
+                if dim is None:
+                    raise ValueError(f"Vector store {path} does not exist and no dimension was given")
+                meta = {'dim': int(dim), 'dtype': np.dtype(dtype).name, 'generation': 0}
+                for file_path in (self._vectors_path(0), self._ids_path(0)):
+                    open(file_path, 'ab').close()
+                self._write_meta(meta)
+
+        if dim is not None and meta['dim'] != dim:
+            raise ValueError(f"Vector store {path} holds {meta['dim']}-d rows, not {dim}-d")
+        self.dim = meta['dim']
+        self.dtype = np.dtype(meta['dtype'])
+        self._row_bytes = self.dim * self.dtype.itemsize
+        self.generation = None
+        self.refresh()
+
+    # ---- files ----
+
+    def _meta_path(self):
+        return os.path.join(self.path, "meta.json")
+
+    def _vectors_path(self, generation):
+        return os.path.join(self.path, f"vectors.{generation}.bin")
+
+    def _ids_path(self, generation):
+        return os.path.join(self.path, f"ids.{generation}.log")
+
+    def _read_meta(self):
+        try:
+            with open(self._meta_path()) as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return None
+
+    def _write_meta(self, meta):
+        tmp_path = f"{self._meta_path()}.{os.getpid()}.tmp"
+        with open(tmp_path, 'w') as f:
+            json.dump(meta, f)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self._meta_path())
+
+    @contextmanager
+    def _file_lock(self):
+        """Exclusive across threads and (where fcntl exists) processes"""
+        with self._lock:
+            with open(os.path.join(self.path, "lock"), 'a') as f:
+                if fcntl:
+                    fcntl.flock(f, fcntl.LOCK_EX)
+                try:
+                    yield
+                finally:
+                    if fcntl:
+                        fcntl.flock(f, fcntl.LOCK_UN)
+
+    # ---- reading ----
+
+    def _open(self, generation):
+        self.generation = generation
+        self._positions = {}
+        self._log_offset = 0
+        self._rows = 0
+        self._dead = 0
+        self._vectors = np.empty((0, self.dim), dtype=self.dtype)
+        self._tail_log()
+
+    def _tail_log(self):
+        """Apply id lines appended since the last read, then remap if rows were added"""
+        with open(self._ids_path(self.generation), 'rb') as f:
+            f.seek(self._log_offset)
+            data = f.read()
+        # A line without its newline is still being written
+        complete = data[:data.rfind(b"\n") + 1]
+        self._log_offset += len(complete)
+
+        for line in complete.decode('utf-8').splitlines():
+            row, key = line.split("\t", 1)
+            row = int(row)
+            if key in self._positions:
+                self._dead += 1
+            if row < 0:
+                self._positions.pop(key, None)
+            else:
+                self._positions[key] = row
+                self._rows = max(self._rows, row + 1)
+
+        if self._rows > len(self._vectors):
+            self._vectors = np.memmap(
+                self._vectors_path(self.generation), dtype=self.dtype, mode='r', shape=(self._rows, self.dim)
+            )
+
+    def refresh(self):
+        """Pick up appends and compactions made by other processes"""
+        with self._lock:
+            for _ in range(3):
+                meta = self._read_meta()
+                try:
+                    if meta['generation'] != self.generation:
+                        self._open(meta['generation'])
+                    else:
+                        self._tail_log()
+                    return
+                except FileNotFoundError:
+                    # Compacted again between reading meta.json and opening its files
+                    continue
+            raise RuntimeError(f"Vector store {self.path} keeps changing generation")
+
+    def __len__(self):
+        return len(self._positions)
+
+    def __contains__(self, key):
+        return key in self._positions
+
+    def snapshot(self, keys):
+        """
+        Get the rows of keys without copying them.
+
+        Returns:
+            tuple: (every row, live or dead, as a read-only memory map;
+                    each key's row number in it, or -1 if the key is absent).
+                   The map stays valid after a later compaction.
+        """
+        self.refresh()
+        with self._lock:
+            return self._vectors, np.array([self._positions.get(key, -1) for key in keys], dtype=np.int64)
+
+    def get(self, keys):
+        """
+        Get stored rows as float32.
+
+        Returns:
+            dict: {key: row} for the keys that are in the store.
+        """
+        self.refresh()
+        with self._lock:
+            vectors = self._vectors
+            found = {key: self._positions[key] for key in keys if key in self._positions}
+        return {key: np.asarray(vectors[row], dtype=np.float32) for key, row in found.items()}
+
+    def keys(self):
+        """Get every live key"""
+        self.refresh()
+        with self._lock:
+            return list(self._positions)
+
+    def stats(self):
+        """Get row counts and file size"""
+        self.refresh()
+        with self._lock:
+            return {
+                'live': len(self._positions),
+                'dead': self._rows - len(self._positions),
+                'rows': self._rows,
+                'dim': self.dim,
+                'dtype': self.dtype.name,
+                'generation': self.generation,
+                'bytes': self._rows * self._row_bytes
+            }
+
+    # ---- writing ----
+
+    def _append_log(self, lines):
+        with open(self._ids_path(self.generation), 'r+b') as f:
+            # Drop a torn last line left by an interrupted writer
+            f.truncate(self._log_offset)
+            f.seek(0, os.SEEK_END)
+            f.write("".join(lines).encode('utf-8'))
+            f.flush()
+            os.fsync(f.fileno())
+
+    def add(self, keys, vectors):
+        """
+        Append rows for keys; a key already in the store now points to its new row.
+
+        Args:
+            keys (list): String keys without tabs or newlines.
+            vectors (array-like): One row of length dim per key.
+        """
+        keys = list(keys)
+        vectors = np.ascontiguousarray(vectors, dtype=self.dtype).reshape(-1, self.dim)
+        if len(keys) != len(vectors):
+            raise ValueError(f"Got {len(keys)} keys for {len(vectors)} vectors")
+        if any("\t" in key or "\n" in key for key in keys):
+            raise ValueError("Vector store keys cannot contain tabs or newlines")
+        if not keys:
+            return
+
+        with self._file_lock():
+            self.refresh()
+            with open(self._vectors_path(self.generation), 'r+b') as f:
+                # Rows past the last logged one were left by an interrupted writer
+                f.truncate(self._rows * self._row_bytes)
+                f.seek(0, os.SEEK_END)
+                f.write(vectors.tobytes())
+                f.flush()
+                os.fsync(f.fileno())
+            self._append_log(f"{self._rows + idx}\t{key}\n" for idx, key in enumerate(keys))
+            self._tail_log()
+
+            if self._dead >= COMPACT_MIN_DEAD and self._dead >= COMPACT_DEAD_RATIO * self._rows:
+                self._compact()
+
+    def remove(self, keys):
+        """Drop keys (their rows stay on disk until the next compaction)"""
+        with self._file_lock():
+            self.refresh()
+            gone = [key for key in dict.fromkeys(keys) if key in self._positions]
+            if gone:
+                self._append_log(f"-1\t{key}\n" for key in gone)
+                self._tail_log()
+
+    def compact(self):
+        """Rewrite the live rows into a new generation, dropping dead ones"""
+        with self._file_lock():
+            self.refresh()
+            self._compact()
+
+    def _compact(self):
+        live = sorted(self._positions.items(), key=lambda item: item[1])
+        generation = self.generation + 1
+        rows = np.array([row for _, row in live], dtype=np.int64)
+
+        with open(self._vectors_path(generation), 'wb') as f:
+            for start in range(0, len(rows), DOT_BLOCK_ROWS):
+                f.write(np.ascontiguousarray(self._vectors[rows[start:start + DOT_BLOCK_ROWS]]).tobytes())
+            f.flush()
+            os.fsync(f.fileno())
+        with open(self._ids_path(generation), 'w', encoding='utf-8') as f:
+            f.write("".join(f"{idx}\t{key}\n" for idx, (key, _) in enumerate(live)))
+            f.flush()
+            os.fsync(f.fileno())
+
+        self._write_meta({'dim': self.dim, 'dtype': self.dtype.name, 'generation': generation})
+        old_generation = self.generation
+        self._open(generation)
+
+        # Readers that still map the old files keep them alive until they refresh
+        for path in (self._vectors_path(old_generation), self._ids_path(old_generation)):
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+
+
+_stores = {}
+_stores_lock = threading.Lock()
+
+
+def get_store(name, dim=None):
+    """
+    Get a named store under VECTOR_STORE_DIR, shared within the process.
+
+    Args:
+        name (str): Store name; characters unsafe in file names are replaced.
+        dim (int): Row length, required only to create the store.
+
+    Returns:
+        VectorStore: The store, or None if it does not exist yet and no dim was given.
+    """
+    name = re.sub(r'[^\w.-]', '_', name)
+    with _stores_lock:
+        store = _stores.get(name)
+        if store is None:
+            path = os.path.join(VECTOR_STORE_DIR, name)
+            if dim is None and not os.path.exists(os.path.join(path, "meta.json")):
+                return None
+            store = _stores[name] = VectorStore(path, dim)
+        elif dim is not None and store.dim != dim:
+            raise ValueError(f"Vector store {name} holds {store.dim}-d rows, not {dim}-d")
+        return store
+
+
+def get_all_store_stats():
+    """Get stats() of every store under VECTOR_STORE_DIR, as {name: stats}"""
+    if not os.path.isdir(VECTOR_STORE_DIR):
+        return {}
+    stats = {}
+    for name in sorted(os.listdir(VECTOR_STORE_DIR)):
+        try:
+            store = get_store(name)
+            if store is not None:
+                stats[name] = store.stats()
+        except (OSError, ValueError, RuntimeError) as e:
+            print(f"Error reading vector store {name}: {e}")
+    return stats
@@ -0,0 +1,148 @@
+# worker_pool.py
+"""
+Process pool in which every task has its own deadline.
+
+Each worker is a spawned process with its own pipe, so the pool knows
+which worker runs which task. A task that passes its deadline, or whose
+worker dies, gets only that worker terminated and replaced, and is
+reported as an error instead of a result.
+"""
+import multiprocessing
+import threading
+import time
+from collections import deque
+from multiprocessing.connection import wait
+
+# Errors reported for tasks that did not return
+TIMED_OUT = "timed out"
+WORKER_CRASHED = "worker crashed"
+
+# Seconds to wait for a terminated worker to exit before killing it
+TERMINATE_GRACE = 5
+
+
+def _serve(function, conn):
+    """Worker loop: call function on each item received until the pipe closes"""
+    while True:
+        try:
+            item = conn.recv()
+        except EOFError:
+            return
+        try:
+            reply = (True, function(item))
+        except Exception as e:
+            reply = (False, f"{type(e).__name__}: {e}")
+        conn.send(reply)
+
+
+class _Worker:
+    def __init__(self, context, function):
+        self.conn, child_conn = context.Pipe()
+        # spawn: forking a multi-threaded Streamlit server is unsafe
+        self.process = context.Process(target=_serve, args=(function, child_conn), daemon=True)
+        self.process.start()
+        child_conn.close()
+        self.deadline = None
+
+    def submit(self, item, timeout):
+        self.conn.send(item)
+        self.deadline = time.monotonic() + timeout
+
+    def stop(self):
+        """Terminate the process (killing it if it ignores SIGTERM) and wait for it"""
+        self.process.terminate()
+        self.process.join(TERMINATE_GRACE)
+        if self.process.is_alive():
+            self.process.kill()
+            self.process.join()
+        self.conn.close()
+
+
+class WorkerPool:
+    """Spawned worker processes that all run one function"""
+
+    def __init__(self, function, workers):
+        self.function = function
+        self.workers = max(1, workers)
+        self._context = multiprocessing.get_context("spawn")
+        self._idle = []
+        self._lock = threading.Lock()
+
+    def _checkout(self, count):
+        with self._lock:
+            taken, self._idle = self._idle[:count], self._idle[count:]
+        return taken + [_Worker(self._context, self.function) for _ in range(count - len(taken))]
+
+    def _checkin(self, workers):
+        with self._lock:
+            keep = max(0, self.workers - len(self._idle))
+            self._idle.extend(workers[:keep])
+        for worker in workers[keep:]:
+            worker.stop()
+
+    def map_unordered(self, items, timeout):
+        """
+        Run the function on every item, yielding results as they complete.
+
+        Safe to call from several threads at once; each call uses its own workers.
+
+        Args:
+            items (list): Picklable inputs.
+            timeout (float): Seconds each item may run.
+
+        Yields:
+            tuple: (index into items, result or None, error or None), where
+                   error is TIMED_OUT, WORKER_CRASHED or the exception raised.
+        """
+        pending = deque(enumerate(items))
+        workers = self._checkout(min(self.workers, len(pending)))
+        busy = {}  # worker slot -> item index
+
+        try:
+            while pending or busy:
+                for slot, worker in enumerate(workers):
+                    if slot not in busy and pending:
+                        idx, item = pending.popleft()
+                        worker.submit(item, timeout)
+                        busy[slot] = idx
+
+                next_deadline = min(workers[slot].deadline for slot in busy)
+                waitables = [workers[slot].conn for slot in busy] + [workers[slot].process.sentinel for slot in busy]
+                wait(waitables, timeout=max(0.0, next_deadline - time.monotonic()))
+
+                for slot in list(busy):
+                    worker = workers[slot]
+                    reply = error = None
+                    if worker.conn.poll():
+                        try:
+                            reply = worker.conn.recv()
+                        except (EOFError, OSError):
+                            error = WORKER_CRASHED
+                    elif not worker.process.is_alive():
+                        error = WORKER_CRASHED
+                    elif time.monotonic() >= worker.deadline:
+                        error = TIMED_OUT
+                    else:
+                        continue
+
+                    idx = busy.pop(slot)
+                    if error:
+                        worker.stop()
+                        workers[slot] = _Worker(self._context, self.function)
+                        yield idx, None, error
+                    elif reply[0]:
+                        yield idx, reply[1], None
+                    else:
+                        yield idx, None, reply[1]
+        finally:
+            # Also reached when the caller stops iterating early
+            for slot in busy:
+                workers[slot].stop()
+            self._checkin([worker for slot, worker in enumerate(workers) if slot not in busy])
+
+    def shutdown(self):
+        """Stop the idle workers"""
+        with self._lock:
+            idle, self._idle = self._idle, []
+        for worker in idle:
+            worker.stop()